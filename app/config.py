@@ -1,10 +1,11 @@
 from pydantic_settings import BaseSettings
 from typing import Literal
-from loguru import logger
 
 class Settings(BaseSettings):
     # API Settings
     API_KEY: str = "sk_test_123456789"
+    API_KEY_REQUIRED: bool = False  # Require API_KEY on every detection endpoint, HTTP and WebSocket
+    ADMIN_API_KEY: str = ""  # Sent as x-admin-key; admin endpoints are disabled while empty
     ENVIRONMENT: Literal["development", "production"] = "development"
     
     # Model Settings
@@ -28,15 +29,76 @@ class Settings(BaseSettings):
     # Server Settings
     HOST: str = "0.0.0.0"
     PORT: int = 8000
-    WORKERS: int = 4
+    WORKERS: int = 4  # Worker processes in prefork mode
+    SERVER_MODE: Literal["single", "prefork"] = "single"  # prefork: load the model once, fork WORKERS processes sharing its weights
     
     # Audio Settings
     MAX_AUDIO_SIZE_MB: int = 50  # Increased from 2MB for larger files
     SAMPLE_RATE: int = 16000
+    SUPPORTED_AUDIO_FORMATS: list = ["mp3", "wav", "flac", "pcm_s16le", "pcm_f32le"]  # pcm_* is raw mono PCM
+    AUDIO_DECODER: Literal["auto", "soundfile", "audioread"] = "auto"  # auto: in-process libsndfile, audioread/ffmpeg fallback
     
     # Performance Settings
     CHUNK_DURATION_SEC: float = 30.0  # Process audio in chunks for speed
     USE_HALF_PRECISION: bool = True  # Use FP16 for faster GPU inference
+    QUANTIZATION: Literal["none", "dynamic_int8"] = "none"  # dynamic_int8: int8 Linear layers on CPU (see benchmarks/bench_quantization.py)
+    INFERENCE_BACKEND: Literal["eager", "torchscript", "onnx"] = "eager"  # Exported graphs come from python -m app.models.export; eager if missing
+    MODEL_SNAPSHOT_DIR: str = ""  # Map the eager model from a snapshot (python -m app.models.snapshot) instead of from_pretrained
+    
+    # Startup Settings
+    WARMUP_LENGTHS_SEC: list = [1.0, 5.0, 65.0]  # Synthetic clips run before /ready; a length over CHUNK_DURATION_SEC warms the chunked path
+    
+    # Inference Executor Settings
+    INFERENCE_WORKERS: int = 0  # Concurrent detections (0 = half the CPU cores)
+    INFERENCE_QUEUE_SIZE: int = 32  # Requests allowed to wait for a worker before 503
+    INFERENCE_RETRY_AFTER_SEC: int = 5  # Retry-After header sent with 503 responses
+    
+    # Micro-batching Settings (model forward passes shared across requests)
+    BATCH_MAX_SIZE: int = 8  # Max chunks per forward pass (1 = disable batching)
+    BATCH_MAX_WAIT_MS: float = 10.0  # Max time to wait for a batch to fill
+    
+    # Batch Endpoint Settings
+    BATCH_MAX_ITEMS: int = 100  # Max clips per /api/voice-detection/batch request
+    BATCH_MAX_TOTAL_MB: int = 200  # Max decoded audio per batch request
+    BATCH_WORKERS: int = 4  # Most clips of one batch in flight at once; all run within INFERENCE_WORKERS
+    
+    # Live Streaming Settings (/ws/voice-detection)
+    STREAM_WINDOW_SEC: float = 5.0  # Audio scored for each rolling verdict
+    STREAM_HOP_SEC: float = 1.0  # New audio between verdicts
+    STREAM_MIN_AUDIO_SEC: float = 1.0  # Audio needed before the first verdict
+    
+    # Verdict Cache Settings (repeated clips skip decode, model and spectral work)
+    VERDICT_CACHE_SIZE: int = 1024  # In-memory LRU entries (0 = memory tier off)
+    VERDICT_CACHE_DIR: str = ""  # Optional on-disk tier, e.g. ./models/verdict_cache
+    VERDICT_CACHE_TTL_SEC: float = 7 * 24 * 3600  # Entries older than this are recomputed (0 = keep forever)
+    
+    # Cascade Settings
+    CASCADE_ENABLED: bool = False  # Run the spectral stage first and skip the model when it already decides the verdict
+    
+    # Early Exit Settings (long recordings stop scoring chunks once the vote is settled)
+    EARLY_EXIT_ENABLED: bool = False
+    EARLY_EXIT_ORDER: Literal["spread", "sequential"] = "spread"  # spread: ends, then midpoints, so early chunks cover the whole recording
+    EARLY_EXIT_MARGIN: float = 0.25  # Share of unscored chunks assumed to vote against the leader; 1.0 never changes the vote
+    EARLY_EXIT_MIN_CHUNKS: int = 4  # Chunks scored before the first stopping check
+    
+    # Analysis Budget Settings (bound model and spectral work on very long audio)
+    ANALYSIS_BUDGET_SEC: float = 0.0  # Longer audio is scored on sampled windows totalling this; requests can lower it (0 = analyse everything)
+    
+    # Voice Activity Detection Settings (trim silence before model and spectral work)
+    VAD_ENABLED: bool = False
+    VAD_ENERGY_THRESHOLD: float = 0.01  # Frame RMS counted as speech; matches the silence_ratio feature's threshold
+    VAD_FRAME_MS: float = 30.0
+    VAD_MIN_SILENCE_SEC: float = 0.3  # Shorter pauses are kept as part of the speech
+    VAD_PAD_SEC: float = 0.05  # Kept around each speech region
+    VAD_KEEP_SILENCE_RATIO: bool = True  # Compute silence_ratio on the untrimmed audio so scoring is unchanged
+    
+    # Tracing Settings (per-request spans and values, read via /admin/traces)
+    TRACE_SAMPLE_RATE: float = 0.0  # Fraction of requests traced; "x-trace: 1" with the admin key always traces
+    TRACE_BUFFER_SIZE: int = 256  # Most recent traces kept in memory (0 = tracing off)
+    
+    # Spectral Analysis Settings
+    PITCH_ESTIMATOR: Literal["piptrack", "yin"] = "piptrack"  # yin: time-domain f0 on 4 kHz audio, cheaper than piptrack and independent of the STFT
+    SPECTRAL_WORKERS: int = 0  # Processes for the spectral stage, overlapped with the model; 0 runs it in the request thread
     
     # Supported Languages
     SUPPORTED_LANGUAGES: list = ["Tamil", "English", "Hindi", "Malayalam", "Telugu"]
@@ -46,4 +108,3 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 settings = Settings()
-logger.info(f"DEBUG: Loaded settings. HF_MODEL_NAME={settings.HF_MODEL_NAME}")
@@ -3,18 +3,27 @@ Core functionality module
 Contains authentication, exceptions, and other core utilities
 """
 
-from app.core.auth import verify_api_key
+from app.core.auth import verify_admin_key, verify_api_key
 from app.core.exceptions import (
     AudioProcessingError,
     InvalidAudioFormatError,
     AudioTooLargeError,
-    ModelNotFoundError
+    BatchTooLargeError,
+    ModelNotFoundError,
+    ModelNotReadyError,
+    ServiceOverloadedError
 )
+from app.core.executor import InferenceExecutor
 
 __all__ = [
     "verify_api_key",
+    "verify_admin_key",
     "AudioProcessingError",
     "InvalidAudioFormatError",
     "AudioTooLargeError",
+    "BatchTooLargeError",
     "ModelNotFoundError",
+    "ModelNotReadyError",
+    "ServiceOverloadedError",
+    "InferenceExecutor",
 ]
\ No newline at end of file
@@ -1,13 +1,21 @@
-from fastapi import HTTPException, Security, status
+from typing import Optional, Tuple
+from fastapi import HTTPException, Security, WebSocket, status
 from fastapi.security import APIKeyHeader
 from app.config import settings
 
 api_key_header = APIKeyHeader(name="x-api-key", auto_error=False)
+admin_key_header = APIKeyHeader(name="x-admin-key", auto_error=False)
+
+# Browsers can't set headers on a WebSocket handshake; they offer "api-key.<key>" as a subprotocol
+API_KEY_SUBPROTOCOL_PREFIX = "api-key."
 
 async def verify_api_key(api_key: str = Security(api_key_header)):
     """
-    Verify API key from request header
+    Verify API key from request header when API_KEY_REQUIRED is set
     """
+    if not settings.API_KEY_REQUIRED:
+        return api_key
+    
     if api_key is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -20,4 +28,39 @@ async def verify_api_key(api_key: str = Security(api_key_header)):
             detail="Invalid API key"
         )
     
-    return api_key
\ No newline at end of file
+    return api_key
+
+def authorize_websocket(websocket: WebSocket) -> Tuple[bool, Optional[str]]:
+    """
+    Apply the API key policy to a WebSocket handshake. The key may come
+    from the x-api-key header, the apiKey query parameter or an
+    "api-key.<key>" subprotocol. Returns whether the connection is allowed
+    and the subprotocol to accept, which must be echoed when offered.
+    """
+    offered = websocket.scope.get("subprotocols") or []
+    subprotocol = next((p for p in offered if p.startswith(API_KEY_SUBPROTOCOL_PREFIX)), None)
+    if not settings.API_KEY_REQUIRED:
+        return True, subprotocol
+    
+    api_key = websocket.headers.get("x-api-key") or websocket.query_params.get("apiKey")
+    if api_key is None and subprotocol is not None:
+        api_key = subprotocol[len(API_KEY_SUBPROTOCOL_PREFIX):]
+    return api_key == settings.API_KEY, subprotocol
+
+async def verify_admin_key(admin_key: str = Security(admin_key_header)):
+    """
+    Verify the admin key for operational endpoints; they are off unless ADMIN_API_KEY is set
+    """
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin endpoints are disabled (ADMIN_API_KEY is not set)"
+        )
+    
+    if admin_key != settings.ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing or invalid admin key in header 'x-admin-key'"
+        )
+    
+    return admin_key
@@ -0,0 +1,170 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+
+class VerdictCache:
+    """
+    Content-addressed cache of detection results.
+    Keys hash the encoded audio bytes together with the model identity and
+    language. Entries live in a bounded in-memory LRU and, optionally, as
+    JSON files on disk. Entries older than ttl_sec (0 = never) count as
+    misses in both tiers. Concurrent requests for a key that is already
+    being computed wait for that computation instead of starting their own.
+    """
+
+    def __init__(self, max_entries: int = 1024, disk_dir: Optional[str] = None, ttl_sec: float = 0.0):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir or None
+        self.ttl_sec = ttl_sec
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # key -> (time stored, result)
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or self.disk_dir is not None
+
+    @staticmethod
+    def make_key(audio_bytes: bytes, namespace: str, language: str) -> str:
+        """
+        Hash audio content plus everything else that determines the verdict
+        """
+        digest = hashlib.sha256()
+        digest.update(namespace.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(language.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(audio_bytes)
+        return digest.hexdigest()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Return the cached result for key, computing it at most once across
+        concurrent callers. Failures are not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return copy.deepcopy(entry[1])
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._coalesced += 1
+                owner = False
+            else:
+                future = Future()
+                self._in_flight[key] = future
+                owner = True
+
+        if not owner:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = self._read_disk(key)
+            if result is not None:
+                with self._lock:
+                    self._disk_hits += 1
+            else:
+                with self._lock:
+                    self._misses += 1
+                result = compute()
+                self._write_disk(key, result)
+
+            with self._lock:
+                self._store(key, result)
+                del self._in_flight[key]
+            future.set_result(result)
+            return copy.deepcopy(result)
+
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_sec > 0 and time.time() - stored_at > self.ttl_sec
+
+    def _store(self, key: str, result: Dict[str, Any]):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.time(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.disk_dir:
+            return None
+        try:
+            path = self._disk_path(key)
+            # The file's mtime is when the entry was written
+            if self._expired(os.stat(path).st_mtime):
+                return None
+            with open(path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable verdict cache entry {key}: {str(e)}")
+            return None
+
+    def _write_disk(self, key: str, result: Dict[str, Any]):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to write verdict cache entry {key}: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_sec": self.ttl_sec,
+                "disk": self.disk_dir is not None,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "evictions": self._evictions,
+                "in_flight": len(self._in_flight),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -11,7 +11,7 @@ class InvalidAudioFormatError(HTTPException):
     def __init__(self):
         super().__init__(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid audio format. Only MP3 is supported"
+            detail="Invalid audio format. Supported formats: mp3, wav, flac, pcm_s16le, pcm_f32le"
         )
 
 class AudioTooLargeError(HTTPException):
@@ -21,9 +21,32 @@ class AudioTooLargeError(HTTPException):
             detail=f"Audio file too large. Maximum size: {max_size_mb}MB"
         )
 
+class BatchTooLargeError(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch too large: {detail}"
+        )
+
 class ModelNotFoundError(HTTPException):
     def __init__(self):
         super().__init__(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Detection model not loaded"
-        )
\ No newline at end of file
+        )
+
+class ModelNotReadyError(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Detection model is loading, please retry later",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+class ServiceOverloadedError(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry later",
+            headers={"Retry-After": str(retry_after)}
+        )
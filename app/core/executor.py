@@ -0,0 +1,105 @@
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Sequence
+
+from app.core.exceptions import ServiceOverloadedError
+
+
+class InferenceExecutor:
+    """
+    Bounded executor that runs blocking detection work off the event loop.
+    Requests beyond the worker count wait in a queue of fixed size; once that
+    queue is full new work is rejected with 503 instead of piling up.
+    """
+
+    def __init__(self, max_workers: int = 0, max_queue: int = 32, retry_after: int = 5):
+        self.max_workers = max_workers if max_workers > 0 else max(1, (os.cpu_count() or 1) // 2)
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="inference"
+        )
+        # Released from the worker thread when the job actually finishes, so a
+        # cancelled request keeps its slot until its thread is free again
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+
+    @property
+    def running(self) -> int:
+        return min(self._pending, self.max_workers)
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._pending - self.max_workers)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) on the pool, raising ServiceOverloadedError
+        when the queue is already full
+        """
+        self._admit(reserve=1)
+        return await self._submit(fn, *args, **kwargs)
+
+    async def map(self, fn: Callable[..., Any], items: Sequence[tuple], max_concurrency: int = 0) -> List[Any]:
+        """
+        Run fn(*item) for every item of a batch and return the results, or
+        the exception each item raised, in input order. The batch is admitted
+        or rejected as a whole, like one request; its items then take worker
+        threads like any other job, so a batch never runs more than
+        max_workers detections at once. With max_concurrency, at most that
+        many items of this batch are in flight, which leaves room for other
+        requests.
+        """
+        self._admit(reserve=0)
+        limit = asyncio.Semaphore(max_concurrency if max_concurrency > 0 else len(items) or 1)
+
+        async def run_item(item: tuple) -> Any:
+            async with limit:
+                with self._lock:
+                    self._pending += 1
+                try:
+                    return await self._submit(fn, *item)
+                except Exception as e:
+                    return e
+
+        return await asyncio.gather(*(run_item(item) for item in items))
+
+    def _admit(self, reserve: int):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise ServiceOverloadedError(self.retry_after)
+            self._pending += reserve
+
+    async def _submit(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        # The caller has counted the job in _pending; the slot is released when it finishes
+        ctx = contextvars.copy_context()
+        try:
+            future = self._pool.submit(partial(ctx.run, fn, *args, **kwargs))
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.max_workers,
+            "running": self.running,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
@@ -0,0 +1,261 @@
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional
+
+# Entry points a profile session wraps, and the functions its report breaks out
+ENTRY_POINTS = ("detect", "detect_bytes")
+FOCUS_FUNCTIONS = ("HuggingFaceDetector.detect", "AudioProcessor.analyze_spectral_features")
+
+_active_lock = threading.Lock()
+_active: Optional["ProfileSession"] = None
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile session is started while another one runs"""
+
+
+def _frame_label(code) -> str:
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class ProfileSession:
+    """
+    Profiles the next `calls` detections, or every detection within
+    `duration_sec` when calls is 0.
+    Nothing is hooked outside a session: start() wraps the detector's
+    entry points as instance attributes and finish() deletes them again,
+    so a server that is not being profiled runs the unmodified methods.
+    Only the outermost call on a thread is counted and profiled, so
+    detect() calling detect_bytes() is one call.
+
+    mode="sampling" walks the stacks of threads inside a profiled call every
+    interval_ms and reports collapsed stacks (flamegraph.pl / speedscope
+    input). mode="deterministic" runs cProfile around each call and reports
+    the top functions by cumulative time. memory=True also diffs
+    tracemalloc snapshots taken at the start and end of the session; those
+    cover allocations from every thread of the process.
+    """
+
+    def __init__(
+        self,
+        calls: int = 0,
+        duration_sec: float = 30.0,
+        mode: str = "sampling",
+        memory: bool = True,
+        interval_ms: float = 5.0,
+        top: int = 30
+    ):
+        if mode not in ("sampling", "deterministic"):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.calls = calls
+        self.duration_sec = duration_sec
+        self.mode = mode
+        self.memory = memory
+        self.interval = interval_ms / 1000.0
+        self.top = top
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._done = threading.Event()
+        self._started_calls = 0
+        self._finished_calls = 0
+        self._call_seconds: List[float] = []
+        self._profiles: List[cProfile.Profile] = []
+        self._threads: Dict[int, int] = {}
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._sampler = None
+        self._detector = None
+        self._started_tracemalloc = False
+        self._snapshot_before = None
+        self._started_at = None
+
+    def start(self, detector):
+        """
+        Hook the detector's entry points; raises ProfilerBusyError if another session is running
+        """
+        global _active
+        with _active_lock:
+            if _active is not None:
+                raise ProfilerBusyError("A profile session is already running")
+            _active = self
+
+        self._detector = detector
+        self._started_at = time.perf_counter()
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            self._snapshot_before = tracemalloc.take_snapshot()
+        if self.mode == "sampling":
+            self._sampler = threading.Thread(target=self._sample_loop, name="profile-sampler", daemon=True)
+            self._sampler.start()
+        for name in ENTRY_POINTS:
+            method = getattr(detector, name, None)
+            if method is not None:
+                setattr(detector, name, self._wrap(method))
+        return self
+
+    def _wrap(self, method):
+        @functools.wraps(method)
+        def profiled(*args, **kwargs):
+            if getattr(self._local, "inside", False) or not self._claim():
+                return method(*args, **kwargs)
+
+            self._local.inside = True
+            profile = cProfile.Profile() if self.mode == "deterministic" else None
+            thread_id = threading.get_ident()
+            with self._lock:
+                self._threads[thread_id] = self._threads.get(thread_id, 0) + 1
+            if profile is not None:
+                try:
+                    profile.enable()
+                except ValueError:
+                    # Another profiler owns this thread (process-wide from Python 3.12)
+                    profile = None
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                if profile is not None:
+                    profile.disable()
+                self._local.inside = False
+                with self._lock:
+                    self._threads[thread_id] -= 1
+                    if not self._threads[thread_id]:
+                        del self._threads[thread_id]
+                    if profile is not None:
+                        self._profiles.append(profile)
+                    self._call_seconds.append(elapsed)
+                    self._finished_calls += 1
+                    if self.calls and self._finished_calls >= self.calls:
+                        self._done.set()
+        return profiled
+
+    def _claim(self) -> bool:
+        with self._lock:
+            if self._done.is_set() or (self.calls and self._started_calls >= self.calls):
+                return False
+            self._started_calls += 1
+            return True
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        while not self._done.wait(self.interval):
+            with self._lock:
+                threads = set(self._threads)
+            if not threads:
+                continue
+            frames = sys._current_frames()
+            for thread_id in threads:
+                frame = frames.get(thread_id)
+                if frame is None or thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                self._stacks[";".join(reversed(stack))] += 1
+                self._samples += 1
+
+    def wait(self) -> dict:
+        """
+        Block until the session is complete, unhook the detector and return the report
+        """
+        self._done.wait(self.duration_sec)
+        return self.finish()
+
+    def finish(self) -> dict:
+        global _active
+        self._done.set()
+        for name in ENTRY_POINTS:
+            # Drop the instance attribute so lookups fall back to the class method
+            self._detector.__dict__.pop(name, None)
+        if self._sampler is not None:
+            self._sampler.join()
+
+        report = {
+            "mode": self.mode,
+            "calls": self._finished_calls,
+            "window_sec": round(time.perf_counter() - self._started_at, 3),
+            "call_seconds": [round(s, 6) for s in self._call_seconds],
+        }
+        if self.mode == "sampling":
+            report.update(self._sampling_report())
+        else:
+            report.update(self._deterministic_report())
+        if self.memory:
+            report["allocations"] = self._allocation_report()
+
+        with _active_lock:
+            _active = None
+        return report
+
+    def _sampling_report(self) -> dict:
+        focus = {
+            name: sum(count for stack, count in self._stacks.items() if f"{name} (" in stack)
+            for name in FOCUS_FUNCTIONS
+        }
+        return {
+            "interval_ms": self.interval * 1000.0,
+            "samples": self._samples,
+            "focus_samples": focus,
+            "collapsed": [f"{stack} {count}" for stack, count in self._stacks.most_common()],
+        }
+
+    def _deterministic_report(self) -> dict:
+        if not self._profiles:
+            return {"focus_cumulative_sec": {}, "functions": []}
+        stats = pstats.Stats(self._profiles[0], stream=io.StringIO())
+        for profile in self._profiles[1:]:
+            stats.add(profile)
+
+        rows = []
+        focus = {}
+        for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+            label = f"{name} ({os.path.basename(filename)}:{line})"
+            rows.append({
+                "function": label,
+                "calls": calls,
+                "total_sec": round(total, 6),
+                "cumulative_sec": round(cumulative, 6),
+            })
+            # cProfile records bare names; match the focus functions by file too
+            for qualified in FOCUS_FUNCTIONS:
+                owner, method = qualified.split(".")
+                if name == method and self._defines(filename, owner):
+                    focus[qualified] = round(focus.get(qualified, 0.0) + cumulative, 6)
+        rows.sort(key=lambda row: row["cumulative_sec"], reverse=True)
+        return {"focus_cumulative_sec": focus, "functions": rows[:self.top]}
+
+    @staticmethod
+    def _defines(filename: str, owner: str) -> bool:
+        return {
+            "HuggingFaceDetector": "hf_detector.py",
+            "AudioProcessor": "audio_processor.py",
+        }.get(owner) == os.path.basename(filename)
+
+    def _allocation_report(self) -> List[dict]:
+        snapshot = tracemalloc.take_snapshot()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        diff = snapshot.filter_traces(ignore).compare_to(self._snapshot_before.filter_traces(ignore), "lineno")
+        return [
+            {
+                "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "size_kb": round(stat.size_diff / 1024, 1),
+                "count": stat.count_diff,
+            }
+            for stat in diff[:self.top]
+        ]
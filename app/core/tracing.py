@@ -0,0 +1,235 @@
+import contextvars
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional
+
+_current: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("trace", default=None)
+_NO_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ("trace", "name", "start")
+
+    def __init__(self, trace: "Trace", name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.trace.records.append(("span", self.name, self.start - self.trace.started, end - self.start, None))
+        return False
+
+
+class Trace:
+    """
+    Spans and values recorded for one request.
+    Records are kept as raw tuples and the values as passed in (dicts are
+    not copied or formatted); nothing is turned into text until to_dict()
+    is called when the trace is read. request_id is generated by the
+    server; the ID the client sent, if any, is kept as client_request_id.
+    """
+
+    __slots__ = ("request_id", "client_request_id", "created_at", "started", "records")
+
+    def __init__(self, request_id: str, client_request_id: Optional[str] = None):
+        self.request_id = request_id
+        self.client_request_id = client_request_id
+        self.created_at = time.time()
+        self.started = time.perf_counter()
+        # list.append is atomic, so batch items on several threads can share a trace
+        self.records: List[tuple] = []
+
+    def span(self, name: str) -> _Span:
+        """
+        Context manager that records the duration of its block
+        """
+        return _Span(self, name)
+
+    def add_span(self, name: str, duration: float):
+        """
+        Record a span timed elsewhere (e.g. in a worker process), ending now
+        """
+        self.records.append(("span", name, time.perf_counter() - self.started - duration, duration, None))
+
+    def event(self, name: str, **values: Any):
+        self.records.append(("event", name, time.perf_counter() - self.started, None, values))
+
+    def to_dict(self) -> Dict[str, Any]:
+        records = []
+        for kind, name, offset, duration, values in list(self.records):
+            record = {"type": kind, "name": name, "at_ms": round(offset * 1000.0, 3)}
+            if duration is not None:
+                record["duration_ms"] = round(duration * 1000.0, 3)
+            if values:
+                record["values"] = {key: _plain(value) for key, value in values.items()}
+            records.append(record)
+        records.sort(key=lambda record: record["at_ms"])
+        return {
+            "request_id": self.request_id,
+            "client_request_id": self.client_request_id,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.created_at)),
+            "records": records,
+        }
+
+
+def _plain(value: Any) -> Any:
+    """
+    JSON-friendly copy of a recorded value (NumPy scalars and arrays included)
+    """
+    if isinstance(value, dict):
+        return {str(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+class TraceBuffer:
+    """
+    Bounded in-memory store of the most recent request traces.
+    start() samples: a request is traced with probability sample_rate,
+    or always when forced. Once capacity is reached the oldest trace is
+    dropped, so memory stays bounded whatever the traffic.
+    """
+
+    def __init__(self, capacity: int = 256, sample_rate: float = 0.0):
+        self.capacity = max(0, capacity)
+        self.sample_rate = sample_rate
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._started = 0
+        self._evicted = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def start(self, client_request_id: Optional[str] = None, force: bool = False) -> Optional[Trace]:
+        """
+        Begin a trace for a request, or return None when it is not sampled.
+        Traces are keyed by a fresh ID, so a client cannot replace another
+        request's trace by reusing its x-request-id.
+        """
+        if not self.enabled or not (force or (self.sample_rate > 0 and random.random() < self.sample_rate)):
+            return None
+        trace = Trace(uuid.uuid4().hex, client_request_id)
+        with self._lock:
+            self._traces[trace.request_id] = trace
+            self._started += 1
+            while len(self._traces) > self.capacity:
+                self._traces.popitem(last=False)
+                self._evicted += 1
+        return trace
+
+    def get(self, request_id: str) -> Optional[Trace]:
+        with self._lock:
+            return self._traces.get(request_id)
+
+    def recent(self, limit: int = 50) -> List[str]:
+        """
+        IDs of the most recent traces, newest first
+        """
+        with self._lock:
+            ids = list(self._traces)
+        return ids[::-1][:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "sample_rate": self.sample_rate,
+                "stored": len(self._traces),
+                "started": self._started,
+                "evicted": self._evicted,
+            }
+
+
+def current_trace() -> Optional[Trace]:
+    """
+    The trace of the request being handled on this thread, if it is sampled
+    """
+    return _current.get()
+
+
+def activate(trace: Optional[Trace]) -> contextvars.Token:
+    """
+    Make trace current for this context; work the InferenceExecutor runs
+    from here inherits it
+    """
+    return _current.set(trace)
+
+
+def deactivate(token: contextvars.Token):
+    _current.reset(token)
+
+
+def span(name: str):
+    """
+    Span on the current trace, or a shared no-op context when there is none
+    """
+    trace = _current.get()
+    return _NO_SPAN if trace is None else trace.span(name)
+
+
+class TraceMiddleware:
+    """
+    ASGI middleware that starts a trace for sampled detection requests.
+    "x-trace: 1" forces a trace when the request also carries the admin
+    key in x-admin-key; "x-request-id" is recorded with the trace. Traced
+    responses carry the trace ID in X-Trace-ID. Requests that are not
+    sampled pass straight through.
+    """
+
+    def __init__(
+        self,
+        app,
+        buffer: TraceBuffer,
+        admin_key: Callable[[], str] = lambda: "",
+        path_prefix: str = "/api/voice-detection"
+    ):
+        self.app = app
+        self.buffer = buffer
+        # Read per request so a changed key applies without rebuilding the middleware
+        self.admin_key = admin_key
+        self.path_prefix = path_prefix
+
+    def _may_force(self, headers: Dict[bytes, bytes]) -> bool:
+        if headers.get(b"x-trace") != b"1":
+            return False
+        admin_key = self.admin_key()
+        return bool(admin_key) and headers.get(b"x-admin-key", b"").decode("latin-1") == admin_key
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        client_request_id = headers.get(b"x-request-id", b"").decode("latin-1") or None
+        trace = self.buffer.start(client_request_id, force=self._may_force(headers))
+        if trace is None:
+            return await self.app(scope, receive, send)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-trace-id", trace.request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        token = activate(trace)
+        try:
+            with trace.span("request"):
+                await self.app(scope, receive, send_with_id)
+        finally:
+            deactivate(token)
@@ -1,18 +1,42 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.websockets import WebSocketState
 from loguru import logger
+import asyncio
+import json
+import os
 import sys
+import time
+from typing import Optional
 
 from app.config import settings
 from app.models.schemas import (
+    AnalysisInfo,
     VoiceDetectionRequest,
     VoiceDetectionResponse,
-    ErrorResponse
+    BatchVoiceDetectionRequest,
+    BatchVoiceDetectionResponse,
+    BatchItemResult,
+    ErrorResponse,
+    ProfileRequest
 )
-from app.core.exceptions import AudioProcessingError
+from app.core.exceptions import (
+    AudioProcessingError,
+    BatchTooLargeError,
+    InvalidAudioFormatError,
+    ModelNotFoundError,
+    ModelNotReadyError
+)
+from app.core.auth import authorize_websocket, verify_admin_key, verify_api_key
+from app.core.executor import InferenceExecutor
+from app.core.metrics import CLASSIFICATIONS, ERRORS, STAGE_SECONDS, registry
+from app.core.profiling import ProfileSession, ProfilerBusyError
+from app.core.tracing import TraceBuffer, TraceMiddleware
+from app.utils.stream import StreamingSession
+from app.utils.upload import RAW_UPLOAD_CONTENT_TYPES, read_multipart_audio, read_raw_audio
 
 # Configure logging
 logger.remove()
@@ -40,6 +64,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Sampled detection requests record a trace, kept in a bounded buffer
+trace_buffer = TraceBuffer(settings.TRACE_BUFFER_SIZE, settings.TRACE_SAMPLE_RATE)
+app.add_middleware(TraceMiddleware, buffer=trace_buffer, admin_key=lambda: settings.ADMIN_API_KEY)
+
 # Mount static files
 try:
     app.mount("/static", StaticFiles(directory="app/static"), name="static")
@@ -56,22 +84,111 @@ async def serve_demo():
     except:
         return FileResponse("index.html")
 
-# Global detector instance
+# Global detector instance, set once the model is loaded and warmed up
 detector = None
 
+# Model lifecycle: loading -> warming -> ready, or failed
+model_status = "loading"
+_model_load_task = None
+
+# Runs blocking detection work so the event loop stays responsive
+inference_executor = None
+
+# Set by the pre-fork server (app.prefork): the model loaded once in the
+# parent, and the number of worker processes sharing the machine
+preloaded_detector = None
+server_processes = 1
+
+def _create_detector():
+    """
+    Import and build the detector; torch and transformers load here
+    """
+    if preloaded_detector is not None:
+        # Weights are shared copy-on-write with the parent; only this worker's threads start here
+        preloaded_detector.start_services()
+        return preloaded_detector
+    from app.models.hf_detector import HuggingFaceDetector
+    return HuggingFaceDetector()
+
+def _load_detector():
+    """
+    Load, configure and warm up the detector off the event loop
+    """
+    global detector, model_status
+    try:
+        start = time.perf_counter()
+        loaded = _create_detector()
+        logger.info(f"✅ Hugging Face detector loaded in {time.perf_counter() - start:.1f}s")
+        
+        # Batched forwards run on a single scheduler thread, so it can use every core
+        # not taken by the spectral worker processes, split between server processes
+        cores = max(1, ((os.cpu_count() or 1) - loaded.spectral_pool.workers * server_processes) // server_processes)
+        if loaded.batcher.enabled:
+            loaded.set_num_threads(cores)
+        else:
+            loaded.set_num_threads(cores // inference_executor.max_workers)
+        
+        model_status = "warming"
+        start = time.perf_counter()
+        loaded.warmup(settings.WARMUP_LENGTHS_SEC)
+        logger.info(f"Warmup finished in {time.perf_counter() - start:.1f}s")
+        
+        detector = loaded
+        model_status = "ready"
+        logger.info("Model ready")
+    except Exception as e:
+        model_status = "failed"
+        logger.error(f"Failed to load detector: {str(e)}")
+
+def _require_detector():
+    """
+    The loaded detector, or the error to return while it is unavailable
+    (counted in ERRORS like any other failed detection)
+    """
+    if detector is None:
+        error = ModelNotFoundError() if model_status == "failed" else ModelNotReadyError(settings.INFERENCE_RETRY_AFTER_SEC)
+        ERRORS.inc(type(error).__name__)
+        raise error
+    return detector
+
 @app.on_event("startup")
 async def startup_event():
     """
-    Load model on startup based on configuration
+    Start serving immediately and load the model in the background
     """
-    global detector
+    global inference_executor, _model_load_task
     logger.info("Starting AI Voice Detection API...")
     
-    from app.models.hf_detector import HuggingFaceDetector
-    detector = HuggingFaceDetector()
-    logger.info("✅ Hugging Face detector loaded")
+    # Default executor size (half the cores) is shared between pre-forked processes
+    default_workers = max(1, (os.cpu_count() or 1) // 2 // server_processes)
+    inference_executor = InferenceExecutor(
+        max_workers=settings.INFERENCE_WORKERS or default_workers,
+        max_queue=settings.INFERENCE_QUEUE_SIZE,
+        retry_after=settings.INFERENCE_RETRY_AFTER_SEC
+    )
+    logger.info(f"Inference executor ready: {inference_executor.max_workers} workers, queue size {inference_executor.max_queue}")
     
-    logger.info(f"API ready! Environment: {settings.ENVIRONMENT}")
+    # Read at scrape time, so they cost nothing per request
+    registry.gauge(
+        "voice_detection_in_flight",
+        "Detections running on the inference executor",
+        lambda: inference_executor.running
+    )
+    registry.gauge(
+        "voice_detection_queue_depth",
+        "Detections waiting for an inference worker",
+        lambda: inference_executor.queue_depth
+    )
+    registry.gauge(
+        "voice_detection_batcher_pending",
+        "Chunks waiting in the micro-batcher",
+        lambda: detector.batcher.stats()["pending"] if detector else 0
+    )
+    
+    # /health answers right away; /ready turns green once the model is loaded and warm
+    _model_load_task = asyncio.get_running_loop().run_in_executor(None, _load_detector)
+    
+    logger.info(f"API started, loading model {settings.HF_MODEL_NAME} in the background. Environment: {settings.ENVIRONMENT}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -79,6 +196,11 @@ async def shutdown_event():
     Cleanup on shutdown
     """
     logger.info("Shutting down API...")
+    if inference_executor is not None:
+        inference_executor.shutdown(wait=False)
+    if detector is not None:
+        detector.batcher.close()
+        detector.spectral_pool.close()
 
 @app.get("/", tags=["UI"])
 async def root():
@@ -104,22 +226,86 @@ async def api_info():
 @app.get("/health", tags=["Health"])
 async def health_check():
     """
-    Health check endpoint
+    Liveness check; answers while the model is still loading
     """
     return {
         "status": "healthy",
+        "model_status": model_status,
         "model_type": settings.MODEL_TYPE,
-        "device": "cuda" if settings.USE_GPU else "cpu"
+        "device": "cuda" if settings.USE_GPU else "cpu",
+        "backend": detector.backend.name if detector else None,
+        "inference": inference_executor.stats() if inference_executor else None,
+        "batching": detector.batcher.stats() if detector else None,
+        "cache": detector.cache.stats() if detector else None,
+        "spectral": detector.spectral_pool.stats() if detector else None
     }
 
+@app.get("/ready", tags=["Health"])
+async def readiness_check():
+    """
+    Readiness check; 200 once the model is loaded and warmed up, 503 before
+    """
+    if model_status != "ready":
+        return JSONResponse(status_code=503, content={"status": model_status})
+    return {"status": "ready"}
+
+@app.get("/metrics", tags=["Health"])
+async def metrics():
+    """
+    Prometheus metrics for this process
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.post("/admin/profile", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def profile_detections(request: ProfileRequest):
+    """
+    Profile live traffic: the next `calls` detections, or every detection
+    within `durationSec`. Answers when the session ends with CPU stacks or
+    a function table, and the top allocation sites.
+    """
+    session = ProfileSession(
+        calls=request.calls,
+        duration_sec=request.durationSec,
+        mode=request.mode,
+        memory=request.memory,
+        interval_ms=request.intervalMs,
+        top=request.top
+    )
+    try:
+        session.start(_require_detector())
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    logger.info(f"Profiling {request.calls or 'all'} detections for up to {request.durationSec}s ({request.mode})")
+    return await asyncio.get_running_loop().run_in_executor(None, session.wait)
+
+@app.get("/admin/traces", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def list_traces(limit: int = Query(50, ge=1, le=1000)):
+    """
+    IDs of the most recently traced requests, newest first
+    """
+    return {"traces": trace_buffer.recent(limit), "buffer": trace_buffer.stats()}
+
+@app.get("/admin/traces/{trace_id}", tags=["Admin"], dependencies=[Depends(verify_admin_key)])
+async def get_trace(trace_id: str):
+    """
+    Full trace of one request: spans with timings and the recorded values
+    """
+    trace = trace_buffer.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"No trace {trace_id}")
+    return trace.to_dict()
+
 @app.post(
     "/api/voice-detection",
     response_model=VoiceDetectionResponse,
     responses={
         400: {"model": ErrorResponse, "description": "Bad Request"},
-        500: {"model": ErrorResponse, "description": "Internal Server Error"}
+        500: {"model": ErrorResponse, "description": "Internal Server Error"},
+        503: {"model": ErrorResponse, "description": "Server Busy"}
     },
-    tags=["Detection"]
+    tags=["Detection"],
+    dependencies=[Depends(verify_api_key)]
 )
 async def voice_detection(
     request: VoiceDetectionRequest
@@ -128,20 +314,289 @@ async def voice_detection(
     Detect if voice is AI-generated or Human using deep learning
     
     - **language**: One of Tamil, English, Hindi, Malayalam, Telugu
-    - **audioFormat**: Must be mp3
-    - **audioBase64**: Base64 encoded MP3 audio
+    - **audioFormat**: mp3, wav, flac, pcm_s16le or pcm_f32le
+    - **audioBase64**: Base64 encoded audio
+    - **sampleRate**: Sample rate in Hz, required for raw PCM
+    - **maxAnalysisSec**: Optional limit on the seconds analysed, sampled across longer audio
     
     Returns classification with confidence score
     """
+    # Normalize and validate language
+    lang = request.language.strip().title()
+    if lang not in settings.SUPPORTED_LANGUAGES:
+        logger.warning(f"Unsupported language '{request.language}', proceeding with default thresholds")
+    logger.info(f"Processing request for language: {lang}")
+    
+    return await _run_detection(lang, _require_detector().detect, request.audioBase64, lang, request.audioFormat, request.sampleRate, request.maxAnalysisSec)
+
+@app.post(
+    "/api/voice-detection/upload",
+    response_model=VoiceDetectionResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad Request"},
+        413: {"model": ErrorResponse, "description": "Audio Too Large"},
+        500: {"model": ErrorResponse, "description": "Internal Server Error"},
+        503: {"model": ErrorResponse, "description": "Server Busy"}
+    },
+    tags=["Detection"],
+    dependencies=[Depends(verify_api_key)]
+)
+async def voice_detection_upload(
+    request: Request,
+    language: Optional[str] = Query(None, description="Language of the audio"),
+    audio_format: Optional[str] = Query(None, alias="audioFormat", description="Format of an application/octet-stream body"),
+    sample_rate: Optional[int] = Query(None, alias="sampleRate", gt=0, description="Sample rate in Hz, required for raw PCM"),
+    max_analysis_sec: Optional[float] = Query(None, alias="maxAnalysisSec", ge=1.0, description="Analyse at most this many seconds")
+):
+    """
+    Detect from a binary upload without base64 or JSON
+    
+    - Raw body with **Content-Type: audio/mpeg**, **audio/wav** or **audio/flac**, language in the `language` query parameter
+    - Raw PCM as **application/octet-stream** with `audioFormat=pcm_s16le|pcm_f32le` and `sampleRate` query parameters
+    - Or **multipart/form-data** with a `file` part and a `language` query parameter or form field
+    
+    Uploads over MAX_AUDIO_SIZE_MB are rejected from Content-Length or
+    while streaming, before the body is fully buffered.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    
+    if audio_format is None:
+        audio_format = RAW_UPLOAD_CONTENT_TYPES.get(content_type, "mp3")
+    audio_format = audio_format.lower()
+    if audio_format not in settings.SUPPORTED_AUDIO_FORMATS:
+        raise InvalidAudioFormatError()
+    if audio_format.startswith("pcm_") and sample_rate is None:
+        raise HTTPException(status_code=400, detail="sampleRate query parameter is required for raw PCM audio")
+    
+    if content_type == "multipart/form-data":
+        audio_bytes, form_language = await read_multipart_audio(request)
+        language = language or form_language
+    elif content_type in RAW_UPLOAD_CONTENT_TYPES:
+        audio_bytes = await read_raw_audio(request)
+    else:
+        raise InvalidAudioFormatError()
+    
+    if not language:
+        raise HTTPException(status_code=400, detail="Missing 'language' query parameter or form field")
+    
+    lang = language.strip().title()
+    if lang not in settings.SUPPORTED_LANGUAGES:
+        raise HTTPException(status_code=400, detail=f"Language must be one of {settings.SUPPORTED_LANGUAGES}")
+    logger.info(f"Processing {len(audio_bytes)} byte upload for language: {lang}")
+    
+    return await _run_detection(lang, _require_detector().detect_bytes, audio_bytes, lang, audio_format, sample_rate, max_analysis_sec)
+
+@app.post(
+    "/api/voice-detection/batch",
+    response_model=BatchVoiceDetectionResponse,
+    responses={
+        413: {"model": ErrorResponse, "description": "Batch Too Large"},
+        500: {"model": ErrorResponse, "description": "Internal Server Error"},
+        503: {"model": ErrorResponse, "description": "Server Busy"}
+    },
+    tags=["Detection"],
+    dependencies=[Depends(verify_api_key)]
+)
+async def voice_detection_batch(
+    request: BatchVoiceDetectionRequest
+):
+    """
+    Detect a batch of clips in one request
+    
+    - **items**: List of voice-detection requests (same fields as `/api/voice-detection`)
+    
+    Clips are decoded and analysed concurrently and their model chunks are
+    scored together. Returns one result per clip in input order; a clip
+    that fails gets an error entry without failing the rest of the batch.
+    """
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        raise BatchTooLargeError(f"{len(request.items)} items (maximum {settings.BATCH_MAX_ITEMS})")
+    
+    total_mb = sum(len(item.audioBase64) * 3 // 4 for item in request.items) / (1024 * 1024)
+    if total_mb > settings.BATCH_MAX_TOTAL_MB:
+        raise BatchTooLargeError(f"{total_mb:.1f}MB of audio (maximum {settings.BATCH_MAX_TOTAL_MB}MB)")
+    
+    items = [
+        (item.audioBase64, item.language.strip().title(), item.audioFormat, item.sampleRate, item.maxAnalysisSec)
+        for item in request.items
+    ]
+    logger.info(f"Processing batch of {len(items)} clips")
+    
     try:
-        # Normalize and validate language
-        lang = request.language.strip().title()
-        if lang not in settings.SUPPORTED_LANGUAGES:
-            logger.warning(f"Unsupported language '{request.language}', proceeding with default thresholds")
-        logger.info(f"Processing request for language: {lang}")
+        # Items run on the inference executor like single requests, so a batch
+        # stays within INFERENCE_WORKERS; their chunks meet in the micro-batcher
+        with STAGE_SECONDS.time("total"):
+            outcomes = await inference_executor.map(_require_detector().detect, items, settings.BATCH_WORKERS)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected batch error: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+    
+    results = []
+    for index, outcome in enumerate(outcomes):
+        if isinstance(outcome, Exception):
+            ERRORS.inc(type(outcome).__name__)
+        if isinstance(outcome, HTTPException):
+            results.append(BatchItemResult(index=index, status="error", message=str(outcome.detail)))
+        elif isinstance(outcome, Exception):
+            results.append(BatchItemResult(index=index, status="error", message=f"Internal server error: {str(outcome)}"))
+        else:
+            CLASSIFICATIONS.inc(outcome["classification"])
+            results.append(BatchItemResult(
+                index=index,
+                status="success",
+                classification=outcome["classification"],
+                confidenceScore=outcome["confidence"],
+                explanation=outcome["explanation"],
+                analysis=_analysis_info(outcome)
+            ))
+    
+    failed = sum(1 for r in results if r.status == "error")
+    logger.info(f"Batch complete: {len(results) - failed} succeeded, {failed} failed")
+    return BatchVoiceDetectionResponse(status="success", results=results)
+
+@app.websocket("/ws/voice-detection")
+async def voice_detection_stream(
+    websocket: WebSocket,
+    language: str = Query("English"),
+    audio_format: str = Query("pcm_s16le", alias="audioFormat"),
+    sample_rate: int = Query(16000, alias="sampleRate", gt=0)
+):
+    """
+    Live detection over a WebSocket
+    
+    The client sends binary messages of raw mono PCM (pcm_s16le or pcm_f32le
+    at sampleRate). Every STREAM_HOP_SEC of audio the server scores the last
+    STREAM_WINDOW_SEC and pushes a JSON verdict. Sending the text message
+    {"type": "end"} requests a final verdict and closes the stream.
+    """
+    allowed, subprotocol = authorize_websocket(websocket)
+    if not allowed:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept(subprotocol=subprotocol)
+    
+    lang = language.strip().title()
+    audio_format = audio_format.lower()
+    if audio_format not in ("pcm_s16le", "pcm_f32le"):
+        await websocket.send_json({"type": "error", "message": "Streaming supports pcm_s16le and pcm_f32le audio"})
+        await websocket.close(code=1003)
+        return
+    try:
+        stream_detector = _require_detector()
+    except HTTPException as e:
+        await websocket.send_json({"type": "error", "message": str(e.detail)})
+        await websocket.close(code=1013)
+        return
+    
+    session = StreamingSession(
+        stream_detector,
+        lang,
+        audio_format,
+        sample_rate,
+        window_sec=settings.STREAM_WINDOW_SEC,
+        hop_sec=settings.STREAM_HOP_SEC,
+        min_audio_sec=settings.STREAM_MIN_AUDIO_SEC
+    )
+    logger.info(f"Stream opened: {lang}, {audio_format} at {sample_rate}Hz")
+    
+    async def score_and_send():
+        try:
+            result = await inference_executor.run(session.score)
+        except HTTPException as e:
+            ERRORS.inc(type(e).__name__)
+            await _send_stream_message(websocket, {"type": "error", "message": str(e.detail)})
+            return
+        except Exception as e:
+            ERRORS.inc(type(e).__name__)
+            logger.error(f"Stream scoring error: {str(e)}")
+            await _send_stream_message(websocket, {"type": "error", "message": f"Internal server error: {str(e)}"})
+            return
         
-        # Perform detection
-        result = detector.detect(request.audioBase64, lang)
+        CLASSIFICATIONS.inc(result["classification"])
+        await _send_stream_message(websocket, {
+            "type": "verdict",
+            "classification": result["classification"],
+            "confidence": result["confidence"],
+            "explanation": result["explanation"],
+            "stream_time_sec": result["stream_time_sec"],
+            "window_sec": result["window_sec"]
+        })
+    
+    scoring = None
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes"):
+                due = session.push(message["bytes"])
+                # At most one window in flight; a busy stream skips to the newest window
+                if due and (scoring is None or scoring.done()):
+                    scoring = asyncio.create_task(score_and_send())
+            
+            elif message.get("text"):
+                try:
+                    command = json.loads(message["text"])
+                except ValueError:
+                    command = {}
+                if command.get("type") == "end":
+                    if scoring is not None:
+                        await scoring
+                    if session.ring.total_written >= session.min_samples:
+                        await score_and_send()
+                    await websocket.close()
+                    break
+    
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if scoring is not None and not scoring.done():
+            scoring.cancel()
+        logger.info(f"Stream closed after {session.stream_time_sec:.1f}s of audio")
+
+async def _send_stream_message(websocket: WebSocket, message: dict):
+    """
+    Send to a stream client unless it has gone; a verdict that finishes
+    after the disconnect is dropped instead of failing the scoring task
+    """
+    if websocket.client_state != WebSocketState.CONNECTED or websocket.application_state != WebSocketState.CONNECTED:
+        return
+    try:
+        await websocket.send_json(message)
+    except (WebSocketDisconnect, RuntimeError, OSError) as e:
+        logger.debug(f"Stream client gone before send: {type(e).__name__}")
+
+def _analysis_info(result: dict) -> Optional[AnalysisInfo]:
+    """
+    What the detector actually analysed, for the response
+    """
+    analysis = result.get("analysis")
+    if not analysis:
+        return None
+    return AnalysisInfo(
+        speechRatio=analysis.get("speech_ratio"),
+        analysedSec=analysis.get("analysed_sec"),
+        path=analysis.get("path"),
+        chunksEvaluated=analysis.get("chunks_evaluated"),
+        chunksTotal=analysis.get("chunks_total"),
+        coverage=analysis.get("coverage")
+    )
+
+async def _run_detection(lang: str, detect_fn, *args) -> VoiceDetectionResponse:
+    """
+    Run a detector call on the inference executor and build the response
+    """
+    try:
+        # Perform detection off the event loop
+        with STAGE_SECONDS.time("total"):
+            result = await inference_executor.run(detect_fn, *args)
+        CLASSIFICATIONS.inc(result["classification"])
         
         # Build response
         response = VoiceDetectionResponse(
@@ -149,20 +604,27 @@ async def voice_detection(
             language=lang,
             classification=result["classification"],
             confidenceScore=result["confidence"],
-            explanation=result["explanation"]
+            explanation=result["explanation"],
+            analysis=_analysis_info(result)
         )
         
         logger.info(f"Detection complete: {result['classification']} ({result['confidence']})")
         return response
     
     except AudioProcessingError as e:
+        ERRORS.inc(type(e).__name__)
         logger.error(f"Audio processing error: {str(e)}")
         raise HTTPException(
             status_code=400,
             detail=str(e)
         )
     
+    except HTTPException as e:
+        ERRORS.inc(type(e).__name__)
+        raise
+    
     except Exception as e:
+        ERRORS.inc(type(e).__name__)
         logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(
             status_code=500,
@@ -177,7 +639,8 @@ async def http_exception_handler(request, exc):
         content=ErrorResponse(
             status="error",
             message=exc.detail
-        ).dict()
+        ).dict(),
+        headers=getattr(exc, "headers", None)
     )
 
 @app.exception_handler(Exception)
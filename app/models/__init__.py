@@ -4,15 +4,32 @@ Contains all detection models and schemas
 """
 
 from app.models.schemas import (
+    AnalysisInfo,
     VoiceDetectionRequest,
     VoiceDetectionResponse,
-    ErrorResponse
+    BatchVoiceDetectionRequest,
+    BatchVoiceDetectionResponse,
+    BatchItemResult,
+    ErrorResponse,
+    ProfileRequest
 )
-from app.models.hf_detector import HuggingFaceDetector
 
 __all__ = [
+    "AnalysisInfo",
     "VoiceDetectionRequest",
     "VoiceDetectionResponse",
+    "BatchVoiceDetectionRequest",
+    "BatchVoiceDetectionResponse",
+    "BatchItemResult",
     "ErrorResponse",
+    "ProfileRequest",
     "HuggingFaceDetector",
 ]
+
+
+def __getattr__(name):
+    # The detector pulls in torch and transformers; import it only when used
+    if name == "HuggingFaceDetector":
+        from app.models.hf_detector import HuggingFaceDetector
+        return HuggingFaceDetector
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
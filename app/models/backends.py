@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import torch
+from loguru import logger
+
+from app.config import settings
+
+
+def artifact_path(backend: str, quantization: str = "none") -> str:
+    """
+    Location of an exported model in HF_MODEL_CACHE_DIR.
+    One artifact per model, backend and quantization mode.
+    """
+    model_dir = settings.HF_MODEL_NAME.replace("/", "--")
+    extension = "onnx" if backend == "onnx" else "pt"
+    return os.path.join(settings.HF_MODEL_CACHE_DIR, "exported", model_dir, f"{backend}-{quantization}.{extension}")
+
+
+def read_metadata(path: str) -> Optional[dict]:
+    """
+    Sidecar metadata written next to an exported artifact by app.models.export
+    """
+    try:
+        with open(path + ".json") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class EagerBackend:
+    """
+    Runs the transformers model directly
+    """
+
+    name = "eager"
+
+    def __init__(self, model: torch.nn.Module):
+        self.model = model
+
+    def __call__(self, inputs: Dict[str, torch.Tensor]) -> torch.Tensor:
+        return self.model(**inputs).logits
+
+
+class TorchScriptBackend:
+    """
+    Runs a frozen TorchScript graph exported from the model
+    """
+
+    name = "torchscript"
+
+    def __init__(self, path: str, input_names: List[str], device: str = "cpu"):
+        self.module = torch.jit.load(path, map_location=device)
+        self.module.eval()
+        self.input_names = input_names
+
+    def __call__(self, inputs: Dict[str, torch.Tensor]) -> torch.Tensor:
+        return self.module(*(inputs[name] for name in self.input_names))
+
+
+class OnnxBackend:
+    """
+    Runs an exported ONNX graph with onnxruntime on CPU.
+    The session is created on the first forward, in the process that
+    serves requests: onnxruntime is not fork-safe, and a session built in
+    the pre-fork parent would hand each worker a thread pool that does
+    not exist in it.
+    """
+
+    name = "onnx"
+
+    def __init__(self, path: str, input_names: List[str], num_threads: int = 0):
+        # Optional dependency, only needed for INFERENCE_BACKEND=onnx
+        import onnxruntime
+
+        self._onnxruntime = onnxruntime
+        self.path = path
+        self.input_names = input_names
+        self.num_threads = num_threads
+        self.session = None
+        # Forward threads can reach the first call together; only one may build the session
+        self._session_lock = threading.Lock()
+        # Open the graph once so a bad artifact fails here, where the caller falls back
+        # to eager; a single-threaded session starts no pool, and it is dropped at once
+        self._create_session(1)
+
+    def _create_session(self, num_threads: int):
+        options = self._onnxruntime.SessionOptions()
+        options.graph_optimization_level = self._onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        return self._onnxruntime.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+
+    def set_num_threads(self, num_threads: int):
+        # onnxruntime fixes its thread pool when the session is created, so rebuild on next use
+        with self._session_lock:
+            self.num_threads = max(1, num_threads)
+            self.session = None
+
+    def _get_session(self):
+        session = self.session
+        if session is None:
+            with self._session_lock:
+                if self.session is None:
+                    self.session = self._create_session(self.num_threads)
+                session = self.session
+        return session
+
+    def __call__(self, inputs: Dict[str, torch.Tensor]) -> torch.Tensor:
+        session = self._get_session()
+        feeds = {name: inputs[name].cpu().numpy() for name in self.input_names}
+        logits = session.run(["logits"], feeds)[0]
+        return torch.from_numpy(logits)
+
+
+def load_exported_backend(backend: str, quantization: str, device: str):
+    """
+    Load the exported artifact for the configured backend.
+    Returns None, with the reason logged, when the artifact is missing,
+    was exported from a different model, or cannot be loaded; the caller
+    then falls back to eager mode.
+    """
+    if backend == "onnx" and device != "cpu":
+        logger.warning("ONNX backend runs on CPU only, falling back to eager mode")
+        return None
+
+    path = artifact_path(backend, quantization)
+    metadata = read_metadata(path)
+    if not os.path.exists(path) or metadata is None:
+        logger.warning(
+            f"No {backend} export at {path}, falling back to eager mode "
+            f"(create it with: python -m app.models.export --backend {backend})"
+        )
+        return None
+    if metadata.get("model") != settings.HF_MODEL_NAME:
+        logger.warning(f"{path} was exported from {metadata.get('model')}, falling back to eager mode")
+        return None
+
+    try:
+        if backend == "torchscript":
+            loaded = TorchScriptBackend(path, metadata["input_names"], device)
+        elif backend == "onnx":
+            loaded = OnnxBackend(path, metadata["input_names"])
+        else:
+            raise ValueError(f"Unknown inference backend: {backend}")
+    except Exception as e:
+        logger.warning(f"Could not load {backend} export {path}: {str(e)}, falling back to eager mode")
+        return None
+
+    logger.info(f"Loaded {backend} export {path}")
+    return loaded
@@ -0,0 +1,147 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Sequence
+
+from loguru import logger
+
+
+class MicroBatcher:
+    """
+    Dynamic micro-batching scheduler for model forward passes.
+    Items submitted from concurrent requests are gathered until either
+    max_batch_size items are pending or max_wait_ms has passed since the
+    first one arrived, then run through forward_fn in a single call.
+    forward_fn takes a list of items and returns one result per item.
+    """
+
+    def __init__(
+        self,
+        forward_fn: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        name: str = "model-batcher"
+    ):
+        self.forward_fn = forward_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+        self._batches = 0
+        self._items = 0
+        self._max_seen = 0
+        self._size_counts: Dict[int, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_batch_size > 1
+
+    def submit(self, item: Any) -> Future:
+        """
+        Queue a single item, returning a Future for its result
+        """
+        future = Future()
+        if not self.enabled:
+            # Batching disabled: run inline on the caller's thread
+            try:
+                result = self.forward_fn([item])[0]
+                self._record(1)
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        self._ensure_started()
+        self._queue.put((item, future))
+        return future
+
+    def map(self, items: List[Any]) -> List[Any]:
+        """
+        Submit several items and block until all results are available
+        """
+        futures = [self.submit(item) for item in items]
+        return [f.result() for f in futures]
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    # Drain anything already waiting even once the deadline passed
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+
+            self._execute(batch)
+            if stop:
+                return
+
+    def _execute(self, batch: List[tuple]):
+        items = [item for item, _ in batch]
+        futures = [future for _, future in batch]
+        try:
+            results = self.forward_fn(items)
+        except Exception as e:
+            logger.error(f"Batched forward failed for {len(items)} items: {str(e)}")
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        self._record(len(items))
+        for future, result in zip(futures, results):
+            future.set_result(result)
+
+    def _record(self, size: int):
+        self._batches += 1
+        self._items += size
+        self._max_seen = max(self._max_seen, size)
+        self._size_counts[size] = self._size_counts.get(size, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self._batches,
+            "items": self._items,
+            "mean_batch_size": round(self._items / self._batches, 3) if self._batches else 0.0,
+            "largest_batch": self._max_seen,
+            "batch_size_counts": dict(sorted(self._size_counts.items())),
+            "pending": self._queue.qsize(),
+        }
+
+    def close(self):
+        """
+        Stop the scheduler thread after the items already queued are served
+        """
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,154 @@
+"""
+Export the classification model to a TorchScript or ONNX artifact
+
+The model behind HF_MODEL_NAME is loaded in eager mode, with QUANTIZATION
+applied, and written to HF_MODEL_CACHE_DIR/exported/. Both the batch and
+the sequence-length axes stay dynamic. Before the artifact replaces any
+earlier one, it is checked against eager logits at a batch size and clip
+length different from the ones used to export it.
+
+    python -m app.models.export --backend torchscript
+    python -m app.models.export --backend onnx
+"""
+
+import argparse
+import json
+import os
+from typing import List, Tuple
+
+import numpy as np
+import torch
+from loguru import logger
+from transformers import AutoFeatureExtractor, AutoModelForAudioClassification
+
+from app.config import settings
+from app.models.backends import OnnxBackend, TorchScriptBackend, artifact_path
+from app.models.quantization import quantize_model
+
+
+class LogitsModule(torch.nn.Module):
+    """
+    The classifier as a plain tensors-in, logits-out module
+    """
+
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_values: torch.Tensor, attention_mask: torch.Tensor = None) -> torch.Tensor:
+        # Loaded with torchscript=True, so outputs are tuples with the logits first
+        return self.model(input_values=input_values, attention_mask=attention_mask)[0]
+
+
+def _example_inputs(feature_extractor, lengths_sec: List[float]) -> dict:
+    sr = feature_extractor.sampling_rate
+    rng = np.random.default_rng(0)
+    clips = [(0.1 * rng.standard_normal(int(seconds * sr))).astype(np.float32) for seconds in lengths_sec]
+    return feature_extractor(clips, sampling_rate=sr, return_tensors="pt", padding=True)
+
+
+def _export_torchscript(module: LogitsModule, example: Tuple[torch.Tensor, ...], path: str):
+    with torch.no_grad():
+        traced = torch.jit.trace(module, example, check_trace=False)
+    traced = torch.jit.freeze(traced.eval())
+    torch.jit.save(traced, path)
+
+
+def _export_onnx(module: LogitsModule, example: Tuple[torch.Tensor, ...], input_names: List[str], path: str):
+    dynamic_axes = {name: {0: "batch", 1: "samples"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+    with torch.no_grad():
+        torch.onnx.export(
+            module,
+            example,
+            path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=17
+        )
+
+
+def export_model(backend: str, quantization: str = "none", tolerance: float = 1e-3) -> str:
+    """
+    Export, verify and install an artifact; returns its path
+    """
+    if backend not in ("torchscript", "onnx"):
+        raise ValueError(f"Unknown export backend: {backend}")
+    if backend == "onnx" and quantization != "none":
+        raise ValueError("ONNX export supports QUANTIZATION=none only; quantized Linear layers do not export to ONNX")
+
+    feature_extractor = AutoFeatureExtractor.from_pretrained(
+        settings.HF_MODEL_NAME,
+        cache_dir=settings.HF_MODEL_CACHE_DIR
+    )
+    model = AutoModelForAudioClassification.from_pretrained(
+        settings.HF_MODEL_NAME,
+        cache_dir=settings.HF_MODEL_CACHE_DIR,
+        torchscript=True
+    )
+    model.eval()
+    model = quantize_model(model, quantization, "cpu")
+    module = LogitsModule(model).eval()
+
+    uses_mask = bool(getattr(feature_extractor, "return_attention_mask", False))
+    input_names = ["input_values", "attention_mask"] if uses_mask else ["input_values"]
+
+    example_inputs = _example_inputs(feature_extractor, [2.0])
+    example = tuple(example_inputs[name] for name in input_names)
+
+    path = artifact_path(backend, quantization)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    logger.info(f"Exporting {settings.HF_MODEL_NAME} to {backend} ({quantization})...")
+    try:
+        if backend == "torchscript":
+            _export_torchscript(module, example, tmp_path)
+            exported = TorchScriptBackend(tmp_path, input_names)
+        else:
+            _export_onnx(module, example, input_names, tmp_path)
+            exported = OnnxBackend(tmp_path, input_names)
+
+        # Shapes the export never saw: catches lengths or batch sizes baked into the graph
+        check_inputs = _example_inputs(feature_extractor, [3.3, 1.7] if uses_mask else [3.3, 3.3])
+        with torch.inference_mode():
+            expected = module(*(check_inputs[name] for name in input_names))
+            actual = exported(check_inputs)
+        max_delta = float((expected.float() - actual.float()).abs().max())
+        if max_delta > tolerance:
+            raise RuntimeError(f"Exported {backend} logits differ from eager by {max_delta:.2e} (tolerance {tolerance:.0e})")
+
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    metadata = {
+        "model": settings.HF_MODEL_NAME,
+        "revision": getattr(model.config, "_commit_hash", None),
+        "backend": backend,
+        "quantization": quantization,
+        "input_names": input_names,
+        "torch_version": torch.__version__,
+        "max_logit_delta": max_delta
+    }
+    with open(path + ".json", "w") as f:
+        json.dump(metadata, f, indent=2)
+
+    logger.info(f"Exported {backend} model to {path} (max logit delta vs eager: {max_delta:.2e})")
+    return path
+
+
+def main():
+    default_backend = settings.INFERENCE_BACKEND if settings.INFERENCE_BACKEND != "eager" else "torchscript"
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["torchscript", "onnx"], default=default_backend)
+    parser.add_argument("--quantization", choices=["none", "dynamic_int8"], default=settings.QUANTIZATION)
+    parser.add_argument("--tolerance", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    print(export_model(args.backend, args.quantization, args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,24 @@
 import torch
-import torchaudio
 import numpy as np
-from transformers import AutoFeatureExtractor, AutoModelForAudioClassification
-from typing import Dict, Tuple, List
+from transformers import AutoConfig, AutoFeatureExtractor, AutoModelForAudioClassification
+from typing import Dict, Tuple, List, Optional
 from loguru import logger
+from app import __version__ as app_version
 from app.config import settings
 from app.utils.audio_processor import AudioProcessor
+from app.utils.spectral_pool import SpectralPool
+from app.models.batcher import MicroBatcher
+from app.models.quantization import quantize_model
+from app.models.backends import EagerBackend, load_exported_backend
+from app.models.snapshot import load_snapshot
+from app.core.cache import VerdictCache
+from app.core.metrics import AUDIO_SECONDS, CHUNKS, DETECTION_PATHS, STAGE_SECONDS, metrics_suppressed
+from app.core.tracing import activate, current_trace, deactivate, span
 from concurrent.futures import ThreadPoolExecutor
-import asyncio
+from collections import defaultdict, deque
+from functools import partial
+import math
+import time
 
 class HuggingFaceDetector:
     """
@@ -16,16 +27,84 @@ class HuggingFaceDetector:
     Optimized for faster processing with chunked inference
     """
     
-    def __init__(self):
+    # Bump when scoring changes verdicts for the same model output (_classify,
+    # the spectral features or compute_ai_score) so cached verdicts are not reused
+    SCORING_VERSION = 1
+    
+    # Model-agnostic label matching
+    AI_KEYWORDS = ["fake", "spoof", "ai", "generated", "synthetic", "deepfake", "ai-generated", "ai_generated"]
+    HUMAN_KEYWORDS = ["real", "human", "genuine", "authentic", "bonafide", "natural"]
+    
+    def __init__(self, start_services: bool = True):
+        """
+        Load the model, and unless start_services is False also start the
+        batcher, pools and cache. The pre-fork server loads in the parent
+        with start_services=False and calls start_services() in each
+        worker, since threads and process pools do not survive fork.
+        """
         self.device = "cuda" if torch.cuda.is_available() and settings.USE_GPU else "cpu"
         logger.info(f"Using device: {self.device}")
         
         self.audio_processor = AudioProcessor()
         self.feature_extractor = None
         self.model = None
+        self.config = None
+        self.backend = None
         self.use_half = settings.USE_HALF_PRECISION and self.device == "cuda"
         
         self._load_model()
+        
+        if start_services:
+            self.start_services()
+    
+    def start_services(self):
+        """
+        Start the threads, process pools and cache that serve requests
+        """
+        # Chunks from concurrent requests share forward passes through the batcher
+        self.batcher = MicroBatcher(
+            partial(self._forward_batch, target_sr=self.feature_extractor.sampling_rate),
+            max_batch_size=settings.BATCH_MAX_SIZE,
+            max_wait_ms=settings.BATCH_MAX_WAIT_MS
+        )
+        
+        # Spectral analysis runs alongside the model forward when workers are set
+        self.spectral_pool = SpectralPool(settings.SPECTRAL_WORKERS)
+        
+        # Identical clips reuse earlier verdicts
+        self.cache = VerdictCache(settings.VERDICT_CACHE_SIZE, settings.VERDICT_CACHE_DIR, settings.VERDICT_CACHE_TTL_SEC)
+        self.cache_namespace = self._cache_namespace()
+    
+    def _cache_namespace(self) -> str:
+        """
+        Everything besides the audio, language and request options that
+        changes the verdict. The disk tier outlives restarts and deploys,
+        so code and settings are part of it along with the model.
+        """
+        model_revision = getattr(self.config, "_commit_hash", None) or "local"
+        parts = [
+            f"{settings.HF_MODEL_NAME}@{model_revision}",
+            f"scoring={app_version}/{self.SCORING_VERSION}",
+            f"pitch={settings.PITCH_ESTIMATOR}",
+            f"quant={settings.QUANTIZATION}",
+            f"backend={self.backend.name}",
+            f"half={self.use_half}",
+            f"chunk={settings.CHUNK_DURATION_SEC}",
+        ]
+        if settings.CASCADE_ENABLED:
+            parts.append("cascade")
+        if settings.EARLY_EXIT_ENABLED:
+            # Rounds are one forward batch, so the batch size changes where scoring stops
+            parts.append(
+                f"early_exit={settings.EARLY_EXIT_ORDER}/{settings.EARLY_EXIT_MARGIN}"
+                f"/{settings.EARLY_EXIT_MIN_CHUNKS}/{settings.BATCH_MAX_SIZE}"
+            )
+        if settings.VAD_ENABLED:
+            parts.append(
+                f"vad={settings.VAD_ENERGY_THRESHOLD}/{settings.VAD_FRAME_MS}/{settings.VAD_MIN_SILENCE_SEC}"
+                f"/{settings.VAD_PAD_SEC}/{settings.VAD_KEEP_SILENCE_RATIO}"
+            )
+        return "|".join(parts)
     
     def _load_model(self):
         """
@@ -34,40 +113,116 @@ class HuggingFaceDetector:
         try:
             logger.info(f"Loading Hugging Face model: {settings.HF_MODEL_NAME}...")
             
-            # Load feature extractor and model
-            self.feature_extractor = AutoFeatureExtractor.from_pretrained(
-                settings.HF_MODEL_NAME,
-                cache_dir=settings.HF_MODEL_CACHE_DIR
-            )
+            # A snapshot (python -m app.models.snapshot) maps ready-to-run weights without copying
+            snapshot = None
+            if settings.MODEL_SNAPSHOT_DIR and settings.INFERENCE_BACKEND == "eager":
+                snapshot = load_snapshot(settings.MODEL_SNAPSHOT_DIR, settings.QUANTIZATION)
             
-            self.model = AutoModelForAudioClassification.from_pretrained(
-                settings.HF_MODEL_NAME,
-                cache_dir=settings.HF_MODEL_CACHE_DIR
-            ).to(self.device)
+            # Load feature extractor and model
+            if snapshot is not None:
+                self.feature_extractor, self.model = snapshot
+            else:
+                self.feature_extractor = AutoFeatureExtractor.from_pretrained(
+                    settings.HF_MODEL_NAME,
+                    cache_dir=settings.HF_MODEL_CACHE_DIR
+                )
+            
+            # An exported graph replaces the eager model when one is configured and usable
+            if settings.INFERENCE_BACKEND != "eager":
+                self.backend = load_exported_backend(settings.INFERENCE_BACKEND, settings.QUANTIZATION, self.device)
+            
+            if self.backend is not None:
+                # Exported graphs carry their own weights and precision; only the config (labels) is needed
+                self.use_half = False
+                self.config = AutoConfig.from_pretrained(
+                    settings.HF_MODEL_NAME,
+                    cache_dir=settings.HF_MODEL_CACHE_DIR
+                )
+            else:
+                # A snapshot model is already in eval mode and quantized
+                if self.model is None:
+                    self.model = AutoModelForAudioClassification.from_pretrained(
+                        settings.HF_MODEL_NAME,
+                        cache_dir=settings.HF_MODEL_CACHE_DIR
+                    )
+                    # Set model to eval mode before quantizing so the swapped layers inherit it
+                    self.model.eval()
+                    self.model = quantize_model(self.model, settings.QUANTIZATION, self.device)
+                
+                self.model = self.model.to(self.device)
+                
+                # Enable half precision for faster GPU inference
+                if self.use_half:
+                    self.model = self.model.half()
+                    logger.info("Using FP16 half precision for faster inference")
+                
+                self.config = self.model.config
+                self.backend = EagerBackend(self.model)
             
-            # Enable half precision for faster GPU inference
-            if self.use_half:
-                self.model = self.model.half()
-                logger.info("Using FP16 half precision for faster inference")
+            # Extractors without attention masks (e.g. wav2vec2-base) would score
+            # zero-padded audio differently, so only equal-length chunks share a batch
+            self.pads_with_mask = bool(getattr(self.feature_extractor, "return_attention_mask", False))
             
-            # Set model to eval mode and enable inference optimizations
-            self.model.eval()
+            # Enable inference optimizations
             if hasattr(torch, 'inference_mode'):
                 logger.info("PyTorch inference optimizations enabled")
             
-            logger.info("Model loaded successfully!")
-            logger.info(f"Model Labels: {self.model.config.id2label}")
+            logger.info(f"Model loaded successfully! Backend: {self.backend.name}")
+            logger.info(f"Model Labels: {self.config.id2label}")
             
         except Exception as e:
             logger.error(f"Failed to load Hugging Face model: {str(e)}")
             raise
     
-    def _process_chunk(self, audio_chunk: np.ndarray, target_sr: int) -> Tuple[int, float, dict]:
+    def set_num_threads(self, num_threads: int):
         """
-        Process a single audio chunk and return prediction with all class probabilities
+        Limit torch intra-op threads so concurrent detections don't oversubscribe the CPU
+        """
+        if self.device == "cpu":
+            torch.set_num_threads(max(1, num_threads))
+            if hasattr(self.backend, "set_num_threads"):
+                self.backend.set_num_threads(num_threads)
+            logger.info(f"Torch intra-op threads: {torch.get_num_threads()}")
+    
+    def warmup(self, lengths_sec: List[float]):
+        """
+        Run synthetic clips through the full pipeline so one-off costs
+        (kernel selection, allocator growth, librosa's lazy imports and
+        caches) are paid before the first real request. The clips are
+        not traffic, so they record no metrics and no trace.
+        """
+        sr = self.feature_extractor.sampling_rate
+        rng = np.random.default_rng(0)
+        token = activate(None)
+        try:
+            with metrics_suppressed():
+                for seconds in lengths_sec:
+                    t = np.arange(int(seconds * sr)) / sr
+                    audio = (0.3 * np.sin(2 * np.pi * 150 * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+                    start = time.perf_counter()
+                    # The cascade would settle these synthetic clips without a forward pass
+                    self.detect_audio(audio, "English", cascade=False)
+                    logger.info(f"Warmup {seconds:g}s clip: {time.perf_counter() - start:.2f}s")
+        finally:
+            deactivate(token)
+    
+    def _forward_batch(self, chunks: List[np.ndarray], target_sr: int) -> np.ndarray:
         """
+        Run one padded forward pass over several chunks and return
+        per-chunk softmax probabilities with shape (n_chunks, n_labels)
+        """
+        if not self.pads_with_mask and len({len(c) for c in chunks}) > 1:
+            # Split into equal-length groups so no chunk is scored with padding
+            probabilities = np.empty((len(chunks), len(self.config.id2label)), dtype=np.float32)
+            groups = defaultdict(list)
+            for i, chunk in enumerate(chunks):
+                groups[len(chunk)].append(i)
+            for indices in groups.values():
+                probabilities[indices] = self._forward_batch([chunks[i] for i in indices], target_sr)
+            return probabilities
+        
         inputs = self.feature_extractor(
-            audio_chunk,
+            chunks,
             sampling_rate=target_sr,
             return_tensors="pt",
             padding=True
@@ -77,16 +232,44 @@ class HuggingFaceDetector:
             inputs = {k: v.half() if v.dtype == torch.float32 else v for k, v in inputs.items()}
         
         with torch.inference_mode():
-            logits = self.model(**inputs).logits
-            probabilities = torch.nn.functional.softmax(logits, dim=-1)
-            predicted_id = torch.argmax(probabilities, dim=-1).item()
-            confidence = probabilities[0][predicted_id].item()
-            # Get all probabilities for each label
-            all_probs = {self.model.config.id2label[i]: probabilities[0][i].item() 
-                        for i in range(len(self.model.config.id2label))}
+            logits = self.backend(inputs)
+            probabilities = torch.nn.functional.softmax(logits.float(), dim=-1)
+        
+        return probabilities.cpu().numpy()
+    
+    def _process_chunk(self, audio_chunk: np.ndarray, target_sr: int) -> Tuple[int, float, dict]:
+        """
+        Process a single audio chunk and return prediction with all class probabilities
+        """
+        probabilities = self.batcher.submit(audio_chunk).result()
+        predicted_id = int(np.argmax(probabilities))
+        confidence = float(probabilities[predicted_id])
+        # Get all probabilities for each label
+        all_probs = {self.config.id2label[i]: float(probabilities[i])
+                    for i in range(len(self.config.id2label))}
         
         return predicted_id, confidence, all_probs
     
+    def _aggregate_chunks(self, chunk_probs: np.ndarray) -> Tuple[int, float, dict]:
+        """
+        Combine per-chunk probabilities (n_chunks, n_labels) with a
+        confidence-weighted majority vote and averaged probabilities
+        """
+        n_chunks, n_labels = chunk_probs.shape
+        predictions = chunk_probs.argmax(axis=1)
+        confidences = chunk_probs[np.arange(n_chunks), predictions]
+        
+        # Aggregate: use majority vote weighted by confidence
+        weighted_votes = np.bincount(predictions, weights=confidences, minlength=n_labels)
+        predicted_id = int(np.argmax(weighted_votes))
+        confidence = float(confidences[predictions == predicted_id].mean())
+        
+        # Average probabilities across chunks
+        mean_probs = chunk_probs.mean(axis=0)
+        avg_probs = {self.config.id2label[i]: float(mean_probs[i]) for i in range(n_labels)}
+        
+        return predicted_id, confidence, avg_probs
+    
     def _chunk_audio(self, audio: np.ndarray, sr: int, chunk_duration: float) -> List[np.ndarray]:
         """
         Split audio into chunks for faster processing
@@ -101,204 +284,465 @@ class HuggingFaceDetector:
         
         return chunks if chunks else [audio]
     
-    def detect(self, audio_base64: str, language: str) -> Dict[str, any]:
+    @staticmethod
+    def _chunk_order(n_chunks: int, order: str) -> List[int]:
+        """
+        Order in which early exit scores chunks. "spread" takes both ends,
+        then the midpoints of the remaining gaps breadth first, so every
+        prefix covers the whole recording
+        """
+        if order == "sequential" or n_chunks <= 2:
+            return list(range(n_chunks))
+        ordered = [0, n_chunks - 1]
+        gaps = deque([(0, n_chunks - 1)])
+        while gaps:
+            lo, hi = gaps.popleft()
+            if hi - lo < 2:
+                continue
+            mid = (lo + hi) // 2
+            ordered.append(mid)
+            gaps.extend([(lo, mid), (mid, hi)])
+        return ordered
+    
+    @staticmethod
+    def _vote_settled(chunk_probs: np.ndarray, remaining: int, margin: float) -> bool:
+        """
+        Whether the weighted vote over the scored chunks (n_scored, n_labels)
+        keeps its leader once the remaining chunks are scored. Those are
+        assumed to vote like the scored ones on average, except that a
+        margin share of them vote for the runner-up with full weight. With
+        margin 1.0 this is the worst case, so the vote never changes.
+        """
+        n_scored, n_labels = chunk_probs.shape
+        predictions = chunk_probs.argmax(axis=1)
+        confidences = chunk_probs[np.arange(n_scored), predictions]
+        votes = np.bincount(predictions, weights=confidences, minlength=n_labels)
+        
+        leader = int(np.argmax(votes))
+        runner_up = int(np.argmax(np.where(np.arange(n_labels) == leader, -np.inf, votes)))
+        against = min(remaining, math.ceil(margin * remaining))
+        typical = remaining - against
+        
+        # Running mean vote per chunk stands in for the unscored chunks
+        mean_votes = votes / n_scored
+        leader_final = votes[leader] + typical * mean_votes[leader]
+        runner_up_final = votes[runner_up] + typical * mean_votes[runner_up] + against
+        return bool(leader_final > runner_up_final)
+    
+    def _score_chunks_progressive(self, chunks: List[np.ndarray]) -> Tuple[List[int], np.ndarray]:
+        """
+        Score chunks one forward batch at a time in EARLY_EXIT_ORDER and
+        stop once the weighted vote is settled. Returns the indices of the
+        chunks scored and their probabilities, in scoring order
+        """
+        order = self._chunk_order(len(chunks), settings.EARLY_EXIT_ORDER)
+        step = max(1, settings.BATCH_MAX_SIZE)
+        scored = []
+        for start in range(0, len(order), step):
+            scored.extend(self.batcher.map([chunks[i] for i in order[start:start + step]]))
+            remaining = len(order) - len(scored)
+            if (
+                remaining
+                and len(scored) >= settings.EARLY_EXIT_MIN_CHUNKS
+                and self._vote_settled(np.stack(scored), remaining, settings.EARLY_EXIT_MARGIN)
+            ):
+                break
+        return order[:len(scored)], np.stack(scored)
+    
+    def detect(
+        self,
+        audio_base64: str,
+        language: str,
+        audio_format: str = "mp3",
+        sample_rate: Optional[int] = None,
+        max_analysis_sec: Optional[float] = None
+    ) -> Dict[str, any]:
         """
         Main detection function using Hugging Face model
         Optimized with chunked processing for large files
         """
-        try:
-            logger.info(f"HF Detection started for language: {language}")
-            
-            # Decode audio
+        # Decode audio
+        with STAGE_SECONDS.time("base64_decode"), span("base64_decode"):
             audio_bytes = self.audio_processor.decode_base64_audio(audio_base64)
-            
-            # Load audio
-            target_sr = self.feature_extractor.sampling_rate if self.feature_extractor else 16000
-            audio, sr = self.audio_processor.load_audio(audio_bytes, sr=target_sr)
-            
-            # Validate
-            self.audio_processor.validate_audio(audio)
-            
-            # Determine if chunked processing is needed (for files > 30 seconds)
-            duration = len(audio) / target_sr
-            logger.info(f"Audio duration: {duration:.2f}s")
-            
-            if duration > settings.CHUNK_DURATION_SEC:
-                # Use chunked processing for long audio
-                chunks = self._chunk_audio(audio, target_sr, settings.CHUNK_DURATION_SEC)
-                logger.info(f"Processing {len(chunks)} chunks for faster inference")
-                
-                # Process chunks and aggregate results
-                predictions = []
-                confidences = []
-                all_probs_list = []
-                
-                for i, chunk in enumerate(chunks):
-                    pred_id, conf, probs = self._process_chunk(chunk, target_sr)
-                    predictions.append(pred_id)
-                    confidences.append(conf)
-                    all_probs_list.append(probs)
-                    logger.debug(f"Chunk {i+1}/{len(chunks)}: pred={pred_id}, conf={conf:.3f}, probs={probs}")
-                
-                # Aggregate: use majority vote weighted by confidence
-                from collections import Counter
-                weighted_votes = Counter()
-                for pred_id, conf in zip(predictions, confidences):
-                    weighted_votes[pred_id] += conf
-                
-                predicted_id = weighted_votes.most_common(1)[0][0]
-                confidence = sum(c for p, c in zip(predictions, confidences) if p == predicted_id) / len([p for p in predictions if p == predicted_id])
-                # Average probabilities across chunks
-                avg_probs = {}
-                for key in all_probs_list[0].keys():
-                    avg_probs[key] = sum(p[key] for p in all_probs_list) / len(all_probs_list)
-            else:
-                # Process entire audio at once for short files
-                predicted_id, confidence, avg_probs = self._process_chunk(audio, target_sr)
-                
-            # Map label
-            label = self.model.config.id2label[predicted_id]
-            logger.info(f"Predicted Label: {label}, Confidence: {confidence}, All Probs: {avg_probs}")
-            
-            # ===== SPECTRAL ANALYSIS (Secondary Detection) =====
-            spectral_features = self.audio_processor.analyze_spectral_features(audio, target_sr)
+        
+        return self.detect_bytes(audio_bytes, language, audio_format, sample_rate, max_analysis_sec)
+    
+    def detect_bytes(
+        self,
+        audio_bytes: bytes,
+        language: str,
+        audio_format: str = "mp3",
+        sample_rate: Optional[int] = None,
+        max_analysis_sec: Optional[float] = None
+    ) -> Dict[str, any]:
+        """
+        Detect from encoded audio bytes, serving repeated clips from the verdict cache
+        """
+        try:
+            budget = self._analysis_budget(max_analysis_sec)
+            detect_fn = partial(self._detect_bytes, audio_bytes, language, audio_format, sample_rate, budget)
+            if not self.cache.enabled:
+                return detect_fn()
+            
+            # Raw PCM bytes only mean something together with their format and rate
+            namespace = f"{self.cache_namespace}|{audio_format}@{sample_rate}"
+            if budget:
+                namespace += f"|budget={budget}"
+            key = self.cache.make_key(audio_bytes, namespace, language)
+            return self.cache.get_or_compute(key, detect_fn)
+        
+        except Exception as e:
+            logger.error(f"HF Detection error: {str(e)}")
+            raise
+    
+    def _detect_bytes(
+        self,
+        audio_bytes: bytes,
+        language: str,
+        audio_format: str,
+        sample_rate: Optional[int],
+        max_analysis_sec: Optional[float] = None
+    ) -> Dict[str, any]:
+        """
+        Decode and validate audio bytes, then run detection on the waveform
+        """
+        # Load audio; resampling is skipped when the rate already matches the extractor
+        target_sr = self.feature_extractor.sampling_rate if self.feature_extractor else 16000
+        with STAGE_SECONDS.time("audio_decode"), span("audio_decode"):
+            audio, sr = self.audio_processor.load_audio(audio_bytes, sr=target_sr, audio_format=audio_format, sample_rate=sample_rate)
+        
+        # Validate
+        self.audio_processor.validate_audio(audio)
+        
+        return self.detect_audio(audio, language, max_analysis_sec)
+    
+    @staticmethod
+    def _analysis_budget(max_analysis_sec: Optional[float]) -> Optional[float]:
+        """
+        Seconds of audio to analyse at most: the tighter of ANALYSIS_BUDGET_SEC
+        and the request's limit, or None for everything
+        """
+        budgets = [b for b in (settings.ANALYSIS_BUDGET_SEC, max_analysis_sec) if b]
+        return min(budgets) if budgets else None
+    
+    def detect_audio(
+        self,
+        audio: np.ndarray,
+        language: str,
+        max_analysis_sec: Optional[float] = None,
+        cascade: bool = True
+    ) -> Dict[str, any]:
+        """
+        Run model and spectral analysis on a waveform already at the
+        feature extractor's sampling rate. cascade=False always runs the
+        model, even when CASCADE_ENABLED would settle the clip without it.
+        """
+        cascade = cascade and settings.CASCADE_ENABLED
+        target_sr = self.feature_extractor.sampling_rate if self.feature_extractor else 16000
+        
+        duration = len(audio) / target_sr
+        AUDIO_SECONDS.inc(amount=duration)
+        trace = current_trace()
+        if trace is not None:
+            trace.event("audio", language=language, duration_sec=duration, sample_rate=target_sr)
+        
+        # Over the analysis budget, both stages see only sampled windows, each one model chunk
+        budget = self._analysis_budget(max_analysis_sec)
+        chunk_sec, coverage = settings.CHUNK_DURATION_SEC, 1.0
+        if budget and duration > budget:
+            with STAGE_SECONDS.time("sampling"), span("sampling"):
+                audio, chunk_sec = self.audio_processor.sample_windows(audio, target_sr, budget, settings.CHUNK_DURATION_SEC)
+            coverage = len(audio) / target_sr / duration
+            if trace is not None:
+                trace.event("sampling", budget_sec=budget, window_sec=chunk_sec, coverage=coverage)
+        
+        # Drop silence first so neither stage spends time on it
+        speech, speech_ratio = audio, None
+        if settings.VAD_ENABLED:
+            with STAGE_SECONDS.time("vad"), span("vad"):
+                speech, speech_ratio = self.audio_processor.trim_silence(audio, target_sr)
+        analysed_sec = len(speech) / target_sr
+        
+        # Start the spectral stage first so it overlaps with the model forward
+        spectral = self.spectral_pool.submit(speech, target_sr)
+        
+        path = "full"
+        if cascade:
+            # Cascade: wait for the spectral verdict and skip the model when
+            # no model output could change the classification
+            spectral_features, spectral_ai_score = self._spectral_result(spectral, audio, speech, target_sr)
+            result = self._spectral_decision(spectral_features, spectral_ai_score)
+            if result is not None:
+                path = "spectral_only"
+                if trace is not None:
+                    trace.event("spectral", score=spectral_ai_score, features=spectral_features)
+                    trace.event("cascade", path=path)
+                return self._finish(result, path, speech_ratio, analysed_sec, coverage, chunks_evaluated=0)
+        
+        # Determine if chunked processing is needed (for files > 30 seconds)
+        if analysed_sec > settings.CHUNK_DURATION_SEC:
+            # Use chunked processing for long audio
+            with STAGE_SECONDS.time("chunking"), span("chunking"):
+                chunks = self._chunk_audio(speech, target_sr, chunk_sec)
+            
+            # Score every chunk in one batched pass; the batcher splits it into
+            # BATCH_MAX_SIZE mini-batches to bound memory. Early exit instead
+            # scores a batch at a time and stops once the vote is settled
+            with STAGE_SECONDS.time("model_forward"), span("model_forward"):
+                if settings.EARLY_EXIT_ENABLED:
+                    scored, chunk_probs = self._score_chunks_progressive(chunks)
+                else:
+                    scored, chunk_probs = list(range(len(chunks))), np.stack(self.batcher.map(chunks))
+            predicted_id, confidence, avg_probs = self._aggregate_chunks(chunk_probs)
+            chunks_evaluated, chunks_total = len(scored), len(chunks)
+            CHUNKS.inc("scored", amount=chunks_evaluated)
+            CHUNKS.inc("skipped", amount=chunks_total - chunks_evaluated)
+            if trace is not None:
+                trace.event("chunks", count=chunks_total, scored=scored, probs=chunk_probs)
+        else:
+            # Process entire audio at once for short files
+            with STAGE_SECONDS.time("model_forward"), span("model_forward"):
+                predicted_id, confidence, avg_probs = self._process_chunk(speech, target_sr)
+            chunks_evaluated = chunks_total = 1
+            
+        # Map label
+        label = self.config.id2label[predicted_id]
+        
+        # ===== SPECTRAL ANALYSIS (Secondary Detection) =====
+        if not cascade:
+            spectral_features, spectral_ai_score = self._spectral_result(spectral, audio, speech, target_sr)
+        if trace is not None:
+            trace.event("model", label=label, confidence=confidence, probs=avg_probs)
+            trace.event("spectral", score=spectral_ai_score, features=spectral_features)
+        
+        result = self._classify(label, confidence, avg_probs, spectral_features, spectral_ai_score)
+        return self._finish(result, path, speech_ratio, analysed_sec, coverage, chunks_evaluated, chunks_total)
+    
+    def _spectral_result(
+        self,
+        spectral,
+        audio: np.ndarray,
+        speech: np.ndarray,
+        target_sr: int
+    ) -> Tuple[Dict[str, float], float]:
+        """
+        Collect the spectral stage; when VAD trimmed the audio, silence_ratio
+        is optionally measured on the original instead
+        """
+        spectral_features, spectral_ai_score = self.spectral_pool.result(spectral, speech, target_sr)
+        if speech is not audio and settings.VAD_KEEP_SILENCE_RATIO:
+            # The trimmed audio has almost no pauses; score the original pause share instead
+            spectral_features = {**spectral_features, "silence_ratio": self.audio_processor.silence_ratio(audio)}
             spectral_ai_score = self.audio_processor.compute_ai_score(spectral_features)
-            logger.info(f"Spectral AI Score: {spectral_ai_score:.2%}")
-            logger.debug(f"Spectral Features: {spectral_features}")
-            
-            # Model-agnostic AI detection logic
-            ai_keywords = ["fake", "spoof", "ai", "generated", "synthetic", "deepfake", "ai-generated", "ai_generated"]
-            human_keywords = ["real", "human", "genuine", "authentic", "bonafide", "natural"]
-            
-            ai_prob = 0.0
-            human_prob = 0.0
-            label_lower = label.lower()
-            
-            for lbl, prob in avg_probs.items():
-                lbl_lower = lbl.lower()
-                if any(kw in lbl_lower for kw in ai_keywords):
-                    ai_prob += prob
-                elif any(kw in lbl_lower for kw in human_keywords):
-                    human_prob += prob
-            
-            logger.info(f"Model AI prob: {ai_prob:.4f}, Human prob: {human_prob:.4f}")
-            
-            is_ai_label = any(kw in label_lower for kw in ai_keywords)
-            
-            # ===== ENHANCED MULTI-SIGNAL DETECTION =====
-            # Modern AI voices are very good - we need aggressive detection
-            ai_signals = []
+        return spectral_features, spectral_ai_score
+    
+    def _spectral_decision(self, spectral_features: Dict[str, float], spectral_ai_score: float) -> Optional[Dict[str, any]]:
+        """
+        The verdict when the spectral evidence alone settles it, else None.
+        Model evidence only ever raises the combined AI score and adds AI
+        signals, so the verdict with the most human model output possible
+        (human label, human probability 1.0) is a floor: if even that is
+        AI_GENERATED, every model output is. Its confidence is likewise a
+        lower bound on the full pipeline's.
+        """
+        human_labels = [
+            label for label in self.config.id2label.values()
+            if any(kw in label.lower() for kw in self.HUMAN_KEYWORDS)
+            and not any(kw in label.lower() for kw in self.AI_KEYWORDS)
+        ]
+        if not human_labels:
+            return None
+        
+        result = self._classify(human_labels[0], 1.0, {human_labels[0]: 1.0}, spectral_features, spectral_ai_score)
+        if result["classification"] != "AI_GENERATED":
+            return None
+        
+        # No model ran; don't report the hypothetical model output
+        details = result["details"]
+        for key in ("model_label", "model_confidence", "ai_probability", "human_probability"):
+            details[key] = None
+        return result
+    
+    @staticmethod
+    def _finish(
+        result: Dict[str, any],
+        path: str,
+        speech_ratio: Optional[float],
+        analysed_sec: float,
+        coverage: float,
+        chunks_evaluated: int,
+        chunks_total: Optional[int] = None
+    ) -> Dict[str, any]:
+        """
+        Attach what was analysed and how to a verdict
+        """
+        DETECTION_PATHS.inc(path)
+        result["analysis"] = {
+            "speech_ratio": None if speech_ratio is None else round(speech_ratio, 3),
+            "analysed_sec": round(analysed_sec, 3),
+            "path": path,
+            "chunks_evaluated": chunks_evaluated,
+            "chunks_total": chunks_total,
+            "coverage": round(coverage, 4)
+        }
+        return result
+    
+    def detect_window(self, audio: np.ndarray, language: str, spectral_features: Dict[str, float]) -> Dict[str, any]:
+        """
+        Score one window of a live stream, using spectral features the
+        caller computed incrementally
+        """
+        target_sr = self.feature_extractor.sampling_rate
+        predicted_id, confidence, avg_probs = self._process_chunk(audio, target_sr)
+        label = self.config.id2label[predicted_id]
+        spectral_ai_score = self.audio_processor.compute_ai_score(spectral_features)
+        return self._classify(label, confidence, avg_probs, spectral_features, spectral_ai_score)
+    
+    def _classify(
+        self,
+        label: str,
+        confidence: float,
+        avg_probs: dict,
+        spectral_features: Dict[str, float],
+        spectral_ai_score: float
+    ) -> Dict[str, any]:
+        """
+        Combine model probabilities and spectral evidence into the final verdict
+        """
+        # Model-agnostic AI detection logic
+        ai_keywords = self.AI_KEYWORDS
+        human_keywords = self.HUMAN_KEYWORDS
+        
+        ai_prob = 0.0
+        human_prob = 0.0
+        label_lower = label.lower()
+        
+        for lbl, prob in avg_probs.items():
+            lbl_lower = lbl.lower()
+            if any(kw in lbl_lower for kw in ai_keywords):
+                ai_prob += prob
+            elif any(kw in lbl_lower for kw in human_keywords):
+                human_prob += prob
+        
+        is_ai_label = any(kw in label_lower for kw in ai_keywords)
+        
+        # ===== ENHANCED MULTI-SIGNAL DETECTION =====
+        # Modern AI voices are very good - we need aggressive detection
+        ai_signals = []
+        
+        # Signal 1: Model directly says AI/fake
+        if is_ai_label:
+            ai_signals.append(f"model={label}")
+        
+        # Signal 2: High AI probability from model
+        if ai_prob >= 0.08:  # Lowered threshold
+            ai_signals.append(f"ai_prob={ai_prob:.0%}")
+        
+        # Signal 3: Model uncertainty (not very confident about human)
+        if human_prob < 0.97:
+            ai_signals.append(f"model_uncertain={human_prob:.0%}")
+        
+        # Signal 4: Spectral analysis
+        if spectral_ai_score >= 0.25:  # Lowered threshold
+            ai_signals.append(f"spectral={spectral_ai_score:.0%}")
+        
+        # Signal 5: Individual spectral features
+        pitch_cv = spectral_features.get('pitch_cv', 0.2)
+        jitter = spectral_features.get('jitter', 0.015)
+        mfcc_delta_var = spectral_features.get('mfcc_delta_var', 15)
+        mfcc_var = spectral_features.get('mfcc_var', 60)
+        harmonic_ratio = spectral_features.get('harmonic_ratio', 0.75)
+        rms_cv = spectral_features.get('rms_cv', 0.4)
+        
+        if pitch_cv < 0.18:
+            ai_signals.append(f"pitch_cv={pitch_cv:.3f}")
+        if jitter < 0.012:
+            ai_signals.append(f"jitter={jitter:.4f}")
+        if mfcc_delta_var < 12:
+            ai_signals.append(f"mfcc_delta={mfcc_delta_var:.2f}")
+        if mfcc_var < 50:
+            ai_signals.append(f"mfcc_var={mfcc_var:.2f}")
+        if harmonic_ratio > 0.88:
+            ai_signals.append(f"harmonic={harmonic_ratio:.3f}")
+        if rms_cv < 0.4:
+            ai_signals.append(f"rms_cv={rms_cv:.3f}")
+        
+        # ===== FINAL CLASSIFICATION =====
+        # Combined scoring with aggressive weights
+        
+        # Base combined score
+        combined_ai_score = (
+            0.25 * ai_prob +                    # Model AI probability
+            0.45 * spectral_ai_score +          # Spectral analysis (primary)
+            0.15 * (1 - human_prob) +           # Inverse of human probability
+            0.15 * (len(ai_signals) / 10)       # Number of signals
+        )
+        
+        # Boost for model AI detection
+        if is_ai_label and confidence > 0.5:
+            combined_ai_score = max(combined_ai_score, 0.75)
+        
+        # Boost for strong spectral detection
+        if spectral_ai_score >= 0.50:
+            combined_ai_score = max(combined_ai_score, 0.65)
+        elif spectral_ai_score >= 0.35:
+            combined_ai_score = max(combined_ai_score, 0.50)
+        
+        # Boost for multiple signals (collective evidence)
+        if len(ai_signals) >= 6:
+            combined_ai_score = max(combined_ai_score, 0.70)
+        elif len(ai_signals) >= 4:
+            combined_ai_score = max(combined_ai_score, 0.55)
+        elif len(ai_signals) >= 3:
+            combined_ai_score = max(combined_ai_score, 0.45)
+        
+        # Classification thresholds (aggressive)
+        if combined_ai_score >= 0.35:
+            classification = "AI_GENERATED"
+            final_confidence = min(0.99, 0.5 + combined_ai_score * 0.5)
             
-            # Signal 1: Model directly says AI/fake
             if is_ai_label:
-                ai_signals.append(f"model={label}")
-            
-            # Signal 2: High AI probability from model
-            if ai_prob >= 0.08:  # Lowered threshold
-                ai_signals.append(f"ai_prob={ai_prob:.0%}")
-            
-            # Signal 3: Model uncertainty (not very confident about human)
-            if human_prob < 0.97:
-                ai_signals.append(f"model_uncertain={human_prob:.0%}")
-            
-            # Signal 4: Spectral analysis
-            if spectral_ai_score >= 0.25:  # Lowered threshold
-                ai_signals.append(f"spectral={spectral_ai_score:.0%}")
-            
-            # Signal 5: Individual spectral features
-            pitch_cv = spectral_features.get('pitch_cv', 0.2)
-            jitter = spectral_features.get('jitter', 0.015)
-            mfcc_delta_var = spectral_features.get('mfcc_delta_var', 15)
-            mfcc_var = spectral_features.get('mfcc_var', 60)
-            harmonic_ratio = spectral_features.get('harmonic_ratio', 0.75)
-            rms_cv = spectral_features.get('rms_cv', 0.4)
-            
-            if pitch_cv < 0.18:
-                ai_signals.append(f"pitch_cv={pitch_cv:.3f}")
-            if jitter < 0.012:
-                ai_signals.append(f"jitter={jitter:.4f}")
-            if mfcc_delta_var < 12:
-                ai_signals.append(f"mfcc_delta={mfcc_delta_var:.2f}")
-            if mfcc_var < 50:
-                ai_signals.append(f"mfcc_var={mfcc_var:.2f}")
-            if harmonic_ratio > 0.88:
-                ai_signals.append(f"harmonic={harmonic_ratio:.3f}")
-            if rms_cv < 0.4:
-                ai_signals.append(f"rms_cv={rms_cv:.3f}")
-            
-            logger.info(f"AI Signals ({len(ai_signals)}): {ai_signals}")
-            
-            # ===== FINAL CLASSIFICATION =====
-            # Combined scoring with aggressive weights
-            
-            # Base combined score
-            combined_ai_score = (
-                0.25 * ai_prob +                    # Model AI probability
-                0.45 * spectral_ai_score +          # Spectral analysis (primary)
-                0.15 * (1 - human_prob) +           # Inverse of human probability
-                0.15 * (len(ai_signals) / 10)       # Number of signals
-            )
-            
-            # Boost for model AI detection
-            if is_ai_label and confidence > 0.5:
-                combined_ai_score = max(combined_ai_score, 0.75)
-            
-            # Boost for strong spectral detection
-            if spectral_ai_score >= 0.50:
-                combined_ai_score = max(combined_ai_score, 0.65)
-            elif spectral_ai_score >= 0.35:
-                combined_ai_score = max(combined_ai_score, 0.50)
-            
-            # Boost for multiple signals (collective evidence)
-            if len(ai_signals) >= 6:
-                combined_ai_score = max(combined_ai_score, 0.70)
+                explanation = f"Model detected AI ({label}, {confidence:.0%})"
+            elif spectral_ai_score >= 0.4:
+                explanation = f"Spectral analysis: {spectral_ai_score:.0%} synthetic patterns"
             elif len(ai_signals) >= 4:
-                combined_ai_score = max(combined_ai_score, 0.55)
-            elif len(ai_signals) >= 3:
-                combined_ai_score = max(combined_ai_score, 0.45)
-            
-            logger.info(f"Combined AI Score: {combined_ai_score:.2%}")
-            
-            # Classification thresholds (aggressive)
-            if combined_ai_score >= 0.35:
-                classification = "AI_GENERATED"
-                final_confidence = min(0.99, 0.5 + combined_ai_score * 0.5)
-                
-                if is_ai_label:
-                    explanation = f"Model detected AI ({label}, {confidence:.0%})"
-                elif spectral_ai_score >= 0.4:
-                    explanation = f"Spectral analysis: {spectral_ai_score:.0%} synthetic patterns"
-                elif len(ai_signals) >= 4:
-                    explanation = f"Multiple AI indicators: {', '.join(ai_signals[:4])}"
-                else:
-                    explanation = f"AI patterns detected (score: {combined_ai_score:.0%})"
-                    
-            elif len(ai_signals) >= 2 and (spectral_ai_score >= 0.20 or human_prob < 0.95):
-                classification = "AI_GENERATED"
-                final_confidence = 0.55 + combined_ai_score * 0.3
-                explanation = f"Suspicious patterns: {', '.join(ai_signals[:3])}"
-                
+                explanation = f"Multiple AI indicators: {', '.join(ai_signals[:4])}"
             else:
-                classification = "HUMAN"
-                final_confidence = max(human_prob, 1 - combined_ai_score)
-                explanation = f"Natural voice (human_prob={human_prob:.0%}, spectral_human={1-spectral_ai_score:.0%})"
-            
-            return {
-                "classification": classification,
-                "confidence": round(float(final_confidence), 2),
-                "explanation": explanation,
-                "details": {
-                    "model_label": label,
-                    "model_confidence": round(confidence, 3),
-                    "ai_probability": round(ai_prob, 3),
-                    "human_probability": round(human_prob, 3),
-                    "spectral_ai_score": round(spectral_ai_score, 3),
-                    "combined_score": round(combined_ai_score, 3),
-                    "signals_count": len(ai_signals),
-                    "signals": ai_signals
-                }
-            }
+                explanation = f"AI patterns detected (score: {combined_ai_score:.0%})"
+                
+        elif len(ai_signals) >= 2 and (spectral_ai_score >= 0.20 or human_prob < 0.95):
+            classification = "AI_GENERATED"
+            final_confidence = 0.55 + combined_ai_score * 0.3
+            explanation = f"Suspicious patterns: {', '.join(ai_signals[:3])}"
+            
+        else:
+            classification = "HUMAN"
+            final_confidence = max(human_prob, 1 - combined_ai_score)
+            explanation = f"Natural voice (human_prob={human_prob:.0%}, spectral_human={1-spectral_ai_score:.0%})"
         
-        except Exception as e:
-            logger.error(f"HF Detection error: {str(e)}")
-            raise
+        trace = current_trace()
+        if trace is not None:
+            trace.event(
+                "verdict",
+                classification=classification,
+                ai_prob=ai_prob,
+                human_prob=human_prob,
+                combined_score=combined_ai_score,
+                signals=ai_signals
+            )
+        
+        return {
+            "classification": classification,
+            "confidence": round(float(final_confidence), 2),
+            "explanation": explanation,
+            "details": {
+                "model_label": label,
+                "model_confidence": round(confidence, 3),
+                "ai_probability": round(ai_prob, 3),
+                "human_probability": round(human_prob, 3),
+                "spectral_ai_score": round(spectral_ai_score, 3),
+                "combined_score": round(combined_ai_score, 3),
+                "signals_count": len(ai_signals),
+                "signals": ai_signals
+            }
+        }
@@ -0,0 +1,25 @@
+import torch
+from loguru import logger
+
+
+def quantize_model(model: torch.nn.Module, mode: str, device: str = "cpu") -> torch.nn.Module:
+    """
+    Apply the QUANTIZATION mode to a loaded model.
+    dynamic_int8 swaps every nn.Linear for a dynamically quantized one:
+    weights are stored as int8 and activations are quantized per batch at
+    run time, so no calibration data is needed. The transformer's
+    attention and feed-forward projections are all Linear layers, which
+    is where most of the CPU time and weight memory goes; the conv feature
+    encoder stays fp32. Quantized kernels are CPU only.
+    """
+    if mode == "none":
+        return model
+    if mode != "dynamic_int8":
+        raise ValueError(f"Unknown quantization mode: {mode}")
+    if device != "cpu":
+        logger.warning(f"Quantization {mode} needs the CPU backend, keeping the {device} model unquantized")
+        return model
+
+    model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    logger.info(f"Applied {mode} quantization to Linear layers (engine: {torch.backends.quantized.engine})")
+    return model
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field, validator
-from typing import Literal
+from typing import List, Literal, Optional
 from app.config import settings
 
+
 class VoiceDetectionRequest(BaseModel):
     language: Literal["Tamil", "English", "Hindi", "Malayalam", "Telugu"] = Field(
         ...,
@@ -9,32 +10,72 @@ class VoiceDetectionRequest(BaseModel):
     )
     audioFormat: str = Field(
         default="mp3",
-        description="Audio format (must be mp3)"
+        description="Audio format: mp3, wav, flac, or raw mono pcm_s16le / pcm_f32le"
     )
     audioBase64: str = Field(
         ...,
         description="Base64 encoded audio file",
         min_length=100
     )
+    sampleRate: Optional[int] = Field(
+        default=None,
+        description="Sample rate in Hz, required for pcm_* formats",
+        gt=0
+    )
+    maxAnalysisSec: Optional[float] = Field(
+        default=None,
+        description="Analyse at most this many seconds, sampled across longer audio (can only lower ANALYSIS_BUDGET_SEC)",
+        ge=1.0
+    )
     
     @validator('audioFormat')
     def validate_audio_format(cls, v):
-        if v.lower() != 'mp3':
-            raise ValueError('Only mp3 format is supported')
+        if v.lower() not in settings.SUPPORTED_AUDIO_FORMATS:
+            raise ValueError(f'Audio format must be one of {settings.SUPPORTED_AUDIO_FORMATS}')
         return v.lower()
     
+    @validator('sampleRate', always=True)
+    def validate_sample_rate(cls, v, values):
+        if values.get('audioFormat', '').startswith('pcm_') and v is None:
+            raise ValueError('sampleRate is required for raw PCM audio')
+        return v
+    
     @validator('language')
     def validate_language(cls, v):
         if v not in settings.SUPPORTED_LANGUAGES:
             raise ValueError(f'Language must be one of {settings.SUPPORTED_LANGUAGES}')
         return v
 
+
+class AnalysisInfo(BaseModel):
+    speechRatio: Optional[float] = Field(
+        default=None,
+        description="Share of the audio detected as speech (with VAD_ENABLED)",
+        ge=0.0,
+        le=1.0
+    )
+    analysedSec: Optional[float] = Field(default=None, description="Seconds of audio the model and spectral stages ran on")
+    path: Optional[Literal["full", "spectral_only"]] = Field(
+        default=None,
+        description="spectral_only when the cascade settled the verdict without the model"
+    )
+    chunksEvaluated: Optional[int] = Field(default=None, description="Model chunks scored", ge=0)
+    chunksTotal: Optional[int] = Field(default=None, description="Model chunks in the analysed audio", ge=0)
+    coverage: Optional[float] = Field(
+        default=None,
+        description="Share of the recording the analysed windows were drawn from (1.0 unless an analysis budget applied)",
+        ge=0.0,
+        le=1.0
+    )
+
+
 class VoiceDetectionResponse(BaseModel):
     status: Literal["success", "error"]
     language: str
     classification: Literal["AI_GENERATED", "HUMAN"]
     confidenceScore: float = Field(..., ge=0.0, le=1.0)
     explanation: str
+    analysis: Optional[AnalysisInfo] = None
     
     class Config:
         json_schema_extra = {
@@ -47,6 +88,51 @@ class VoiceDetectionResponse(BaseModel):
             }
         }
 
+
+class BatchVoiceDetectionRequest(BaseModel):
+    items: List[VoiceDetectionRequest] = Field(
+        ...,
+        description="Clips to classify, processed concurrently",
+        min_length=1
+    )
+
+
+class BatchItemResult(BaseModel):
+    index: int = Field(..., description="Position of the clip in the request")
+    status: Literal["success", "error"]
+    classification: Optional[Literal["AI_GENERATED", "HUMAN"]] = None
+    confidenceScore: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+    explanation: Optional[str] = None
+    analysis: Optional[AnalysisInfo] = None
+    message: Optional[str] = None
+
+
+class BatchVoiceDetectionResponse(BaseModel):
+    status: Literal["success"]
+    results: List[BatchItemResult]
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "status": "success",
+                "results": [
+                    {
+                        "index": 0,
+                        "status": "success",
+                        "classification": "HUMAN",
+                        "confidenceScore": 0.87,
+                        "explanation": "Natural voice (human_prob=97%, spectral_human=80%)"
+                    },
+                    {
+                        "index": 1,
+                        "status": "error",
+                        "message": "Audio processing error: Audio too short (minimum 0.5 seconds)"
+                    }
+                ]
+            }
+        }
+
+
 class ErrorResponse(BaseModel):
     status: Literal["error"]
     message: str
@@ -57,4 +143,26 @@ class ErrorResponse(BaseModel):
                 "status": "error",
                 "message": "Invalid API key or malformed request"
             }
-        }
\ No newline at end of file
+        }
+
+
+class ProfileRequest(BaseModel):
+    calls: int = Field(
+        default=0,
+        description="Profile the next N detections; 0 profiles every detection in the window",
+        ge=0,
+        le=1000
+    )
+    durationSec: float = Field(
+        default=30.0,
+        description="Time window, and the longest the request waits for `calls` detections",
+        gt=0,
+        le=600
+    )
+    mode: Literal["sampling", "deterministic"] = Field(
+        default="sampling",
+        description="sampling: collapsed stacks; deterministic: cProfile function table"
+    )
+    memory: bool = Field(default=True, description="Also report top allocation sites from tracemalloc")
+    intervalMs: float = Field(default=5.0, description="Sampling interval", ge=1, le=1000)
+    top: int = Field(default=30, description="Rows in the function and allocation tables", ge=1, le=500)
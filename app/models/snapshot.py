@@ -0,0 +1,153 @@
+"""
+Write a memory-mappable snapshot of the loaded model
+
+from_pretrained parses the config, builds every module and copies the
+weights into freshly allocated tensors on each start. A snapshot stores
+the model exactly as the detector runs it, evaluated and with
+QUANTIZATION applied, in one torch zipfile with page-aligned storages.
+It is saved together with the feature extractor config and a metadata
+file. load_snapshot() opens it with torch.load(mmap=True): tensors are
+views of the file's pages, read lazily from the page cache and shared
+between processes, with nothing copied at load time. Dynamically
+quantized Linear layers are the exception: they are repacked on load.
+
+    python -m app.models.snapshot --out ./models/snapshot
+    MODEL_SNAPSHOT_DIR=./models/snapshot python run.py
+"""
+
+import argparse
+import json
+import os
+import shutil
+import time
+from typing import Optional, Tuple
+
+import torch
+import transformers
+from loguru import logger
+from torch.nn.utils import parametrize
+from transformers import AutoFeatureExtractor, AutoModelForAudioClassification
+
+from app.config import settings
+from app.models.quantization import quantize_model
+
+WEIGHTS_FILE = "model.pt"
+METADATA_FILE = "snapshot.json"
+
+
+def _fold_parametrizations(model: torch.nn.Module):
+    """
+    Replace parametrized weights with the plain tensors they compute.
+    wav2vec2's positional convolution is weight-normalized through
+    torch.nn.utils.parametrizations, which torch.save cannot pickle as a
+    module; for inference the folded weight gives the same output and
+    is no longer recomputed on every forward.
+    """
+    for module in model.modules():
+        if parametrize.is_parametrized(module):
+            for name in list(module.parametrizations):
+                parametrize.remove_parametrizations(module, name, leave_parametrized=True)
+            # weight_norm also leaves a hook for loading old weight_g/weight_v
+            # checkpoints, a local function that cannot be pickled either
+            for key, hook in list(module._load_state_dict_pre_hooks.items()):
+                if "_weight_norm_compat_hook" in getattr(getattr(hook, "hook", hook), "__qualname__", ""):
+                    del module._load_state_dict_pre_hooks[key]
+
+
+def write_snapshot(out_dir: str, quantization: str = "none") -> str:
+    """
+    Load, evaluate and quantize the model and write it to out_dir
+    """
+    feature_extractor = AutoFeatureExtractor.from_pretrained(
+        settings.HF_MODEL_NAME,
+        cache_dir=settings.HF_MODEL_CACHE_DIR
+    )
+    model = AutoModelForAudioClassification.from_pretrained(
+        settings.HF_MODEL_NAME,
+        cache_dir=settings.HF_MODEL_CACHE_DIR
+    )
+    model.eval()
+    _fold_parametrizations(model)
+    model = quantize_model(model, quantization, "cpu")
+
+    # Build the snapshot next to its destination and swap it in whole
+    tmp_dir = f"{out_dir.rstrip(os.sep)}.tmp.{os.getpid()}"
+    os.makedirs(tmp_dir)
+    try:
+        torch.save(model, os.path.join(tmp_dir, WEIGHTS_FILE))
+        feature_extractor.save_pretrained(tmp_dir)
+        metadata = {
+            "model": settings.HF_MODEL_NAME,
+            "revision": getattr(model.config, "_commit_hash", None),
+            "quantization": quantization,
+            "torch_version": torch.__version__,
+            "transformers_version": transformers.__version__
+        }
+        with open(os.path.join(tmp_dir, METADATA_FILE), "w") as f:
+            json.dump(metadata, f, indent=2)
+
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+        os.replace(tmp_dir, out_dir)
+    finally:
+        if os.path.isdir(tmp_dir):
+            shutil.rmtree(tmp_dir)
+
+    logger.info(f"Wrote {quantization} snapshot of {settings.HF_MODEL_NAME} to {out_dir}")
+    return out_dir
+
+
+def load_snapshot(snapshot_dir: str, quantization: str) -> Optional[Tuple[object, torch.nn.Module]]:
+    """
+    Map a snapshot and return (feature_extractor, model).
+    Returns None, with the reason logged, when the snapshot is missing,
+    unreadable or was written for another model, quantization mode or
+    library version; the caller then loads with from_pretrained.
+    """
+    try:
+        with open(os.path.join(snapshot_dir, METADATA_FILE)) as f:
+            metadata = json.load(f)
+    except (OSError, ValueError):
+        logger.warning(f"No model snapshot in {snapshot_dir}, loading with from_pretrained")
+        return None
+
+    expected = {
+        "model": settings.HF_MODEL_NAME,
+        "quantization": quantization,
+        "torch_version": torch.__version__,
+        "transformers_version": transformers.__version__
+    }
+    stale = {key: metadata.get(key) for key, value in expected.items() if metadata.get(key) != value}
+    if stale:
+        logger.warning(f"Model snapshot in {snapshot_dir} does not match this deployment ({stale}), loading with from_pretrained")
+        return None
+
+    start = time.perf_counter()
+    try:
+        # Our own file holding a whole pickled module, hence weights_only=False
+        model = torch.load(
+            os.path.join(snapshot_dir, WEIGHTS_FILE),
+            map_location="cpu",
+            mmap=True,
+            weights_only=False
+        )
+        feature_extractor = AutoFeatureExtractor.from_pretrained(snapshot_dir)
+    except Exception as e:
+        logger.warning(f"Could not load model snapshot from {snapshot_dir}: {str(e)}, loading with from_pretrained")
+        return None
+    logger.info(f"Mapped model snapshot from {snapshot_dir} in {time.perf_counter() - start:.2f}s")
+    return feature_extractor, model
+
+
+def main():
+    default_out = os.path.join(settings.HF_MODEL_CACHE_DIR, "snapshot", settings.HF_MODEL_NAME.replace("/", "--"))
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=settings.MODEL_SNAPSHOT_DIR or default_out)
+    parser.add_argument("--quantization", choices=["none", "dynamic_int8"], default=settings.QUANTIZATION)
+    args = parser.parse_args()
+
+    print(write_snapshot(args.out, args.quantization))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Pre-fork server: load the model once, then fork worker processes
+
+The parent loads the weights, freezes the garbage collector and forks
+WORKERS uvicorn workers that accept on one shared socket. Tensor storage
+is never written after loading, so every worker maps the parent's pages
+copy-on-write. An extra worker then costs its own interpreter state and
+activations, not another copy of the model. The exception is
+INFERENCE_BACKEND=onnx: onnxruntime cannot cross a fork, so each worker
+opens its own session and holds its own copy of the graph. Workers that die are
+replaced. SIGTERM and SIGINT are passed on to the workers.
+
+    SERVER_MODE=prefork WORKERS=4 python run.py
+    python -m app.prefork --workers 4
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import time
+
+import uvicorn
+from loguru import logger
+
+from app.config import settings
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket):
+    # uvicorn installs its own handlers once serving; until then behave like a plain process
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    config = uvicorn.Config(app)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(workers: int, host: str, port: int):
+    import torch
+    import app.main as api
+    from app.models.hf_detector import HuggingFaceDetector
+
+    # No intra-op thread pool in the parent: OpenMP pools do not survive fork,
+    # and each worker sizes its own pool once forked. The ONNX backend opens its
+    # onnxruntime session on the first forward, in the worker, for the same reason
+    torch.set_num_threads(1)
+
+    start = time.perf_counter()
+    detector = HuggingFaceDetector(start_services=False)
+    logger.info(f"Model loaded in parent in {time.perf_counter() - start:.1f}s, forking {workers} workers")
+
+    api.preloaded_detector = detector
+    api.server_processes = workers
+
+    # Move everything allocated so far out of the collector's reach, so GC
+    # passes in the workers do not write to (and un-share) these pages
+    gc.collect()
+    gc.freeze()
+
+    sock = _bind(host, port)
+    children = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                _run_worker(api.app, sock)
+            except BaseException as e:
+                logger.error(f"Worker crashed: {str(e)}")
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        children[pid] = time.monotonic()
+        logger.info(f"Started worker {pid}")
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if stopping or started is None:
+            continue
+        logger.warning(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting")
+        # Don't spin if workers die straight after starting
+        if time.monotonic() - started < 1.0:
+            time.sleep(1.0)
+        spawn()
+
+    sock.close()
+    logger.info("All workers stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS)
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    args = parser.parse_args()
+
+    serve(max(1, args.workers), args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
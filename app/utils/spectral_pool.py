@@ -0,0 +1,171 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Dict, Tuple
+
+import numpy as np
+from loguru import logger
+
+from app.core.metrics import STAGE_SECONDS
+from app.core.tracing import current_trace
+from app.utils.audio_processor import AudioProcessor
+
+
+def analyze_spectral(audio: np.ndarray, sr: int) -> Tuple[Dict[str, float], float]:
+    """
+    The whole spectral stage: feature extraction and the heuristic AI score
+    """
+    features = AudioProcessor.analyze_spectral_features(audio, sr)
+    return features, AudioProcessor.compute_ai_score(features)
+
+
+def _timed_analysis(audio: np.ndarray, sr: int) -> Tuple[Dict[str, float], float, Dict[str, Any], float, float]:
+    """
+    analyze_spectral plus the triggered checks and the time each half
+    took, so the parent process can record the trace and stage metrics
+    for work done in a worker, which has no trace context
+    """
+    start = time.perf_counter()
+    features = AudioProcessor.analyze_spectral_features(audio, sr)
+    extracted = time.perf_counter()
+    score, raw_score, checks_triggered = AudioProcessor.score_checks(features)
+    checks = {"checks": checks_triggered, "raw_score": raw_score, "score": score}
+    return features, score, checks, extracted - start, time.perf_counter() - extracted
+
+
+def _analyze_shared(name: str, length: int, sr: int) -> Tuple[Dict[str, float], float, Dict[str, Any], float, float]:
+    """
+    Worker entry point: read the waveform from a shared memory block
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        audio = np.ndarray((length,), dtype=np.float32, buffer=shm.buf)
+        result = _timed_analysis(audio, sr)
+        # The view must go before the block can be closed
+        del audio
+        return result
+    finally:
+        shm.close()
+
+
+class SpectralPool:
+    """
+    Runs the spectral stage in worker processes.
+    The spectral code is NumPy/librosa work that holds the GIL for most of
+    its run, so threads next to the model forward barely overlap with it.
+    Worker processes do, and the decoded waveform is handed over through
+    shared memory rather than pickled. With no workers the stage runs
+    inline on the caller and submit() returns an already finished future.
+    """
+
+    def __init__(self, workers: int = 0):
+        self.workers = max(0, workers)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._submitted = 0
+        self._fallbacks = 0
+        self._in_flight = 0
+
+        if self.enabled:
+            self._pool = self._start_pool()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the parent has torch and its thread pools loaded
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        # Start every worker now so the first requests don't pay for importing librosa
+        warmup = np.zeros(4096, dtype=np.float32)
+        for _ in range(self.workers):
+            pool.submit(analyze_spectral, warmup, 16000)
+        logger.info(f"Spectral pool started with {self.workers} worker processes")
+        return pool
+
+    def submit(self, audio: np.ndarray, sr: int) -> Future:
+        """
+        Start the spectral stage for a waveform and return its future
+        """
+        if not self.enabled:
+            future = Future()
+            future.set_result(_timed_analysis(audio, sr))
+            return future
+
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, audio.nbytes))
+        np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+
+        try:
+            future = self._submit_shared(shm.name, len(audio), sr)
+        except Exception:
+            self._release(shm)
+            raise
+
+        with self._lock:
+            self._submitted += 1
+            self._in_flight += 1
+        future.add_done_callback(lambda _: self._release(shm, finished=True))
+        return future
+
+    def _submit_shared(self, name: str, length: int, sr: int) -> Future:
+        with self._lock:
+            pool = self._pool
+        try:
+            return pool.submit(_analyze_shared, name, length, sr)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM killed); replace the pool once
+            logger.warning("Spectral pool broken, restarting workers")
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = self._start_pool()
+                pool = self._pool
+            return pool.submit(_analyze_shared, name, length, sr)
+
+    def _release(self, shm: shared_memory.SharedMemory, finished: bool = False):
+        shm.close()
+        shm.unlink()
+        if finished:
+            with self._lock:
+                self._in_flight -= 1
+
+    def result(self, future: Future, audio: np.ndarray, sr: int) -> Tuple[Dict[str, float], float]:
+        """
+        Wait for a submitted stage, computing it inline if the worker failed
+        """
+        try:
+            features, score, checks, feature_sec, score_sec = future.result()
+        except BrokenProcessPool:
+            logger.warning("Spectral worker failed, analysing in the request thread")
+            with self._lock:
+                self._fallbacks += 1
+            features, score, checks, feature_sec, score_sec = _timed_analysis(audio, sr)
+
+        STAGE_SECONDS.observe(feature_sec, "spectral_features")
+        STAGE_SECONDS.observe(score_sec, "scoring")
+        trace = current_trace()
+        if trace is not None:
+            # Timed where the work ran, possibly in a worker process
+            trace.add_span("spectral_features", feature_sec)
+            trace.add_span("scoring", score_sec)
+            trace.event("spectral_checks", **checks)
+        return features, score
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "submitted": self._submitted,
+                "in_flight": self._in_flight,
+                "fallbacks": self._fallbacks
+            }
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,200 @@
+import threading
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import soxr
+
+from app.config import settings
+from app.utils.audio_processor import AudioProcessor
+from app.utils.spectral_engine import SpectralFeatureEngine
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size ring buffer holding the most recent samples of a stream
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buffer = np.zeros(capacity, dtype=np.float32)
+        self._write_pos = 0
+        self.total_written = 0
+
+    def write(self, samples: np.ndarray):
+        self.total_written += len(samples)
+        if len(samples) >= self.capacity:
+            samples = samples[-self.capacity:]
+        n = len(samples)
+        end = self._write_pos + n
+        if end <= self.capacity:
+            self._buffer[self._write_pos:end] = samples
+        else:
+            split = self.capacity - self._write_pos
+            self._buffer[self._write_pos:] = samples[:split]
+            self._buffer[:n - split] = samples[split:]
+        self._write_pos = end % self.capacity
+
+    def latest(self, n: Optional[int] = None) -> np.ndarray:
+        """
+        Copy of the last n samples in time order (all buffered samples by default)
+        """
+        available = min(self.total_written, self.capacity)
+        n = available if n is None else min(n, available)
+        start = (self._write_pos - n) % self.capacity
+        if start + n <= self.capacity:
+            return self._buffer[start:start + n].copy()
+        return np.concatenate((self._buffer[start:], self._buffer[:n - (self.capacity - start)]))
+
+
+class StreamingSpectralAnalyzer:
+    """
+    Incremental STFT over a live stream.
+    Each push only transforms the frames completed by the new samples; the
+    last window_sec of frames is kept so features always cover a fixed
+    window and per-hop work does not grow with stream length.
+    """
+
+    def __init__(self, sr: int, window_sec: float, engine: Optional[SpectralFeatureEngine] = None):
+        self.sr = sr
+        self.engine = engine or SpectralFeatureEngine(pitch_estimator=settings.PITCH_ESTIMATOR)
+        self.n_fft = self.engine.n_fft
+        self.hop_length = self.engine.hop_length
+        # Same periodic Hann window librosa.stft applies
+        from scipy.signal import get_window  # scipy.signal is slow to import; only streams need it
+        self._window = get_window("hann", self.n_fft, fftbins=True).astype(np.float32)[:, None]
+        self._pending = np.zeros(0, dtype=np.float32)
+        max_frames = 1 + max(0, int(window_sec * sr) - self.n_fft) // self.hop_length
+        self._frames = deque(maxlen=max_frames)
+
+    @property
+    def n_frames(self) -> int:
+        return len(self._frames)
+
+    def push(self, samples: np.ndarray):
+        buffer = np.concatenate((self._pending, samples)) if len(self._pending) else samples
+        if len(buffer) < self.n_fft:
+            self._pending = buffer
+            return
+
+        n_new = 1 + (len(buffer) - self.n_fft) // self.hop_length
+        starts = np.arange(n_new) * self.hop_length
+        frames = buffer[starts[None, :] + np.arange(self.n_fft)[:, None]]
+        spectrum = np.fft.rfft(frames * self._window, axis=0).astype(np.complex64)
+        self._frames.extend(spectrum.T)
+        # Keep the overlap the next frame still needs
+        self._pending = buffer[n_new * self.hop_length:]
+
+    def stft(self) -> np.ndarray:
+        return np.stack(self._frames, axis=1)
+
+    def framed_span(self) -> Tuple[int, int]:
+        """
+        Where the buffered frames sit in the stream, as (unframed, length):
+        they cover `length` samples that end `unframed` samples before the
+        newest pushed sample (the tail still waiting for its frame)
+        """
+        if not self._frames:
+            return len(self._pending), 0
+        length = (len(self._frames) - 1) * self.hop_length + self.n_fft
+        # _pending holds the last frame's overlap followed by the unframed tail
+        return len(self._pending) - (self.n_fft - self.hop_length), length
+
+    def features(self, window_audio: np.ndarray, D: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        Spectral features over the buffered frames (or a snapshot D of them);
+        window_audio supplies the matching samples for the waveform-domain
+        features (RMS, ZCR, HPSS)
+        """
+        if D is None:
+            D = self.stft()
+        return self.engine.compute(window_audio, self.sr, D=D, center=False)
+
+
+class StreamingSession:
+    """
+    State for one live detection stream: PCM decoding, resampling to the
+    model rate, the sample ring buffer and the incremental spectral analyzer.
+    score() runs the detector on the most recent window.
+    """
+
+    def __init__(
+        self,
+        detector,
+        language: str,
+        audio_format: str,
+        sample_rate: int,
+        window_sec: float,
+        hop_sec: float,
+        min_audio_sec: float
+    ):
+        self.detector = detector
+        self.language = language
+        self.audio_format = audio_format
+        self.target_sr = detector.feature_extractor.sampling_rate
+        self.window_samples = int(window_sec * self.target_sr)
+        self.hop_samples = max(1, int(hop_sec * self.target_sr))
+        self.min_samples = int(min_audio_sec * self.target_sr)
+
+        self._input_sr = sample_rate
+        self._resampler = None
+        if sample_rate != self.target_sr:
+            self._resampler = soxr.ResampleStream(sample_rate, self.target_sr, 1, dtype="float32")
+
+        self.analyzer = StreamingSpectralAnalyzer(self.target_sr, window_sec)
+        # Room for the unframed tail behind the framed window
+        self.ring = AudioRingBuffer(self.window_samples + self.analyzer.hop_length)
+        self._next_score_at = self.min_samples
+        self._carry = b""
+        # push() runs on the event loop while score() runs on an inference thread
+        self._lock = threading.Lock()
+
+    @property
+    def stream_time_sec(self) -> float:
+        return self.ring.total_written / self.target_sr
+
+    def push(self, data: bytes) -> bool:
+        """
+        Add a frame of raw PCM, returning True when a new window is due for scoring
+        """
+        # Frames may split a sample; hold partial bytes for the next frame
+        data = self._carry + data
+        itemsize = 2 if self.audio_format == "pcm_s16le" else 4
+        usable = len(data) - len(data) % itemsize
+        self._carry = data[usable:]
+        if usable == 0:
+            return False
+
+        samples, _ = AudioProcessor.decode_pcm(data[:usable], self.audio_format, self._input_sr)
+        if self._resampler is not None:
+            samples = self._resampler.resample_chunk(samples)
+        if len(samples) == 0:
+            return False
+
+        with self._lock:
+            self.ring.write(samples)
+            self.analyzer.push(samples)
+
+        if self.ring.total_written >= self._next_score_at:
+            # Skip hops we fell behind on; only the latest window matters
+            behind = (self.ring.total_written - self._next_score_at) // self.hop_samples
+            self._next_score_at += (behind + 1) * self.hop_samples
+            return True
+        return False
+
+    def score(self) -> Dict[str, any]:
+        """
+        Verdict for the most recent window
+        """
+        with self._lock:
+            # Exactly the samples behind the STFT frames, so waveform and spectral features agree
+            unframed, length = self.analyzer.framed_span()
+            window_audio = self.ring.latest(unframed + length)[:length]
+            D = self.analyzer.stft()
+            stream_time_sec = self.stream_time_sec
+
+        features = self.analyzer.features(window_audio, D)
+        result = self.detector.detect_window(window_audio, self.language, features)
+        result["stream_time_sec"] = round(stream_time_sec, 2)
+        result["window_sec"] = round(len(window_audio) / self.target_sr, 2)
+        return result
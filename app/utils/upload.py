@@ -0,0 +1,100 @@
+from typing import AsyncGenerator, Optional, Tuple
+
+from starlette.datastructures import UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+from starlette.requests import Request
+
+from app.config import settings
+from app.core.exceptions import AudioProcessingError, AudioTooLargeError
+
+# Content types accepted as a raw audio request body, with the format each implies
+RAW_UPLOAD_CONTENT_TYPES = {
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/wave": "wav",
+    "audio/flac": "flac",
+    "audio/x-flac": "flac",
+    "application/octet-stream": "mp3",
+}
+
+# Room for multipart boundaries, part headers and small form fields
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def max_upload_bytes() -> int:
+    return settings.MAX_AUDIO_SIZE_MB * 1024 * 1024
+
+
+def check_content_length(request: Request, limit: int):
+    """
+    Reject an upload up front when its declared size is over the limit
+    """
+    content_length = request.headers.get("content-length")
+    if content_length is None:
+        return
+    try:
+        declared = int(content_length)
+    except ValueError:
+        raise AudioProcessingError("Invalid Content-Length header")
+    if declared > limit:
+        raise AudioTooLargeError(settings.MAX_AUDIO_SIZE_MB)
+
+
+async def bounded_stream(request: Request, limit: int) -> AsyncGenerator[bytes, None]:
+    """
+    Yield body chunks, aborting as soon as the running byte count passes limit
+    """
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > limit:
+            raise AudioTooLargeError(settings.MAX_AUDIO_SIZE_MB)
+        yield chunk
+
+
+async def read_raw_audio(request: Request) -> bytearray:
+    """
+    Read a raw audio request body into a buffer of at most MAX_AUDIO_SIZE_MB
+    """
+    limit = max_upload_bytes()
+    check_content_length(request, limit)
+
+    buffer = bytearray()
+    async for chunk in bounded_stream(request, limit):
+        buffer += chunk
+    return buffer
+
+
+async def read_multipart_audio(request: Request, field: str = "file") -> Tuple[bytes, Optional[str]]:
+    """
+    Parse a multipart upload with a bounded stream, returning the audio
+    file's bytes and the optional 'language' form field
+    """
+    limit = max_upload_bytes()
+    check_content_length(request, limit + MULTIPART_OVERHEAD_BYTES)
+
+    parser = MultiPartParser(
+        request.headers,
+        bounded_stream(request, limit + MULTIPART_OVERHEAD_BYTES),
+        max_files=1,
+        max_fields=8
+    )
+    try:
+        form = await parser.parse()
+    except MultiPartException as e:
+        raise AudioProcessingError(f"Malformed multipart upload: {e.message}")
+
+    try:
+        upload = form.get(field)
+        if not isinstance(upload, UploadFile):
+            raise AudioProcessingError(f"Missing '{field}' file in multipart upload")
+        if upload.size is not None and upload.size > limit:
+            raise AudioTooLargeError(settings.MAX_AUDIO_SIZE_MB)
+
+        audio_bytes = await upload.read()
+        language = form.get("language")
+        return audio_bytes, language if isinstance(language, str) else None
+    finally:
+        await form.close()
@@ -0,0 +1,47 @@
+import math
+import numpy as np
+from typing import List, Tuple
+
+# Candidate window starts are spaced a quarter window apart
+HOPS_PER_WINDOW = 4
+
+
+def select_windows(
+    audio: np.ndarray,
+    sr: int,
+    budget_sec: float,
+    max_window_sec: float
+) -> Tuple[List[Tuple[int, int]], float]:
+    """
+    Representative windows totalling budget_sec, as (start, end) sample
+    ranges in time order, and the window length in seconds.
+    The recording is split into equal strata with one window each, so every
+    part of it is represented; within a stratum the window with the most
+    energy is taken, which passes over silence and quiet stretches. Windows
+    are at most max_window_sec so each fits one model chunk. Costs one pass
+    of NumPy arithmetic over the waveform.
+    """
+    n_windows = max(1, math.ceil(budget_sec / max_window_sec))
+    window = int(sr * budget_sec / n_windows)
+    if window * n_windows >= len(audio):
+        return [(0, len(audio))], len(audio) / sr
+
+    # Energy per hop on a view of the waveform; window_energy[j] covers the window starting at hop j
+    hop = max(1, window // HOPS_PER_WINDOW)
+    n_hops = len(audio) // hop
+    frames = audio[:n_hops * hop].reshape(n_hops, hop)
+    energy = np.einsum("ij,ij->i", frames, frames)
+    window_energy = np.convolve(energy, np.ones(HOPS_PER_WINDOW), mode="valid")
+
+    stratum = len(audio) / n_windows
+    windows = []
+    for k in range(n_windows):
+        lo, hi = int(k * stratum), int((k + 1) * stratum)
+        # Starts on the hop grid that keep the whole window inside the stratum
+        first, last = -(-lo // hop), (hi - window) // hop
+        if last >= first:
+            start = (first + int(np.argmax(window_energy[first:last + 1]))) * hop
+        else:
+            start = min(lo, len(audio) - window)
+        windows.append((start, start + window))
+    return windows, window / sr
@@ -0,0 +1,4 @@
+"""
+Benchmarks for the detection pipeline
+Run individual benchmarks with `python -m benchmarks.<name>`
+"""
@@ -0,0 +1,105 @@
+"""
+Latency of the INFERENCE_BACKEND options at batch 1 and batched
+
+Runs the eager model and every exported artifact found for it (see
+python -m app.models.export) on the same inputs. Reports the median
+forward time, the speedup over eager, and the max logit difference
+from eager.
+
+    python -m benchmarks.bench_backends --lengths 2 10 30 --batch 8 --batch-length 5
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import torch
+from transformers import AutoFeatureExtractor, AutoModelForAudioClassification
+
+from app.config import settings
+from app.models.backends import EagerBackend, load_exported_backend
+from benchmarks.synthetic import speech_like
+
+
+def _median_latency(backend, inputs, repeats: int) -> float:
+    times = []
+    with torch.inference_mode():
+        backend(inputs)
+        for _ in range(repeats):
+            start = time.perf_counter()
+            backend(inputs)
+            times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=float, nargs="+", default=[2.0, 10.0, 30.0], help="batch-1 clip lengths in seconds")
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--batch-length", type=float, default=5.0)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    feature_extractor = AutoFeatureExtractor.from_pretrained(
+        settings.HF_MODEL_NAME,
+        cache_dir=settings.HF_MODEL_CACHE_DIR
+    )
+    sr = feature_extractor.sampling_rate
+    model = AutoModelForAudioClassification.from_pretrained(
+        settings.HF_MODEL_NAME,
+        cache_dir=settings.HF_MODEL_CACHE_DIR
+    ).eval()
+
+    backends = {"eager": EagerBackend(model)}
+    for name in ("torchscript", "onnx"):
+        try:
+            loaded = load_exported_backend(name, "none", "cpu")
+        except ImportError:
+            loaded = None
+        if loaded is not None:
+            if args.threads and hasattr(loaded, "set_num_threads"):
+                loaded.set_num_threads(args.threads)
+            backends[name] = loaded
+
+    cases = [(f"batch1_{length:g}s", [speech_like(length, sr)]) for length in args.lengths]
+    cases.append((
+        f"batch{args.batch}_{args.batch_length:g}s",
+        [speech_like(args.batch_length, sr, seed=seed) for seed in range(args.batch)]
+    ))
+
+    results = []
+    for case, clips in cases:
+        inputs = feature_extractor(clips, sampling_rate=sr, return_tensors="pt", padding=True)
+        with torch.inference_mode():
+            reference = backends["eager"](inputs).float()
+        row = {"case": case, "backends": {}}
+        for name, backend in backends.items():
+            latency = _median_latency(backend, inputs, args.repeats)
+            with torch.inference_mode():
+                delta = float((backend(inputs).float() - reference).abs().max())
+            row["backends"][name] = {
+                "median_sec": round(latency, 4),
+                "per_clip_sec": round(latency / len(clips), 4),
+                "max_logit_delta": delta,
+            }
+        eager_sec = row["backends"]["eager"]["median_sec"]
+        for stats in row["backends"].values():
+            stats["speedup_vs_eager"] = round(eager_sec / stats["median_sec"], 2)
+        results.append(row)
+
+    print(json.dumps({
+        "benchmark": "inference_backends",
+        "model": settings.HF_MODEL_NAME,
+        "threads": torch.get_num_threads(),
+        "backends": list(backends),
+        "results": results
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
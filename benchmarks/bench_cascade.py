@@ -0,0 +1,165 @@
+"""
+Agreement and compute saved by CASCADE_ENABLED against the full pipeline
+
+Every clip is scored twice on the decoded waveform: once by the full
+pipeline (model and spectral stage) and once in cascade mode, where the
+spectral stage runs first and the model is skipped when it cannot change
+the verdict. The report gives:
+  - agreement: share of clips with the same classification, and the
+    disagreements (there should be none; the cascade only skips the model
+    when no model output could flip the verdict)
+  - skipped: share of clips settled without the model
+  - compute: total and per-path time for both modes, and the fraction saved
+  - accuracy of both modes when the corpus is labelled
+
+Corpus: a directory with one subdirectory per class (ai/, fake/, spoof/
+or human/, real/, bonafide/) holding audio files, or by default the fixed
+synthetic corpus plus human-like voices. The spectral stage settles the
+chirps and noise on its own; the human-like clips need the model, so both
+paths are exercised.
+
+    python -m benchmarks.bench_cascade
+    python -m benchmarks.bench_cascade --corpus ./eval_clips --output cascade.json
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.utils.audio_processor import AudioProcessor
+from benchmarks.synthetic import corpus, human_like
+
+CLASS_DIRS = {
+    "ai": "AI_GENERATED", "fake": "AI_GENERATED", "spoof": "AI_GENERATED",
+    "human": "HUMAN", "real": "HUMAN", "bonafide": "HUMAN",
+}
+
+
+def synthetic_clips(sr: int) -> List[Tuple[str, np.ndarray, Optional[str]]]:
+    clips = [(name, audio, None) for name, audio in corpus(sr)]
+    for duration in (2.0, 5.0, 10.0):
+        for seed in (0, 1, 2):
+            audio = human_like(duration, sr, f0=110.0 + 40.0 * seed, seed=seed)
+            clips.append((f"human_like_{duration:g}s_{seed}", audio, None))
+    return clips
+
+
+def load_labelled(root: str, sr: int) -> List[Tuple[str, np.ndarray, Optional[str]]]:
+    clips = []
+    for class_dir in sorted(os.listdir(root)):
+        label = CLASS_DIRS.get(class_dir.lower())
+        directory = os.path.join(root, class_dir)
+        if label is None or not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            audio_format = os.path.splitext(name)[1].lstrip(".").lower()
+            if audio_format not in ("mp3", "wav", "flac"):
+                continue
+            with open(os.path.join(directory, name), "rb") as f:
+                audio, _ = AudioProcessor.load_audio(f.read(), sr=sr, audio_format=audio_format)
+            clips.append((f"{class_dir}/{name}", audio, label))
+    return clips
+
+
+def _timed(detector, audio: np.ndarray, cascade: bool) -> Tuple[dict, float]:
+    settings.CASCADE_ENABLED = cascade
+    start = time.perf_counter()
+    result = detector.detect_audio(audio, "English")
+    return result, time.perf_counter() - start
+
+
+def evaluate(detector, clips: List[Tuple[str, np.ndarray, Optional[str]]]) -> dict:
+    cascade_setting = settings.CASCADE_ENABLED
+    rows = []
+    try:
+        # Warm both paths so the first clip doesn't carry one-off costs
+        _timed(detector, clips[0][1], False)
+        _timed(detector, clips[0][1], True)
+        for name, audio, label in clips:
+            full, full_sec = _timed(detector, audio, False)
+            cascade, cascade_sec = _timed(detector, audio, True)
+            rows.append({
+                "clip": name,
+                "label": label,
+                "full": full["classification"],
+                "cascade": cascade["classification"],
+                "path": cascade["analysis"]["path"],
+                "full_sec": full_sec,
+                "cascade_sec": cascade_sec,
+            })
+    finally:
+        settings.CASCADE_ENABLED = cascade_setting
+
+    skipped = [row for row in rows if row["path"] == "spectral_only"]
+    modelled = [row for row in rows if row["path"] == "full"]
+    full_total = sum(row["full_sec"] for row in rows)
+    cascade_total = sum(row["cascade_sec"] for row in rows)
+    report = {
+        "clips": len(rows),
+        "agreement": round(sum(row["full"] == row["cascade"] for row in rows) / len(rows), 4),
+        "disagreements": [
+            {key: row[key] for key in ("clip", "full", "cascade", "path")}
+            for row in rows if row["full"] != row["cascade"]
+        ],
+        "skipped_model": round(len(skipped) / len(rows), 4),
+        "compute": {
+            "full_total_sec": round(full_total, 3),
+            "cascade_total_sec": round(cascade_total, 3),
+            "saved_fraction": round(1.0 - cascade_total / full_total, 4) if full_total > 0 else None,
+            # Undecided clips wait for the spectral stage before the model starts
+            "cascade_mean_sec_spectral_only": round(float(np.mean([r["cascade_sec"] for r in skipped])), 4) if skipped else None,
+            "cascade_mean_sec_full_path": round(float(np.mean([r["cascade_sec"] for r in modelled])), 4) if modelled else None,
+            "full_mean_sec": round(full_total / len(rows), 4),
+        },
+    }
+    labelled = [row for row in rows if row["label"] is not None]
+    if labelled:
+        report["accuracy"] = {
+            "full": round(sum(row["full"] == row["label"] for row in labelled) / len(labelled), 4),
+            "cascade": round(sum(row["cascade"] == row["label"] for row in labelled) / len(labelled), 4),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="directory of labelled clips (default: synthetic corpus)")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    from app.core.cache import VerdictCache
+    from app.models.hf_detector import HuggingFaceDetector
+
+    detector = HuggingFaceDetector()
+    # Each clip is scored twice on purpose; the verdict cache would answer the second
+    detector.cache = VerdictCache(0, "")
+    sr = detector.feature_extractor.sampling_rate
+
+    if args.corpus:
+        clips = load_labelled(args.corpus, sr)
+    else:
+        clips = synthetic_clips(sr)
+
+    report = {
+        "benchmark": "cascade",
+        "model": settings.HF_MODEL_NAME,
+        "corpus": args.corpus or "synthetic",
+        "spectral_workers": settings.SPECTRAL_WORKERS,
+        **evaluate(detector, clips),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(text)
+    detector.batcher.close()
+    detector.spectral_pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Audio decoder benchmark: in-process libsndfile vs librosa.load vs audioread/ffmpeg
+
+Encodes synthetic speech to MP3 at each duration and times decoding plus
+resampling to 16 kHz through each path. The audioread path is skipped when
+ffmpeg is not installed.
+
+    python -m benchmarks.bench_decode --durations 1 10 60 600
+"""
+
+import argparse
+import io
+import json
+import shutil
+import time
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+from app.config import settings
+from app.utils.audio_processor import AudioProcessor
+from benchmarks.synthetic import speech_like
+
+
+def _encode_mp3(audio: np.ndarray, sr: int) -> bytes:
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sr, format="MP3")
+    return buffer.getvalue()
+
+
+def _decode_with(decoder: str, audio_bytes: bytes, target_sr: int) -> np.ndarray:
+    settings.AUDIO_DECODER = decoder
+    audio, _ = AudioProcessor.load_audio(audio_bytes, sr=target_sr)
+    return audio
+
+
+def _librosa_bytesio(audio_bytes: bytes, target_sr: int) -> np.ndarray:
+    audio, _ = librosa.load(io.BytesIO(audio_bytes), sr=target_sr, mono=True)
+    return audio
+
+
+def _wall_time(fn, *args, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=[1.0, 10.0, 60.0, 600.0])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--source-sr", type=int, default=44100)
+    parser.add_argument("--target-sr", type=int, default=16000)
+    args = parser.parse_args()
+
+    has_ffmpeg = shutil.which("ffmpeg") is not None
+    original_decoder = settings.AUDIO_DECODER
+    results = []
+    try:
+        for duration in args.durations:
+            mp3 = _encode_mp3(speech_like(duration, args.source_sr), args.source_sr)
+            paths = {
+                "soundfile_in_process": lambda: _decode_with("soundfile", mp3, args.target_sr),
+                "librosa_load_bytesio": lambda: _librosa_bytesio(mp3, args.target_sr),
+            }
+            if has_ffmpeg:
+                paths["audioread_ffmpeg"] = lambda: _decode_with("audioread", mp3, args.target_sr)
+
+            row = {"duration_sec": duration, "mp3_bytes": len(mp3), "wall_sec": {}}
+            for name, fn in paths.items():
+                row["wall_sec"][name] = round(_wall_time(fn, repeats=args.repeats), 4)
+            if not has_ffmpeg:
+                row["wall_sec"]["audioread_ffmpeg"] = None
+            results.append(row)
+    finally:
+        settings.AUDIO_DECODER = original_decoder
+
+    print(json.dumps({
+        "benchmark": "audio_decode",
+        "ffmpeg_available": has_ffmpeg,
+        "libsndfile": sf.__libsndfile_version__,
+        "results": results
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+End-to-end benchmark with a per-stage latency breakdown
+
+Generates deterministic synthetic clips (voiced chirps, noise, and
+chirps with silence gaps) from 1 s to 10 min and encodes them in the
+request format. Each pipeline stage is timed separately:
+
+    decode_base64_audio -> load_audio -> chunk_audio -> process_chunks
+    -> analyze_spectral_features -> compute_ai_score
+
+The full detect() call and an HTTP round trip are also timed. The HTTP
+round trip goes through the in-process app, or a live server with --url.
+Every stage reports n, mean, p50/p95/p99 and throughput as calls/s and
+as audio seconds processed per second. The output is JSON. Write it with
+--output, and pass an earlier run as --baseline to add p50 ratios against
+it, which makes regressions between commits easy to spot.
+
+    python -m benchmarks.bench_e2e --output bench.json
+    python -m benchmarks.bench_e2e --durations 1 10 --no-model   # without torch/the model
+    python -m benchmarks.bench_e2e --baseline main.json --output branch.json
+"""
+
+import argparse
+import base64
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import soundfile as sf
+
+from app.config import settings
+from app.utils.audio_processor import AudioProcessor
+from benchmarks.synthetic import noise, speech_like, voiced_chirp
+
+CLIP_KINDS = {
+    "chirp": lambda duration, sr: voiced_chirp(duration, sr),
+    "noise": lambda duration, sr: noise(duration, sr),
+    "speech_gaps": lambda duration, sr: speech_like(duration, sr),
+}
+
+SOUNDFILE_FORMATS = {"mp3": "MP3", "wav": "WAV", "flac": "FLAC"}
+
+
+def _encode(audio: np.ndarray, sr: int, audio_format: str) -> bytes:
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sr, format=SOUNDFILE_FORMATS[audio_format])
+    return buffer.getvalue()
+
+
+def _summarize(samples: List[float], audio_sec: float) -> Dict[str, float]:
+    times = np.asarray(samples)
+    mean = float(times.mean())
+    return {
+        "n": len(samples),
+        "mean_sec": round(mean, 6),
+        "p50_sec": round(float(np.percentile(times, 50)), 6),
+        "p95_sec": round(float(np.percentile(times, 95)), 6),
+        "p99_sec": round(float(np.percentile(times, 99)), 6),
+        "calls_per_sec": round(1.0 / mean, 3) if mean > 0 else None,
+        "audio_sec_per_sec": round(audio_sec / mean, 2) if mean > 0 else None,
+    }
+
+
+def _time(fn: Callable[[], object], repeats: int, warmup: int) -> List[float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _load_detector():
+    from app.core.cache import VerdictCache
+    from app.models.hf_detector import HuggingFaceDetector
+
+    detector = HuggingFaceDetector()
+    # Repeated clips must be recomputed, not served from the verdict cache
+    detector.cache = VerdictCache(0, "")
+    return detector
+
+
+def _http_client(url: Optional[str], detector):
+    """
+    A callable that posts one request and checks it succeeded
+    """
+    headers = {"x-api-key": settings.API_KEY}
+    if url:
+        import httpx
+
+        client = httpx.Client(base_url=url, timeout=600)
+    else:
+        from fastapi.testclient import TestClient
+        import app.main as main
+        from app.core.executor import InferenceExecutor
+
+        main.detector = detector
+        main.model_status = "ready"
+        main.inference_executor = InferenceExecutor(
+            max_workers=settings.INFERENCE_WORKERS,
+            max_queue=settings.INFERENCE_QUEUE_SIZE
+        )
+        client = TestClient(main.app)
+
+    def post(payload: dict):
+        response = client.post("/api/voice-detection", json=payload, headers=headers)
+        response.raise_for_status()
+
+    return post
+
+
+def run_clip(audio_base64: str, audio_format: str, audio_sec: float, detector, http_post, args) -> Dict[str, dict]:
+    target_sr = detector.feature_extractor.sampling_rate if detector else settings.SAMPLE_RATE
+    timings = {}
+
+    def stage(name: str, fn: Callable[[], object]):
+        timings[name] = _summarize(_time(fn, args.repeats, args.warmup), audio_sec)
+
+    audio_bytes = AudioProcessor.decode_base64_audio(audio_base64)
+    stage("decode_base64_audio", lambda: AudioProcessor.decode_base64_audio(audio_base64))
+
+    audio, _ = AudioProcessor.load_audio(audio_bytes, sr=target_sr, audio_format=audio_format)
+    stage("load_audio", lambda: AudioProcessor.load_audio(audio_bytes, sr=target_sr, audio_format=audio_format))
+
+    if detector is not None:
+        stage("chunk_audio", lambda: detector._chunk_audio(audio, target_sr, settings.CHUNK_DURATION_SEC))
+        chunks = detector._chunk_audio(audio, target_sr, settings.CHUNK_DURATION_SEC)
+        if len(audio) / target_sr > settings.CHUNK_DURATION_SEC:
+            stage("process_chunks", lambda: detector._aggregate_chunks(np.stack(detector.batcher.map(chunks))))
+        else:
+            stage("process_chunks", lambda: detector._process_chunk(audio, target_sr))
+
+    features = AudioProcessor.analyze_spectral_features(audio, target_sr)
+    stage("analyze_spectral_features", lambda: AudioProcessor.analyze_spectral_features(audio, target_sr))
+    stage("compute_ai_score", lambda: AudioProcessor.compute_ai_score(features))
+
+    if detector is not None:
+        stage("detect", lambda: detector.detect(audio_base64, "English", audio_format))
+    if http_post is not None:
+        payload = {"language": "English", "audioFormat": audio_format, "audioBase64": audio_base64}
+        stage("http", lambda: http_post(payload))
+
+    return timings
+
+
+def _add_baseline_ratios(results: List[dict], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(r["kind"], r["duration_sec"]): r["stages"] for r in baseline.get("results", [])}
+    for row in results:
+        before = previous.get((row["kind"], row["duration_sec"]), {})
+        for name, stats in row["stages"].items():
+            if name in before and before[name]["p50_sec"] > 0:
+                stats["p50_vs_baseline"] = round(stats["p50_sec"] / before[name]["p50_sec"], 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=[1.0, 10.0, 60.0, 600.0])
+    parser.add_argument("--kinds", nargs="+", choices=list(CLIP_KINDS), default=list(CLIP_KINDS))
+    parser.add_argument("--format", choices=list(SOUNDFILE_FORMATS), default="mp3")
+    parser.add_argument("--source-sr", type=int, default=16000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--no-model", action="store_true", help="time only the stages that do not need the model")
+    parser.add_argument("--no-http", action="store_true")
+    parser.add_argument("--url", help="time HTTP round trips against a live server instead of the in-process app")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--baseline", help="earlier report to compare p50 latencies against")
+    args = parser.parse_args()
+
+    detector = None if args.no_model else _load_detector()
+    http_post = None
+    if not args.no_http and (args.url or detector is not None):
+        http_post = _http_client(args.url, detector)
+
+    results = []
+    for kind in args.kinds:
+        for duration in args.durations:
+            audio = CLIP_KINDS[kind](duration, args.source_sr)
+            audio_base64 = base64.b64encode(_encode(audio, args.source_sr, args.format)).decode()
+            print(f"{kind} {duration:g}s ...", file=sys.stderr)
+            results.append({
+                "kind": kind,
+                "duration_sec": duration,
+                "encoded_bytes": len(audio_base64) * 3 // 4,
+                "stages": run_clip(audio_base64, args.format, duration, detector, http_post, args),
+            })
+
+    if args.baseline:
+        _add_baseline_ratios(results, args.baseline)
+
+    report = {
+        "benchmark": "end_to_end",
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "format": args.format,
+        "repeats": args.repeats,
+        "model": None if args.no_model else settings.HF_MODEL_NAME,
+        "settings": {
+            name: getattr(settings, name)
+            for name in (
+                "QUANTIZATION", "INFERENCE_BACKEND", "BATCH_MAX_SIZE", "BATCH_MAX_WAIT_MS",
+                "CHUNK_DURATION_SEC", "PITCH_ESTIMATOR", "SPECTRAL_WORKERS", "AUDIO_DECODER"
+            )
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Memory cost of an extra pre-fork worker
+
+Loads the detector once with its services off, freezes the GC the way
+app.prefork does, and forks N workers. Each worker starts its services,
+runs the warmup clips and reports from /proc/self/smaps_rollup:
+  - rss_mb: resident pages, counting pages shared with the parent
+  - pss_mb: proportional share, with shared pages split between sharers
+  - private_mb: pages only this worker has, i.e. the real cost of one more worker
+This is compared with the RSS of a process that loads the model on its own.
+
+    python -m benchmarks.bench_prefork --workers 4
+"""
+
+import argparse
+import gc
+import json
+import os
+
+from app.config import settings
+
+
+def _smaps_mb() -> dict:
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": round(values.get("Rss", 0.0), 1),
+        "pss_mb": round(values.get("Pss", 0.0), 1),
+        "private_mb": round(values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS)
+    parser.add_argument("--warmup", type=float, nargs="*", default=[1.0, 5.0])
+    args = parser.parse_args()
+
+    import torch
+    from app.models.hf_detector import HuggingFaceDetector
+
+    torch.set_num_threads(1)
+    detector = HuggingFaceDetector(start_services=False)
+    gc.collect()
+    gc.freeze()
+    parent = _smaps_mb()
+
+    readers = []
+    for _ in range(args.workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            try:
+                detector.start_services()
+                detector.set_num_threads(max(1, (os.cpu_count() or 1) // args.workers))
+                detector.warmup(args.warmup)
+                os.write(write_fd, json.dumps(_smaps_mb()).encode())
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        readers.append((pid, read_fd))
+
+    workers = []
+    for pid, read_fd in readers:
+        with os.fdopen(read_fd) as f:
+            report = f.read()
+        os.waitpid(pid, 0)
+        workers.append(json.loads(report) if report else {"error": "worker failed"})
+
+    reported = [w for w in workers if "private_mb" in w]
+    print(json.dumps({
+        "benchmark": "prefork_memory",
+        "model": settings.HF_MODEL_NAME,
+        "workers": args.workers,
+        "parent_after_load": parent,
+        "per_worker": workers,
+        "mean_private_mb_per_worker": round(sum(w["private_mb"] for w in reported) / max(1, len(reported)), 1),
+        "standalone_process_rss_mb": parent["rss_mb"],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
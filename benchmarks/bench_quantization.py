@@ -0,0 +1,146 @@
+"""
+Parity and cost report for the QUANTIZATION modes
+
+Loads the model behind HF_MODEL_NAME in fp32 and with dynamic int8
+Linear layers. Both are scored on the fixed synthetic corpus, and the
+report gives:
+  - parity: label agreement and max/mean probability delta against fp32
+  - latency: batch-1 forward time per clip length (median of repeats)
+  - memory: serialized weight size and RSS growth while loading
+
+    python -m benchmarks.bench_quantization --repeats 5 --threads 4
+"""
+
+import argparse
+import io
+import json
+import os
+import time
+
+import numpy as np
+import torch
+from transformers import AutoFeatureExtractor, AutoModelForAudioClassification
+
+from app.config import settings
+from app.models.quantization import quantize_model
+from benchmarks.synthetic import corpus
+
+
+def _rss_mb() -> float:
+    """
+    Current resident set size (Linux)
+    """
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _weights_mb(model: torch.nn.Module) -> float:
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / (1024 * 1024)
+
+
+def _load(mode: str):
+    before = _rss_mb()
+    model = AutoModelForAudioClassification.from_pretrained(
+        settings.HF_MODEL_NAME,
+        cache_dir=settings.HF_MODEL_CACHE_DIR
+    )
+    model.eval()
+    model = quantize_model(model, mode, "cpu")
+    return model, _rss_mb() - before
+
+
+def _probabilities(model, feature_extractor, audio: np.ndarray, sr: int) -> np.ndarray:
+    inputs = feature_extractor(audio, sampling_rate=sr, return_tensors="pt", padding=True)
+    with torch.inference_mode():
+        logits = model(**inputs).logits
+    return torch.nn.functional.softmax(logits.float(), dim=-1)[0].numpy()
+
+
+def _latency(model, feature_extractor, audio: np.ndarray, sr: int, repeats: int) -> float:
+    inputs = feature_extractor(audio, sampling_rate=sr, return_tensors="pt", padding=True)
+    times = []
+    with torch.inference_mode():
+        model(**inputs)
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model(**inputs)
+            times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = torch default)")
+    parser.add_argument("--latency-durations", type=float, nargs="+", default=[2.0, 10.0, 30.0])
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    feature_extractor = AutoFeatureExtractor.from_pretrained(
+        settings.HF_MODEL_NAME,
+        cache_dir=settings.HF_MODEL_CACHE_DIR
+    )
+    sr = feature_extractor.sampling_rate
+    clips = corpus(sr)
+
+    reference, fp32_rss = _load("none")
+    quantized, int8_rss = _load("dynamic_int8")
+    id2label = reference.config.id2label
+
+    agree = 0
+    deltas = []
+    disagreements = []
+    for name, audio in clips:
+        p_ref = _probabilities(reference, feature_extractor, audio, sr)
+        p_q = _probabilities(quantized, feature_extractor, audio, sr)
+        deltas.append(float(np.abs(p_ref - p_q).max()))
+        if p_ref.argmax() == p_q.argmax():
+            agree += 1
+        else:
+            disagreements.append({
+                "clip": name,
+                "fp32": id2label[int(p_ref.argmax())],
+                "int8": id2label[int(p_q.argmax())],
+            })
+
+    latency = []
+    for duration in args.latency_durations:
+        audio = corpus(sr, durations=(duration,), seeds=(0,))[0][1]
+        fp32_sec = _latency(reference, feature_extractor, audio, sr, args.repeats)
+        int8_sec = _latency(quantized, feature_extractor, audio, sr, args.repeats)
+        latency.append({
+            "duration_sec": duration,
+            "fp32_sec": round(fp32_sec, 4),
+            "int8_sec": round(int8_sec, 4),
+            "speedup": round(fp32_sec / int8_sec, 2),
+        })
+
+    print(json.dumps({
+        "benchmark": "quantization",
+        "model": settings.HF_MODEL_NAME,
+        "threads": torch.get_num_threads(),
+        "quantized_engine": torch.backends.quantized.engine,
+        "parity": {
+            "clips": len(clips),
+            "label_agreement": round(agree / len(clips), 4),
+            "max_prob_delta": round(max(deltas), 5),
+            "mean_prob_delta": round(float(np.mean(deltas)), 5),
+            "disagreements": disagreements,
+        },
+        "latency": latency,
+        "memory": {
+            "fp32_weights_mb": round(_weights_mb(reference), 1),
+            "int8_weights_mb": round(_weights_mb(quantized), 1),
+            "fp32_load_rss_mb": round(fp32_rss, 1),
+            "int8_load_rss_mb": round(int8_rss, 1),
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
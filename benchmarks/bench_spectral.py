@@ -0,0 +1,133 @@
+"""
+Spectral feature benchmark: shared-STFT engine vs per-feature librosa calls
+
+    python -m benchmarks.bench_spectral --durations 5 30 120 --repeats 3
+"""
+
+import argparse
+import json
+import time
+
+import librosa
+import numpy as np
+
+from app.utils.spectral_engine import SpectralFeatureEngine
+from benchmarks.synthetic import speech_like
+
+
+def legacy_spectral_features(audio: np.ndarray, sr: int) -> dict:
+    """
+    Reference implementation where each librosa feature computes its own STFT
+    """
+    features = {}
+    pitches, magnitudes = librosa.piptrack(y=audio, sr=sr, fmin=50, fmax=500)
+    pitch_values = []
+    for t in range(pitches.shape[1]):
+        index = magnitudes[:, t].argmax()
+        pitch = pitches[index, t]
+        if pitch > 0:
+            pitch_values.append(pitch)
+    if len(pitch_values) > 10:
+        pitch_mean = np.mean(pitch_values)
+        features['pitch_cv'] = np.std(pitch_values) / pitch_mean if pitch_mean > 0 else 0
+        features['pitch_range'] = (np.max(pitch_values) - np.min(pitch_values)) / pitch_mean
+        features['jitter'] = np.mean(np.abs(np.diff(pitch_values))) / pitch_mean if pitch_mean > 0 else 0
+    else:
+        features['pitch_cv'] = 0.05
+        features['pitch_range'] = 0.1
+        features['jitter'] = 0.001
+
+    centroid = librosa.feature.spectral_centroid(y=audio, sr=sr)[0]
+    features['spectral_centroid_std'] = np.std(centroid)
+    features['spectral_centroid_mean'] = np.mean(centroid)
+    features['spectral_centroid_cv'] = features['spectral_centroid_std'] / features['spectral_centroid_mean'] if features['spectral_centroid_mean'] > 0 else 0
+    bw = librosa.feature.spectral_bandwidth(y=audio, sr=sr)[0]
+    features['spectral_bandwidth_std'] = np.std(bw)
+    features['spectral_bandwidth_mean'] = np.mean(bw)
+    contrast = librosa.feature.spectral_contrast(y=audio, sr=sr)
+    features['spectral_contrast_mean'] = np.mean(contrast)
+    features['spectral_contrast_std'] = np.std(contrast)
+    rolloff = librosa.feature.spectral_rolloff(y=audio, sr=sr, roll_percent=0.85)[0]
+    features['spectral_rolloff_std'] = np.std(rolloff)
+    features['spectral_rolloff_mean'] = np.mean(rolloff)
+    flatness = librosa.feature.spectral_flatness(y=audio)[0]
+    features['spectral_flatness_mean'] = np.mean(flatness)
+    features['spectral_flatness_std'] = np.std(flatness)
+
+    zcr = librosa.feature.zero_crossing_rate(audio)[0]
+    features['zcr_std'] = np.std(zcr)
+    features['zcr_mean'] = np.mean(zcr)
+    rms = librosa.feature.rms(y=audio)[0]
+    features['rms_std'] = np.std(rms)
+    features['rms_mean'] = np.mean(rms)
+    features['rms_cv'] = features['rms_std'] / features['rms_mean'] if features['rms_mean'] > 0 else 0
+
+    mfccs = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=20)
+    features['mfcc_var'] = np.mean(np.var(mfccs, axis=1))
+    features['mfcc_delta_var'] = np.mean(np.var(librosa.feature.delta(mfccs), axis=1))
+    features['mfcc_delta2_var'] = np.mean(np.var(librosa.feature.delta(mfccs, order=2), axis=1))
+
+    harmonic, percussive = librosa.effects.hpss(audio)
+    harmonic_energy = np.sum(harmonic ** 2)
+    total_energy = harmonic_energy + np.sum(percussive ** 2)
+    features['harmonic_ratio'] = harmonic_energy / total_energy if total_energy > 0 else 0.5
+    chroma = librosa.feature.chroma_stft(y=audio, sr=sr)
+    features['chroma_std'] = np.mean(np.std(chroma, axis=1))
+    features['silence_ratio'] = np.sum(rms < 0.01) / len(rms) if len(rms) > 0 else 0
+
+    stft = np.abs(librosa.stft(audio))
+    n_bins = stft.shape[0]
+    low_energy = np.mean(stft[:int(n_bins * 0.3), :])
+    features['high_freq_ratio'] = np.mean(stft[int(n_bins * 0.7):, :]) / low_energy if low_energy > 0 else 0
+    flux = np.sqrt(np.sum(np.diff(stft, axis=1) ** 2, axis=0))
+    features['spectral_flux_std'] = np.std(flux)
+    features['spectral_flux_mean'] = np.mean(flux)
+    return features
+
+
+def _cpu_time(fn, *args, repeats: int) -> float:
+    """
+    Best-of-N process CPU time in seconds
+    """
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.process_time()
+        fn(*args)
+        best = min(best, time.process_time() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=[5.0, 30.0, 120.0])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--sr", type=int, default=16000)
+    args = parser.parse_args()
+
+    engine = SpectralFeatureEngine()
+    results = []
+    for duration in args.durations:
+        audio = speech_like(duration, args.sr)
+        legacy = legacy_spectral_features(audio, args.sr)
+        shared = engine.compute(audio, args.sr)
+        max_rel_diff = max(
+            abs(float(shared[k]) - float(legacy[k])) / max(abs(float(legacy[k])), 1e-12)
+            for k in legacy
+        )
+
+        legacy_cpu = _cpu_time(legacy_spectral_features, audio, args.sr, repeats=args.repeats)
+        shared_cpu = _cpu_time(engine.compute, audio, args.sr, repeats=args.repeats)
+        results.append({
+            "duration_sec": duration,
+            "legacy_cpu_sec": round(legacy_cpu, 4),
+            "shared_stft_cpu_sec": round(shared_cpu, 4),
+            "speedup": round(legacy_cpu / shared_cpu, 2) if shared_cpu > 0 else None,
+            "cpu_saved_sec": round(legacy_cpu - shared_cpu, 4),
+            "max_relative_feature_diff": max_rel_diff,
+        })
+
+    print(json.dumps({"benchmark": "spectral_features", "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
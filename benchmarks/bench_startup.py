@@ -0,0 +1,103 @@
+"""
+Cold-start comparison: from_pretrained vs the mmap snapshot
+
+Each run happens in a fresh interpreter, since a cold start is what is
+being measured. For each load path the report gives:
+  - import_sec: import torch and transformers
+  - load_sec: build the model (from_pretrained, or map the snapshot)
+  - first_forward_sec: one 2 s clip through the model
+  - rss_mb: resident memory after the first forward
+Timings are medians over --repeats runs. With a warm page cache the
+snapshot is mostly mapping work. For node-cold numbers, drop the page
+cache before each run (echo 3 > /proc/sys/vm/drop_caches).
+
+    python -m app.models.snapshot --out ./models/snapshot
+    python -m benchmarks.bench_startup --snapshot ./models/snapshot --repeats 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _child(path: str, snapshot_dir: str, quantization: str):
+    start = time.perf_counter()
+    import numpy as np
+    import torch
+    from transformers import AutoFeatureExtractor, AutoModelForAudioClassification
+    from app.config import settings
+    from app.models.quantization import quantize_model
+    from app.models.snapshot import load_snapshot
+    imported = time.perf_counter()
+
+    if path == "snapshot":
+        feature_extractor, model = load_snapshot(snapshot_dir, quantization)
+    else:
+        feature_extractor = AutoFeatureExtractor.from_pretrained(settings.HF_MODEL_NAME, cache_dir=settings.HF_MODEL_CACHE_DIR)
+        model = AutoModelForAudioClassification.from_pretrained(settings.HF_MODEL_NAME, cache_dir=settings.HF_MODEL_CACHE_DIR)
+        model.eval()
+        model = quantize_model(model, quantization, "cpu")
+    loaded = time.perf_counter()
+
+    audio = (0.1 * np.random.default_rng(0).standard_normal(2 * feature_extractor.sampling_rate)).astype(np.float32)
+    inputs = feature_extractor(audio, sampling_rate=feature_extractor.sampling_rate, return_tensors="pt")
+    with torch.inference_mode():
+        model(**inputs)
+    forwarded = time.perf_counter()
+
+    print(json.dumps({
+        "import_sec": imported - start,
+        "load_sec": loaded - imported,
+        "first_forward_sec": forwarded - loaded,
+        "rss_mb": _rss_mb(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshot", default=os.environ.get("MODEL_SNAPSHOT_DIR", ""))
+    parser.add_argument("--quantization", default="none")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--child", choices=["from_pretrained", "snapshot"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child, args.snapshot, args.quantization)
+        return
+
+    paths = ["from_pretrained"] + (["snapshot"] if args.snapshot else [])
+    results = {}
+    for path in paths:
+        runs = []
+        for _ in range(args.repeats):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_startup", "--child", path,
+                 "--snapshot", args.snapshot, "--quantization", args.quantization],
+                capture_output=True, text=True, check=True
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        results[path] = {key: round(statistics.median(run[key] for run in runs), 3) for key in runs[0]}
+        results[path]["total_sec"] = round(
+            results[path]["import_sec"] + results[path]["load_sec"] + results[path]["first_forward_sec"], 3
+        )
+
+    print(json.dumps({
+        "benchmark": "cold_start",
+        "quantization": args.quantization,
+        "repeats": args.repeats,
+        "results": results
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Deterministic synthetic audio for benchmarks and tests
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+
+def f0_contour(
+    duration: float,
+    sr: int = 16000,
+    f0_start: float = 120.0,
+    f0_end: float = 220.0,
+    vibrato_hz: float = 5.0,
+    vibrato_depth: float = 0.03
+) -> np.ndarray:
+    """
+    Per-sample f0 in Hz: a glide between f0_start and f0_end every
+    2 seconds with sinusoidal vibrato on top
+    """
+    t = np.arange(int(duration * sr)) / sr
+    glide = 0.5 - 0.5 * np.cos(2 * np.pi * t / 4.0)
+    return (f0_start + (f0_end - f0_start) * glide) * (1 + vibrato_depth * np.sin(2 * np.pi * vibrato_hz * t))
+
+
+def voiced_chirp(
+    duration: float,
+    sr: int = 16000,
+    f0_start: float = 120.0,
+    f0_end: float = 220.0,
+    vibrato_hz: float = 5.0,
+    vibrato_depth: float = 0.03,
+    n_harmonics: int = 8,
+    noise_level: float = 0.01,
+    seed: int = 0
+) -> np.ndarray:
+    """
+    Harmonic voice-like signal with a gliding, vibrato-modulated f0,
+    a syllable-rate amplitude envelope and a little breath noise
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * sr)) / sr
+    f0 = f0_contour(duration, sr, f0_start, f0_end, vibrato_hz, vibrato_depth)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+
+    audio = np.zeros_like(t)
+    for k in range(1, n_harmonics + 1):
+        audio += np.sin(k * phase) / k
+    envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 3.0 * t) ** 2
+    audio = audio * envelope / n_harmonics * 2
+    audio += noise_level * rng.standard_normal(len(t))
+    return audio.astype(np.float32)
+
+
+def noise(duration: float, sr: int = 16000, level: float = 0.1, seed: int = 0) -> np.ndarray:
+    """
+    White noise
+    """
+    rng = np.random.default_rng(seed)
+    return (level * rng.standard_normal(int(duration * sr))).astype(np.float32)
+
+
+def with_silence_gaps(
+    audio: np.ndarray,
+    sr: int = 16000,
+    gap_sec: float = 1.0,
+    every_sec: float = 4.0
+) -> np.ndarray:
+    """
+    Zero out a gap of gap_sec at every every_sec interval
+    """
+    audio = audio.copy()
+    step = int(every_sec * sr)
+    gap = int(gap_sec * sr)
+    for start in range(step - gap, len(audio), step):
+        audio[start:start + gap] = 0.0
+    return audio
+
+
+def speech_like(duration: float, sr: int = 16000, seed: int = 0) -> np.ndarray:
+    """
+    Voiced chirp with periodic pauses, the default benchmark clip
+    """
+    return with_silence_gaps(voiced_chirp(duration, sr, seed=seed), sr)
+
+
+def human_like(duration: float, sr: int = 16000, f0: float = 140.0, seed: int = 0) -> np.ndarray:
+    """
+    Voice with the irregularity the spectral stage reads as human: a
+    random-walk intonation with phrase declination, cycle-level jitter,
+    uneven harmonics, a varying syllable rate and loudness, breath noise
+    and short pauses. Unlike the chirps, the cascade can't settle these
+    without the model
+    """
+    rng = np.random.default_rng(seed)
+    n = int(duration * sr)
+    t = np.arange(n) / sr
+    idx = np.arange(n)
+
+    steps = rng.standard_normal(n // 400 + 2)
+    walk = np.interp(idx, np.arange(len(steps)) * 400, np.cumsum(steps) * 0.06)
+    contour = f0 * np.exp(walk - walk.mean()) * (1.15 - 0.3 * (t % 2.5) / 2.5)
+    jitter = 1 + 0.05 * np.repeat(rng.standard_normal(n // 80 + 1), 80)[:n]
+    phase = 2 * np.pi * np.cumsum(contour * jitter) / sr
+
+    n_harmonics = 12
+    audio = np.zeros(n)
+    for k in range(1, n_harmonics + 1):
+        audio += np.sin(k * phase) * rng.uniform(0.3, 1.0) / k
+
+    knots = np.arange(0, n, sr // 10)
+    syllable_rate = np.interp(idx, knots, rng.uniform(2.0, 7.0, len(knots)))
+    envelope = np.clip(np.sin(2 * np.pi * np.cumsum(syllable_rate) / sr), 0, None) ** 1.5
+    knots = np.arange(0, n, sr // 4)
+    loudness = np.exp(np.interp(idx, knots, rng.normal(0.0, 0.5, len(knots))))
+    audio = audio * envelope * loudness / n_harmonics * 2
+    audio += 0.03 * (1.2 - envelope) * rng.standard_normal(n)
+
+    audio = with_silence_gaps(audio, sr, gap_sec=0.4, every_sec=rng.uniform(1.5, 2.5))
+    return (0.5 * audio / np.abs(audio).max()).astype(np.float32)
+
+
+def corpus(
+    sr: int = 16000,
+    durations: Tuple[float, ...] = (2.0, 5.0, 10.0),
+    seeds: Tuple[int, ...] = (0, 1, 2)
+) -> List[Tuple[str, np.ndarray]]:
+    """
+    Fixed set of named clips for parity checks between model variants:
+    paused and continuous voices over a few pitch ranges, plus noise
+    """
+    clips = []
+    for duration in durations:
+        for seed in seeds:
+            f0_start = 90.0 + 60.0 * seed
+            clips.append((f"speech_{duration:g}s_{seed}", speech_like(duration, sr, seed=seed)))
+            clips.append((
+                f"chirp_{duration:g}s_{seed}",
+                voiced_chirp(duration, sr, f0_start, f0_start + 100.0, seed=seed)
+            ))
+            clips.append((f"noise_{duration:g}s_{seed}", noise(duration, sr, seed=seed)))
+    return clips
@@ -3,4 +3,10 @@ import uvicorn
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run("app.main:app", host="0.0.0.0", port=port)
\ No newline at end of file
+    from app.config import settings
+    if settings.SERVER_MODE == "prefork":
+        # Model loaded once, WORKERS processes share its weights
+        from app.prefork import serve
+        serve(settings.WORKERS, "0.0.0.0", port)
+    else:
+        uvicorn.run("app.main:app", host="0.0.0.0", port=port)
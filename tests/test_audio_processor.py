@@ -88,6 +88,110 @@ class TestAudioProcessor:
         # Just verify the method exists and has correct signature
         assert hasattr(audio_processor, 'load_audio')
         assert callable(audio_processor.load_audio)
+    
+    def test_load_audio_decodes_mp3_in_process(self, audio_processor, monkeypatch):
+        """Stereo 44.1 kHz MP3 decodes through libsndfile to 16 kHz mono"""
+        import io
+        import soundfile as sf
+        from app.config import settings
+        monkeypatch.setattr(settings, "AUDIO_DECODER", "soundfile")
+        t = np.arange(44100) / 44100
+        tone = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+        buffer = io.BytesIO()
+        sf.write(buffer, np.stack([tone, tone], axis=1), 44100, format="MP3")
+        
+        audio, sr = audio_processor.load_audio(buffer.getvalue(), sr=16000)
+        
+        assert sr == 16000
+        assert audio.ndim == 1
+        assert audio.dtype == np.float32
+        assert abs(len(audio) - 16000) < 2000
+    
+    def test_load_audio_rejects_garbage(self, audio_processor):
+        """Undecodable bytes raise AudioProcessingError"""
+        with pytest.raises(AudioProcessingError):
+            audio_processor.load_audio(b"not audio at all" * 10, sr=16000)
+    
+    def test_load_pcm_f32_is_zero_copy_at_matching_rate(self, audio_processor):
+        """pcm_f32le at the target rate is a view of the input buffer"""
+        samples = (0.1 * np.sin(np.arange(16000) / 10)).astype("<f4")
+        raw = samples.tobytes()
+        
+        audio, sr = audio_processor.load_audio(raw, sr=16000, audio_format="pcm_f32le", sample_rate=16000)
+        
+        assert sr == 16000
+        assert np.shares_memory(audio, np.frombuffer(raw, dtype="<f4"))
+        np.testing.assert_array_equal(audio, samples)
+    
+    def test_load_pcm_s16_resamples_to_target(self, audio_processor):
+        """pcm_s16le is scaled to [-1, 1) and resampled from its declared rate"""
+        samples = (np.sin(np.arange(8000) / 10) * 16384).astype("<i2")
+        
+        audio, sr = audio_processor.load_audio(samples.tobytes(), sr=16000, audio_format="pcm_s16le", sample_rate=8000)
+        
+        assert sr == 16000
+        assert audio.dtype == np.float32
+        assert len(audio) == 16000
+        assert np.max(np.abs(audio)) <= 1.0
+    
+    def test_load_pcm_rejects_partial_samples(self, audio_processor):
+        """Byte counts that are not whole samples are rejected"""
+        with pytest.raises(AudioProcessingError):
+            audio_processor.load_audio(b"\x00" * 7, sr=16000, audio_format="pcm_f32le", sample_rate=16000)
+    
+    def test_spectral_features_match_per_feature_librosa(self, audio_processor):
+        """Shared-STFT features equal librosa computed on the raw signal"""
+        import librosa
+        sr = 16000
+        t = np.arange(2 * sr) / sr
+        audio = (0.5 * np.sin(2 * np.pi * 150 * t) + 0.01 * np.random.RandomState(0).randn(len(t))).astype(np.float32)
+        
+        features = audio_processor.analyze_spectral_features(audio, sr)
+        
+        centroid = librosa.feature.spectral_centroid(y=audio, sr=sr)[0]
+        mfccs = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=20)
+        chroma = librosa.feature.chroma_stft(y=audio, sr=sr)
+        harmonic, percussive = librosa.effects.hpss(audio)
+        harmonic_energy = np.sum(harmonic ** 2)
+        
+        assert np.isclose(features['spectral_centroid_mean'], np.mean(centroid))
+        assert np.isclose(features['mfcc_var'], np.mean(np.var(mfccs, axis=1)))
+        assert np.isclose(features['chroma_std'], np.mean(np.std(chroma, axis=1)))
+        assert np.isclose(features['harmonic_ratio'], harmonic_energy / (harmonic_energy + np.sum(percussive ** 2)))
+    
+    def test_vectorized_pitch_matches_frame_loop(self):
+        """Vectorized piptrack stage returns the same pitch track as the per-frame loop"""
+        import librosa
+        from app.utils.spectral_engine import SpectralFeatureEngine
+        sr = 16000
+        t = np.arange(2 * sr) / sr
+        audio = (0.5 * np.sin(2 * np.pi * (150 + 20 * np.sin(2 * np.pi * t)) * t)).astype(np.float32)
+        engine = SpectralFeatureEngine()
+        S = np.abs(engine.stft(audio))
+        
+        pitches, magnitudes = librosa.piptrack(S=S, sr=sr, fmin=50, fmax=500)
+        expected = []
+        for i in range(pitches.shape[1]):
+            pitch = pitches[magnitudes[:, i].argmax(), i]
+            if pitch > 0:
+                expected.append(pitch)
+        
+        np.testing.assert_array_equal(engine.pitch_track(audio, S, sr), np.array(expected))
+    
+    def test_yin_pitch_tracks_steady_tone(self):
+        """YIN estimator finds a steady tone with near-zero pitch variation"""
+        from app.utils.spectral_engine import SpectralFeatureEngine
+        sr = 16000
+        t = np.arange(2 * sr) / sr
+        audio = (0.5 * np.sin(2 * np.pi * 200 * t)).astype(np.float32)
+        engine = SpectralFeatureEngine(pitch_estimator="yin")
+        
+        pitch_values = engine.pitch_track(audio, None, sr)
+        features = engine.pitch_features(pitch_values)
+        
+        assert len(pitch_values) > 10
+        assert abs(np.median(pitch_values) - 200) < 5
+        assert features['pitch_cv'] < 0.02
 
 
 # Pytest configuration
@@ -0,0 +1,125 @@
+"""
+Unit tests for exported inference backends
+"""
+
+import json
+import os
+import threading
+import time
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from app.config import settings
+from app.models.backends import OnnxBackend, TorchScriptBackend, artifact_path, load_exported_backend
+
+
+class TinyClassifier(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.conv = torch.nn.Conv1d(1, 4, kernel_size=5, stride=2)
+        self.head = torch.nn.Linear(4, 2)
+
+    def forward(self, input_values):
+        hidden = self.conv(input_values.unsqueeze(1)).mean(dim=-1)
+        return self.head(hidden)
+
+
+def _export(tmp_path, monkeypatch, model="test/tiny"):
+    monkeypatch.setattr(settings, "HF_MODEL_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "HF_MODEL_NAME", "test/tiny")
+    path = artifact_path("torchscript")
+    module = TinyClassifier().eval()
+    traced = torch.jit.freeze(torch.jit.trace(module, torch.randn(1, 400)).eval())
+    (tmp_path / "exported" / "test--tiny").mkdir(parents=True)
+    torch.jit.save(traced, path)
+    with open(path + ".json", "w") as f:
+        json.dump({"model": model, "input_names": ["input_values"]}, f)
+    return module, path
+
+
+def test_artifact_path_is_per_model_backend_and_quantization(monkeypatch):
+    monkeypatch.setattr(settings, "HF_MODEL_CACHE_DIR", "/cache")
+    monkeypatch.setattr(settings, "HF_MODEL_NAME", "org/model")
+    assert artifact_path("torchscript", "dynamic_int8") == "/cache/exported/org--model/torchscript-dynamic_int8.pt"
+    assert artifact_path("onnx") == "/cache/exported/org--model/onnx-none.onnx"
+
+
+def test_torchscript_backend_handles_unseen_shapes(tmp_path, monkeypatch):
+    """The traced graph runs other batch sizes and lengths with eager-equal logits"""
+    module, path = _export(tmp_path, monkeypatch)
+    backend = load_exported_backend("torchscript", "none", "cpu")
+    assert isinstance(backend, TorchScriptBackend)
+
+    inputs = {"input_values": torch.randn(3, 1234)}
+    with torch.inference_mode():
+        assert torch.allclose(backend(inputs), module(inputs["input_values"]), atol=1e-5)
+
+
+def test_missing_artifact_falls_back(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "HF_MODEL_CACHE_DIR", str(tmp_path))
+    assert load_exported_backend("torchscript", "none", "cpu") is None
+
+
+def test_artifact_from_other_model_falls_back(tmp_path, monkeypatch):
+    _export(tmp_path, monkeypatch, model="other/model")
+    assert load_exported_backend("torchscript", "none", "cpu") is None
+
+
+def _export_onnx(tmp_path):
+    pytest.importorskip("onnxruntime")
+    module = TinyClassifier().eval()
+    path = str(tmp_path / "tiny.onnx")
+    torch.onnx.export(
+        module, (torch.randn(1, 400),), path,
+        input_names=["input_values"], output_names=["logits"],
+        dynamic_axes={"input_values": {0: "batch", 1: "samples"}, "logits": {0: "batch"}}
+    )
+    return module, path
+
+
+def test_onnx_session_is_created_in_the_serving_process(tmp_path):
+    """Loading starts no onnxruntime threads, so the pre-fork parent has none to hand to workers"""
+    module, path = _export_onnx(tmp_path)
+
+    threads = len(os.listdir("/proc/self/task"))
+    backend = OnnxBackend(path, ["input_values"])
+    backend.set_num_threads(2)
+    assert backend.session is None
+    assert len(os.listdir("/proc/self/task")) == threads
+
+    inputs = {"input_values": torch.randn(3, 1234)}
+    with torch.inference_mode():
+        assert torch.allclose(backend(inputs), module(inputs["input_values"]), atol=1e-5)
+    assert backend.session is not None
+
+
+def test_onnx_session_is_created_once_under_concurrent_first_calls(tmp_path):
+    """Forward threads racing on the first call share one session instead of leaking extras"""
+    _, path = _export_onnx(tmp_path)
+    backend = OnnxBackend(path, ["input_values"])
+    create = backend._create_session
+    created = []
+
+    def slow_create(num_threads):
+        created.append(num_threads)
+        time.sleep(0.05)
+        return create(num_threads)
+
+    backend._create_session = slow_create
+    start = threading.Barrier(2)
+    outputs = []
+
+    def forward():
+        start.wait()
+        with torch.inference_mode():
+            outputs.append(backend({"input_values": torch.randn(1, 800)}))
+
+    threads = [threading.Thread(target=forward) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(outputs) == 2
+    assert len(created) == 1
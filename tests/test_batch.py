@@ -0,0 +1,84 @@
+"""
+Tests for the batch detection endpoint
+"""
+
+import base64
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.config import settings
+from app.core.exceptions import AudioProcessingError
+from app.core.executor import InferenceExecutor
+from app.core.metrics import STAGE_SECONDS
+
+
+class BatchDetector:
+    """Fails items whose audio starts with b'bad', classifies the rest"""
+
+    def __init__(self):
+        self.calls = []
+
+    def detect(self, audio_base64, language, audio_format, sample_rate, max_analysis_sec):
+        self.calls.append(language)
+        if base64.b64decode(audio_base64).startswith(b"bad"):
+            raise AudioProcessingError("Audio too short (minimum 0.5 seconds)")
+        return {"classification": "AI_GENERATED", "confidence": 0.9, "explanation": language}
+
+
+def _item(payload: bytes, language="English"):
+    return {"language": language, "audioFormat": "mp3", "audioBase64": base64.b64encode(payload * 100).decode()}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    detector = BatchDetector()
+    monkeypatch.setattr(main, "detector", detector)
+    monkeypatch.setattr(main, "inference_executor", InferenceExecutor(max_workers=1, max_queue=1))
+    return TestClient(main.app), detector
+
+
+def test_results_in_input_order_with_item_errors(client):
+    """Each clip gets its own result or error, in order"""
+    test_client, detector = client
+    batches = STAGE_SECONDS.count("total")
+    response = test_client.post("/api/voice-detection/batch", json={
+        "items": [_item(b"ok1"), _item(b"bad"), _item(b"ok2", "Tamil")]
+    })
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert [r["status"] for r in results] == ["success", "error", "success"]
+    assert results[1]["message"].startswith("Audio processing error")
+    assert results[2]["explanation"] == "Tamil"
+    assert sorted(detector.calls) == ["English", "English", "Tamil"]
+    assert STAGE_SECONDS.count("total") == batches + 1
+
+
+def test_item_limit(client, monkeypatch):
+    """Batches over BATCH_MAX_ITEMS are rejected"""
+    test_client, detector = client
+    monkeypatch.setattr(settings, "BATCH_MAX_ITEMS", 2)
+    response = test_client.post("/api/voice-detection/batch", json={
+        "items": [_item(b"ok")] * 3
+    })
+    assert response.status_code == 413
+    assert detector.calls == []
+
+
+def test_size_limit(client, monkeypatch):
+    """Batches over BATCH_MAX_TOTAL_MB of audio are rejected"""
+    test_client, detector = client
+    monkeypatch.setattr(settings, "BATCH_MAX_TOTAL_MB", 0)
+    response = test_client.post("/api/voice-detection/batch", json={
+        "items": [_item(b"ok")]
+    })
+    assert response.status_code == 413
+    assert detector.calls == []
+
+
+def test_empty_batch_rejected(client):
+    """At least one item is required"""
+    test_client, _ = client
+    response = test_client.post("/api/voice-detection/batch", json={"items": []})
+    assert response.status_code == 422
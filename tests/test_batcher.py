@@ -0,0 +1,81 @@
+"""
+Unit tests for the model micro-batcher
+"""
+
+import threading
+import pytest
+
+from app.models.batcher import MicroBatcher
+
+
+def test_gathers_concurrent_items_into_one_batch():
+    """Items submitted within the wait window share a forward call"""
+    calls = []
+
+    def forward(items):
+        calls.append(list(items))
+        return [x * 2 for x in items]
+
+    batcher = MicroBatcher(forward, max_batch_size=8, max_wait_ms=200)
+    futures = [batcher.submit(i) for i in range(5)]
+    assert [f.result(timeout=5) for f in futures] == [0, 2, 4, 6, 8]
+    assert calls == [[0, 1, 2, 3, 4]]
+    assert batcher.stats()["batch_size_counts"] == {5: 1}
+    batcher.close()
+
+
+def test_respects_max_batch_size():
+    """Batches never exceed max_batch_size"""
+    sizes = []
+
+    def forward(items):
+        sizes.append(len(items))
+        return items
+
+    batcher = MicroBatcher(forward, max_batch_size=3, max_wait_ms=100)
+    assert batcher.map(list(range(7))) == list(range(7))
+    assert max(sizes) <= 3
+    assert sum(sizes) == 7
+    stats = batcher.stats()
+    assert stats["items"] == 7
+    assert stats["largest_batch"] == 3
+    batcher.close()
+
+
+def test_results_routed_across_threads():
+    """Each caller gets the result for its own item"""
+    batcher = MicroBatcher(lambda items: [x + 100 for x in items], max_batch_size=4, max_wait_ms=20)
+    results = {}
+
+    def worker(i):
+        results[i] = batcher.submit(i).result(timeout=5)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {i: i + 100 for i in range(10)}
+    batcher.close()
+
+
+def test_forward_error_propagates_to_callers():
+    """A failed forward pass fails every future in the batch"""
+    def forward(items):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(forward, max_batch_size=4, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(2)]
+    for f in futures:
+        with pytest.raises(ValueError):
+            f.result(timeout=5)
+    batcher.close()
+
+
+def test_disabled_runs_inline():
+    """max_batch_size=1 runs on the caller thread without a scheduler"""
+    caller = threading.current_thread()
+    batcher = MicroBatcher(lambda items: [threading.current_thread()], max_batch_size=1)
+    assert not batcher.enabled
+    assert batcher.submit(0).result() is caller
+    assert batcher._thread is None
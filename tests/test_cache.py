@@ -0,0 +1,124 @@
+"""
+Unit tests for the verdict cache
+"""
+
+import os
+import threading
+import time
+import pytest
+from app.core.cache import VerdictCache
+
+
+def test_make_key_depends_on_all_parts():
+    """Audio, namespace and language all change the key"""
+    base = VerdictCache.make_key(b"audio", "model@1", "English")
+    assert base == VerdictCache.make_key(b"audio", "model@1", "English")
+    assert base != VerdictCache.make_key(b"audio2", "model@1", "English")
+    assert base != VerdictCache.make_key(b"audio", "model@2", "English")
+    assert base != VerdictCache.make_key(b"audio", "model@1", "Tamil")
+
+
+def test_hit_skips_compute():
+    """Second lookup is served from memory"""
+    cache = VerdictCache(max_entries=4)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"classification": "HUMAN", "details": {"signals": []}}
+
+    first = cache.get_or_compute("k", compute)
+    first["details"]["signals"].append("mutated")
+    second = cache.get_or_compute("k", compute)
+
+    assert len(calls) == 1
+    assert second["details"]["signals"] == []
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction():
+    """Least recently used entry is evicted first"""
+    cache = VerdictCache(max_entries=2)
+    cache.get_or_compute("a", lambda: {"v": "a"})
+    cache.get_or_compute("b", lambda: {"v": "b"})
+    cache.get_or_compute("a", lambda: {"v": "a"})
+    cache.get_or_compute("c", lambda: {"v": "c"})
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert cache.get_or_compute("b", lambda: {"v": "recomputed"}) == {"v": "recomputed"}
+
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    """Entries written to disk are found by a fresh cache"""
+    VerdictCache(max_entries=1, disk_dir=str(tmp_path)).get_or_compute("abcd", lambda: {"v": 1})
+
+    cache = VerdictCache(max_entries=1, disk_dir=str(tmp_path))
+    assert cache.get_or_compute("abcd", lambda: pytest.fail("should not recompute")) == {"v": 1}
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_in_flight_requests_are_coalesced():
+    """Concurrent callers for the same key share one computation"""
+    cache = VerdictCache(max_entries=4)
+    calls = []
+    started = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return {"v": 42}
+
+    results = []
+    owner = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+    owner.start()
+    started.wait()
+    waiters = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute))) for _ in range(3)]
+    for t in waiters:
+        t.start()
+    for t in [owner] + waiters:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{"v": 42}] * 4
+    assert cache.stats()["coalesced"] == 3
+
+
+def test_failures_are_not_cached():
+    """An exception propagates and the next call recomputes"""
+    cache = VerdictCache(max_entries=4)
+
+    def fail():
+        raise ValueError("bad audio")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute("k", fail)
+    assert cache.get_or_compute("k", lambda: {"v": 1}) == {"v": 1}
+    assert cache.stats()["in_flight"] == 0
+
+
+def test_expired_entries_are_recomputed(tmp_path):
+    """Entries older than the TTL are misses in both tiers"""
+    cache = VerdictCache(max_entries=4, disk_dir=str(tmp_path), ttl_sec=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"classification": "HUMAN"}
+
+    cache.get_or_compute("k", compute)
+    cache.get_or_compute("k", compute)
+    assert len(calls) == 1
+
+    # Age both tiers past the TTL
+    stored_at, result = cache._entries["k"]
+    cache._entries["k"] = (stored_at - 120, result)
+    path = cache._disk_path("k")
+    os.utime(path, (time.time() - 120, time.time() - 120))
+
+    cache.get_or_compute("k", compute)
+    assert len(calls) == 2
+    assert cache.stats()["disk_hits"] == 0
@@ -2,37 +2,319 @@
 Unit tests for detectors
 """
 
+from types import SimpleNamespace
+
 import pytest
 import numpy as np
-from app.models.detector import VoiceDetector
+
+pytest.importorskip("torch")  # hf_detector imports torch at module level
+
+from app.config import settings
+from app.models.batcher import MicroBatcher
 from app.models.hf_detector import HuggingFaceDetector
-from app.models.hybrid_detector import HybridDetector
-
-@pytest.fixture
-def sample_audio_base64():
-    """Generate sample base64 audio"""
-    # This would be a real base64 encoded MP3 in practice
-    return "SUQzBAAAAAAAI1RTU0UAAAAPAAADTGF2ZjU2LjM2LjEwMAAAAAAA..."
-
-def test_traditional_detector(sample_audio_base64):
-    """Test traditional ML detector"""
-    detector = VoiceDetector()
-    # This will fail with dummy data, but shows test structure
-    # result = detector.detect(sample_audio_base64, "English")
-    # assert result["classification"] in ["AI_GENERATED", "HUMAN"]
-    # assert 0.0 <= result["confidence"] <= 1.0
-    pass
-
-def test_hf_detector(sample_audio_base64):
-    """Test Hugging Face detector"""
-    # detector = HuggingFaceDetector()
-    # result = detector.detect(sample_audio_base64, "English")
-    # assert result["classification"] in ["AI_GENERATED", "HUMAN"]
-    pass
-
-def test_hybrid_detector(sample_audio_base64):
-    """Test hybrid detector"""
-    # detector = HybridDetector()
-    # result = detector.detect(sample_audio_base64, "English")
-    # assert result["classification"] in ["AI_GENERATED", "HUMAN"]
-    pass
\ No newline at end of file
+from app.utils.audio_processor import AudioProcessor
+from app.utils.spectral_pool import SpectralPool
+
+
+def _detector(chunk_probs):
+    """
+    A HuggingFaceDetector without the HF model: the batcher returns
+    fixed probabilities (labels: fake, real) for every chunk
+    """
+    detector = HuggingFaceDetector.__new__(HuggingFaceDetector)
+    detector.audio_processor = AudioProcessor()
+    detector.feature_extractor = SimpleNamespace(sampling_rate=16000)
+    detector.config = SimpleNamespace(id2label={0: "fake", 1: "real"})
+    detector.batcher = MicroBatcher(lambda chunks: [np.array(chunk_probs, dtype=np.float32) for _ in chunks], max_batch_size=1)
+    detector.spectral_pool = SpectralPool(0)
+    return detector
+
+
+def _voice(seconds, sr=16000):
+    t = np.arange(int(seconds * sr)) / sr
+    return (0.3 * np.sin(2 * np.pi * 150 * t) + 0.02 * np.random.default_rng(0).standard_normal(len(t))).astype(np.float32)
+
+
+def test_warmup_is_not_counted_as_traffic():
+    """Warmup clips leave the metrics and the current trace untouched"""
+    from app.core.metrics import AUDIO_SECONDS, DETECTION_PATHS, STAGE_SECONDS
+    from app.core.tracing import Trace, activate, deactivate
+
+    detector = _detector([0.2, 0.8])
+    audio_sec = AUDIO_SECONDS.value()
+    full_paths = DETECTION_PATHS.value("full")
+    forwards = STAGE_SECONDS.count("model_forward")
+    trace = Trace("outer")
+    token = activate(trace)
+    try:
+        detector.warmup([1.0, 35.0])
+    finally:
+        deactivate(token)
+
+    assert AUDIO_SECONDS.value() == audio_sec
+    assert DETECTION_PATHS.value("full") == full_paths
+    assert STAGE_SECONDS.count("model_forward") == forwards
+    assert trace.records == []
+
+
+def test_warmup_runs_the_model_with_the_cascade_on(monkeypatch):
+    """The cascade settles the synthetic warmup clips, but warmup must still reach the model"""
+    monkeypatch.setattr(settings, "CASCADE_ENABLED", True)
+    detector = _detector([0.2, 0.8])
+    t = np.arange(16000) / 16000
+    tone = (0.3 * np.sin(2 * np.pi * 150 * t) + 0.05 * np.random.default_rng(0).standard_normal(len(t))).astype(np.float32)
+    assert detector.detect_audio(tone, "English")["analysis"]["path"] == "spectral_only"
+    assert detector.batcher.stats()["batches"] == 0
+
+    detector.warmup([1.0, 35.0])
+    # One forward for the short clip and one per chunk of the long one (batches of one here)
+    assert detector.batcher.stats()["batches"] == 3
+
+
+def test_chunk_audio_drops_short_tail():
+    detector = _detector([0.5, 0.5])
+    chunks = detector._chunk_audio(np.zeros(16000 * 65), 16000, 30.0)
+    assert [len(c) for c in chunks] == [480000, 480000, 80000]
+
+    chunks = detector._chunk_audio(np.zeros(16000 * 60 + 4000), 16000, 30.0)
+    assert len(chunks) == 2
+
+
+def test_aggregate_chunks_weighted_vote():
+    detector = _detector([0.5, 0.5])
+    chunk_probs = np.array([[0.9, 0.1], [0.4, 0.6], [0.45, 0.55]])
+    predicted_id, confidence, avg_probs = detector._aggregate_chunks(chunk_probs)
+
+    # fake has weight 0.9 against 0.6 + 0.55 for real
+    assert predicted_id == 1
+    assert confidence == pytest.approx(0.575)
+    assert avg_probs["fake"] == pytest.approx(np.mean([0.9, 0.4, 0.45]))
+
+
+def test_long_audio_chunks_share_forward_passes():
+    """All chunks of a long file go to the model together, not one call per chunk"""
+    detector = _detector([0.5, 0.5])
+    batch_sizes = []
+
+    def forward(chunks):
+        batch_sizes.append(len(chunks))
+        return [np.array([0.9, 0.1], dtype=np.float32) for _ in chunks]
+
+    detector.batcher = MicroBatcher(forward, max_batch_size=8, max_wait_ms=200)
+    result = detector.detect_audio(_voice(95.0), "English")
+
+    assert batch_sizes == [4]
+    assert result["details"]["model_label"] == "fake"
+    detector.batcher.close()
+
+
+def test_forward_batch_never_pads_without_attention_mask():
+    """Chunks of different lengths are scored in equal-length groups when the extractor has no mask"""
+    import torch
+    from transformers import Wav2Vec2FeatureExtractor
+
+    detector = _detector([0.5, 0.5])
+    detector.feature_extractor = Wav2Vec2FeatureExtractor(return_attention_mask=False)
+    detector.pads_with_mask = False
+    detector.device = "cpu"
+    detector.use_half = False
+    shapes = []
+
+    def backend(inputs):
+        shapes.append(tuple(inputs["input_values"].shape))
+        return torch.zeros(inputs["input_values"].shape[0], 2)
+
+    detector.backend = backend
+    chunks = [np.ones(16000, dtype=np.float32), np.ones(8000, dtype=np.float32), np.ones(16000, dtype=np.float32)]
+    probabilities = detector._forward_batch(chunks, 16000)
+
+    assert sorted(shapes) == [(1, 8000), (2, 16000)]
+    assert probabilities.shape == (3, 2)
+    detector.batcher.close()
+
+
+@pytest.mark.parametrize("seconds", [2.0, 65.0])
+def test_detect_audio_returns_verdict(seconds):
+    """Short and chunked audio both produce a bounded verdict"""
+    detector = _detector([0.97, 0.03])
+    result = detector.detect_audio(_voice(seconds), "English")
+
+    assert result["classification"] == "AI_GENERATED"
+    assert 0.0 <= result["confidence"] <= 1.0
+    assert result["explanation"]
+    detector.batcher.close()
+
+
+def test_vad_trims_silence_but_keeps_silence_ratio(monkeypatch):
+    """With VAD on, the model sees speech only and silence_ratio comes from the original audio"""
+    monkeypatch.setattr(settings, "VAD_ENABLED", True)
+    detector = _detector([0.2, 0.8])
+    seen = []
+    detector._process_chunk = lambda audio, sr: seen.append(len(audio)) or (1, 0.8, {"fake": 0.2, "real": 0.8})
+    audio = np.concatenate([_voice(2.0), np.zeros(16000 * 3, dtype=np.float32), _voice(2.0)])
+    silence_inputs = []
+    silence_ratio = detector.audio_processor.silence_ratio
+    detector.audio_processor.silence_ratio = lambda a: silence_inputs.append(len(a)) or silence_ratio(a)
+
+    result = detector.detect_audio(audio, "English")
+
+    assert seen[0] < 16000 * 4.5
+    assert silence_inputs == [len(audio)]
+    assert result["analysis"]["speech_ratio"] == pytest.approx(4 / 7, abs=0.02)
+    assert result["analysis"]["analysed_sec"] < 4.5
+    detector.batcher.close()
+
+
+class FixedSpectral:
+    """Spectral stage stand-in returning a fixed score"""
+
+    def __init__(self, score, features=None):
+        self.score = score
+        self.features = features or {}
+
+    def submit(self, audio, sr):
+        return None
+
+    def result(self, future, audio, sr):
+        return self.features, self.score
+
+
+@pytest.mark.parametrize("spectral_score", [0.1, 0.2, 0.3, 0.34, 0.36, 0.5, 0.8])
+@pytest.mark.parametrize("features", [{}, {"pitch_cv": 0.1, "jitter": 0.005}, {"pitch_cv": 0.1, "jitter": 0.005, "mfcc_var": 30, "rms_cv": 0.2}])
+def test_spectral_decision_is_never_overturned_by_the_model(spectral_score, features):
+    """Whenever the cascade skips the model, every model output gives the same class"""
+    detector = _detector([0.5, 0.5])
+    decided = detector._spectral_decision(features, spectral_score)
+    detector.batcher.close()
+    if decided is None:
+        return
+    for label, confidence, probs in [
+        ("real", 0.99, {"fake": 0.01, "real": 0.99}),
+        ("real", 0.6, {"fake": 0.4, "real": 0.6}),
+        ("fake", 0.55, {"fake": 0.55, "real": 0.45}),
+        ("fake", 0.99, {"fake": 0.99, "real": 0.01}),
+    ]:
+        full = detector._classify(label, confidence, probs, features, spectral_score)
+        assert full["classification"] == decided["classification"] == "AI_GENERATED"
+        assert full["confidence"] >= decided["confidence"]
+
+
+def test_cascade_skips_model_only_when_decisive(monkeypatch):
+    monkeypatch.setattr(settings, "CASCADE_ENABLED", True)
+    detector = _detector([0.02, 0.98])
+    calls = []
+    process_chunk = detector._process_chunk
+    detector._process_chunk = lambda audio, sr: calls.append(len(audio)) or process_chunk(audio, sr)
+
+    detector.spectral_pool = FixedSpectral(0.6)
+    result = detector.detect_audio(_voice(2.0), "English")
+    assert result["classification"] == "AI_GENERATED"
+    assert result["analysis"]["path"] == "spectral_only"
+    assert result["details"]["model_label"] is None
+    assert calls == []
+
+    detector.spectral_pool = FixedSpectral(0.05)
+    result = detector.detect_audio(_voice(2.0), "English")
+    assert result["analysis"]["path"] == "full"
+    assert len(calls) == 1
+    detector.batcher.close()
+
+
+def test_chunk_order_spreads_across_the_recording():
+    order = HuggingFaceDetector._chunk_order(9, "spread")
+    assert sorted(order) == list(range(9))
+    assert order[:5] == [0, 8, 4, 2, 6]
+    assert HuggingFaceDetector._chunk_order(5, "sequential") == [0, 1, 2, 3, 4]
+
+
+def test_vote_settled_margin():
+    # fake leads with weight 2.7 against 0.8 for real
+    probs = np.array([[0.9, 0.1]] * 3 + [[0.2, 0.8]])
+    # Worst case: every unscored chunk votes real with full weight
+    assert not HuggingFaceDetector._vote_settled(probs, remaining=3, margin=1.0)
+    assert HuggingFaceDetector._vote_settled(probs, remaining=1, margin=1.0)
+    # A quarter against, the rest voting like the scored chunks
+    assert HuggingFaceDetector._vote_settled(probs, remaining=8, margin=0.25)
+
+
+def test_early_exit_stops_once_vote_is_settled(monkeypatch):
+    monkeypatch.setattr(settings, "CHUNK_DURATION_SEC", 1.0)
+    monkeypatch.setattr(settings, "BATCH_MAX_SIZE", 4)
+    monkeypatch.setattr(settings, "EARLY_EXIT_MIN_CHUNKS", 4)
+    detector = _detector([0.97, 0.03])
+    detector.spectral_pool = FixedSpectral(0.05)
+    audio = _voice(20.0)
+
+    full = detector.detect_audio(audio, "English")
+    assert full["analysis"]["chunks_evaluated"] == full["analysis"]["chunks_total"] == 20
+
+    monkeypatch.setattr(settings, "EARLY_EXIT_ENABLED", True)
+    monkeypatch.setattr(settings, "EARLY_EXIT_MARGIN", 0.25)
+    early = detector.detect_audio(audio, "English")
+    assert early["analysis"]["chunks_evaluated"] == 4
+    assert early["classification"] == full["classification"]
+
+    # Exact mode keeps scoring until the remaining chunks can't outvote 0.97 per chunk
+    monkeypatch.setattr(settings, "EARLY_EXIT_MARGIN", 1.0)
+    exact = detector.detect_audio(audio, "English")
+    assert exact["analysis"]["chunks_evaluated"] == 12
+    detector.batcher.close()
+
+
+def test_analysis_budget_bounds_both_stages(monkeypatch):
+    monkeypatch.setattr(settings, "CHUNK_DURATION_SEC", 2.0)
+    detector = _detector([0.2, 0.8])
+    spectral_inputs = []
+
+    class RecordingSpectral(FixedSpectral):
+        def submit(self, audio, sr):
+            spectral_inputs.append(len(audio))
+
+    detector.spectral_pool = RecordingSpectral(0.05)
+    result = detector.detect_audio(_voice(20.0), "English", max_analysis_sec=5.0)
+
+    # Three windows of 5/3 s (rounded down to whole samples), each scored as one model chunk
+    assert spectral_inputs == [3 * int(16000 * 5.0 / 3)]
+    assert result["analysis"]["chunks_total"] == 3
+    assert result["analysis"]["coverage"] == pytest.approx(0.25, abs=1e-4)
+
+    # The tighter of the setting and the request wins
+    monkeypatch.setattr(settings, "ANALYSIS_BUDGET_SEC", 4.0)
+    result = detector.detect_audio(_voice(20.0), "English", max_analysis_sec=5.0)
+    assert spectral_inputs[-1] == 64000
+    assert result["analysis"]["coverage"] == pytest.approx(0.2)
+    detector.batcher.close()
+
+
+@pytest.mark.parametrize("name, value", [
+    ("CHUNK_DURATION_SEC", 10.0),
+    ("VAD_ENABLED", True),
+    ("CASCADE_ENABLED", True),
+    ("EARLY_EXIT_ENABLED", True),
+])
+def test_verdict_settings_change_the_cache_namespace(tmp_path, monkeypatch, name, value):
+    """A cached verdict from before a settings or scoring change is not served after it"""
+    from app.core.cache import VerdictCache
+
+    detector = _detector([0.5, 0.5])
+    detector.backend = SimpleNamespace(name="eager")
+    detector.use_half = False
+    cache = VerdictCache(max_entries=0, disk_dir=str(tmp_path))
+    calls = []
+
+    def lookup():
+        key = cache.make_key(b"audio", detector._cache_namespace(), "English")
+        return cache.get_or_compute(key, lambda: calls.append(1) or {"classification": "HUMAN"})
+
+    lookup()
+    lookup()
+    assert len(calls) == 1
+
+    monkeypatch.setattr(settings, name, value)
+    lookup()
+    assert len(calls) == 2
+
+    monkeypatch.setattr(HuggingFaceDetector, "SCORING_VERSION", HuggingFaceDetector.SCORING_VERSION + 1)
+    lookup()
+    assert len(calls) == 3
+    detector.batcher.close()
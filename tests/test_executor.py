@@ -0,0 +1,94 @@
+"""
+Unit tests for the inference executor
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from app.core.executor import InferenceExecutor
+from app.core.exceptions import ServiceOverloadedError
+
+
+def test_runs_function_off_event_loop():
+    """Work runs on a pool thread and its result is returned"""
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+
+    async def main():
+        return await executor.run(threading.current_thread)
+
+    worker_thread = asyncio.run(main())
+    assert worker_thread is not threading.main_thread()
+    assert worker_thread.name.startswith("inference")
+    executor.shutdown()
+
+
+def test_rejects_when_queue_full():
+    """Requests beyond workers + queue get a 503 with Retry-After"""
+    executor = InferenceExecutor(max_workers=1, max_queue=1, retry_after=7)
+    release = threading.Event()
+
+    async def main():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        queued = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        assert executor.stats()["running"] == 1
+        assert executor.stats()["queue_depth"] == 1
+
+        with pytest.raises(ServiceOverloadedError) as exc_info:
+            await executor.run(release.wait)
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers["Retry-After"] == "7"
+
+        release.set()
+        await asyncio.gather(running, queued)
+
+    asyncio.run(main())
+    stats = executor.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["running"] == 0
+    assert stats["rejected"] == 1
+    executor.shutdown()
+
+
+def test_batch_items_share_the_worker_bound():
+    """A batch runs its items on the executor's workers, so never more than max_workers at once"""
+    executor = InferenceExecutor(max_workers=2, max_queue=1)
+    lock = threading.Lock()
+    running = [0, 0]  # current, peak
+
+    def detect(value):
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        if value == 3:
+            raise ValueError("bad item")
+        return value * 10
+
+    results = asyncio.run(executor.map(detect, [(i,) for i in range(8)], max_concurrency=4))
+    assert results[:3] == [0, 10, 20]
+    assert isinstance(results[3], ValueError)
+    assert results[4:] == [40, 50, 60, 70]
+    assert running[1] == 2
+    assert executor.stats()["running"] == 0
+    executor.shutdown()
+
+
+def test_batch_is_rejected_when_queue_full():
+    executor = InferenceExecutor(max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def main():
+        busy = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ServiceOverloadedError):
+            await executor.map(abs, [(1,), (2,)])
+        release.set()
+        await busy
+
+    asyncio.run(main())
+    assert executor.stats()["rejected"] == 1
+    executor.shutdown()
@@ -0,0 +1,103 @@
+"""
+Tests for the Prometheus metrics registry and the /metrics endpoint
+"""
+
+import base64
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.core.exceptions import AudioProcessingError
+from app.core.executor import InferenceExecutor
+from app.core.metrics import CLASSIFICATIONS, ERRORS, MetricsRegistry, metrics_suppressed
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage time", ["stage"], buckets=[0.1, 1.0])
+    histogram.observe(0.05, "decode")
+    histogram.observe(0.5, "decode")
+    histogram.observe(5.0, "decode")
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP stage_seconds Stage time", "# TYPE stage_seconds histogram"]
+    assert 'stage_seconds_bucket{stage="decode",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="decode",le="1"} 2' in lines
+    assert 'stage_seconds_bucket{stage="decode",le="+Inf"} 3' in lines
+    assert 'stage_seconds_sum{stage="decode"} 5.55' in lines
+    assert 'stage_seconds_count{stage="decode"} 3' in lines
+
+
+def test_counter_labels_are_escaped_and_gauges_read_on_scrape():
+    registry = MetricsRegistry()
+    counter = registry.counter("errors_total", "Errors", ["type"])
+    counter.inc('Bad"Quote')
+    counter.inc('Bad"Quote', amount=2)
+    depth = [3]
+    registry.gauge("queue_depth", "Queue depth", lambda: depth[0])
+    depth[0] = 7
+
+    text = registry.render()
+    assert 'errors_total{type="Bad\\"Quote"} 3' in text
+    assert "# TYPE queue_depth gauge\nqueue_depth 7\n" in text
+
+
+def test_suppressed_context_records_nothing():
+    registry = MetricsRegistry()
+    counter = registry.counter("audio_seconds_total", "Audio")
+    histogram = registry.histogram("stage_seconds", "Stage time", ["stage"])
+    with metrics_suppressed():
+        counter.inc(amount=36.0)
+        with histogram.time("model_forward"):
+            pass
+    counter.inc(amount=1.0)
+
+    assert counter.value() == 1.0
+    assert histogram.count("model_forward") == 0
+
+
+class FixedDetector:
+    """Fails audio starting with b'bad', classifies the rest as human"""
+
+    def detect(self, audio_base64, language, audio_format, sample_rate, max_analysis_sec):
+        if base64.b64decode(audio_base64).startswith(b"bad"):
+            raise AudioProcessingError("Audio too short (minimum 0.5 seconds)")
+        return {"classification": "HUMAN", "confidence": 0.8, "explanation": "test"}
+
+
+def test_metrics_endpoint_counts_verdicts_and_errors(monkeypatch):
+    monkeypatch.setattr(main, "detector", FixedDetector())
+    monkeypatch.setattr(main, "model_status", "ready")
+    monkeypatch.setattr(main, "inference_executor", InferenceExecutor(max_workers=1, max_queue=1))
+    humans = CLASSIFICATIONS.value("HUMAN")
+    errors = ERRORS.value("AudioProcessingError")
+    client = TestClient(main.app)
+
+    for payload in (b"ok", b"bad"):
+        client.post(
+            "/api/voice-detection",
+            json={"language": "English", "audioFormat": "mp3", "audioBase64": base64.b64encode(payload * 100).decode()},
+            headers={"x-api-key": main.settings.API_KEY}
+        )
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert CLASSIFICATIONS.value("HUMAN") == humans + 1
+    assert ERRORS.value("AudioProcessingError") == errors + 1
+    assert 'voice_detection_stage_seconds_count{stage="total"}' in response.text
+
+
+def test_requests_before_the_model_is_ready_are_counted(monkeypatch):
+    monkeypatch.setattr(main, "detector", None)
+    monkeypatch.setattr(main, "model_status", "warming")
+    errors = ERRORS.value("ModelNotReadyError")
+    client = TestClient(main.app)
+
+    response = client.post(
+        "/api/voice-detection",
+        json={"language": "English", "audioFormat": "mp3", "audioBase64": base64.b64encode(b"ok" * 100).decode()},
+        headers={"x-api-key": main.settings.API_KEY}
+    )
+    assert response.status_code == 503
+    assert ERRORS.value("ModelNotReadyError") == errors + 1
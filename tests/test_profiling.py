@@ -0,0 +1,112 @@
+"""
+Tests for on-demand profiling of the detection path
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.config import settings
+from app.core.profiling import ProfileSession, ProfilerBusyError
+from app.utils.audio_processor import AudioProcessor
+
+
+class SpectralDetector:
+    """detect() -> detect_bytes() -> the real spectral analysis"""
+
+    def __init__(self):
+        t = np.arange(16000) / 16000
+        self.audio = (0.3 * np.sin(2 * np.pi * 150 * t)).astype(np.float32)
+
+    def detect(self, audio_base64, language, audio_format="mp3", sample_rate=None, max_analysis_sec=None):
+        return self.detect_bytes(b"", language, audio_format, sample_rate, max_analysis_sec)
+
+    def detect_bytes(self, audio_bytes, language, audio_format="mp3", sample_rate=None, max_analysis_sec=None):
+        AudioProcessor.analyze_spectral_features(self.audio, 16000)
+        return {"classification": "HUMAN", "confidence": 0.8, "explanation": "test"}
+
+
+def test_sampling_profiles_next_calls_then_unhooks():
+    detector = SpectralDetector()
+    detector.detect("", "English")  # librosa's first call compiles; keep it out of tracemalloc
+    session = ProfileSession(calls=2, duration_sec=30.0, mode="sampling", interval_ms=1.0).start(detector)
+    assert "detect" in detector.__dict__
+
+    for _ in range(3):
+        detector.detect("", "English")
+    report = session.wait()
+
+    # Nested detect_bytes is part of the same call; the third call is not profiled
+    assert report["calls"] == 2
+    assert report["samples"] > 0
+    assert report["focus_samples"]["AudioProcessor.analyze_spectral_features"] > 0
+    assert any("SpectralDetector.detect_bytes" in line for line in report["collapsed"])
+    assert report["allocations"]
+    assert "detect" not in detector.__dict__ and "detect_bytes" not in detector.__dict__
+
+
+def test_deterministic_reports_focus_functions():
+    detector = SpectralDetector()
+    session = ProfileSession(calls=1, mode="deterministic", memory=False, top=5).start(detector)
+    detector.detect("", "English")
+    report = session.wait()
+
+    assert report["calls"] == 1
+    assert len(report["functions"]) == 5
+    assert report["focus_cumulative_sec"]["AudioProcessor.analyze_spectral_features"] > 0
+    assert "allocations" not in report
+
+
+def test_one_session_at_a_time():
+    detector = SpectralDetector()
+    session = ProfileSession(duration_sec=0.01, memory=False).start(detector)
+    with pytest.raises(ProfilerBusyError):
+        ProfileSession().start(detector)
+    session.wait()
+    ProfileSession(duration_sec=0.01, memory=False).start(detector).wait()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "detector", SpectralDetector())
+    monkeypatch.setattr(main, "model_status", "ready")
+    return TestClient(main.app)
+
+
+def test_admin_endpoint_requires_admin_key(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "")
+    assert client.post("/admin/profile", json={}).status_code == 403
+
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-secret")
+    assert client.post("/admin/profile", json={}, headers={"x-admin-key": "wrong"}).status_code == 401
+
+
+def test_admin_endpoint_profiles_a_window(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-secret")
+    stop = threading.Event()
+
+    def traffic():
+        while not stop.is_set():
+            main.detector.detect("", "English")
+            time.sleep(0.01)
+
+    worker = threading.Thread(target=traffic)
+    worker.start()
+    try:
+        response = client.post(
+            "/admin/profile",
+            json={"durationSec": 0.5, "mode": "deterministic"},
+            headers={"x-admin-key": "admin-secret"}
+        )
+    finally:
+        stop.set()
+        worker.join()
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["calls"] >= 1
+    assert report["functions"]
@@ -0,0 +1,42 @@
+"""
+Unit tests for the QUANTIZATION modes
+"""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from app.models.quantization import quantize_model
+
+
+def _tiny_model():
+    return torch.nn.Sequential(torch.nn.Linear(16, 32), torch.nn.ReLU(), torch.nn.Linear(32, 2)).eval()
+
+
+def test_none_returns_model_unchanged():
+    model = _tiny_model()
+    assert quantize_model(model, "none") is model
+
+
+def test_dynamic_int8_swaps_linear_layers_and_keeps_outputs_close():
+    """Linear layers become dynamically quantized and logits stay near fp32"""
+    torch.manual_seed(0)
+    model = _tiny_model()
+    inputs = torch.randn(4, 16)
+    with torch.inference_mode():
+        expected = model(inputs)
+
+    quantized = quantize_model(model, "dynamic_int8")
+    assert not any(type(m) is torch.nn.Linear for m in quantized.modules())
+    with torch.inference_mode():
+        assert torch.allclose(quantized(inputs), expected, atol=0.05)
+
+
+def test_dynamic_int8_skipped_off_cpu():
+    model = _tiny_model()
+    assert quantize_model(model, "dynamic_int8", device="cuda") is model
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        quantize_model(_tiny_model(), "int4")
@@ -0,0 +1,97 @@
+"""
+Unit tests for the mmap model snapshot
+"""
+
+import json
+import os
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from app.config import settings
+from app.models.snapshot import METADATA_FILE, WEIGHTS_FILE, load_snapshot, write_snapshot
+
+
+def _write(tmp_path, **overrides):
+    model = torch.nn.Sequential(torch.nn.Linear(8, 4), torch.nn.Linear(4, 2)).eval()
+    torch.save(model, os.path.join(tmp_path, WEIGHTS_FILE))
+    transformers.Wav2Vec2FeatureExtractor().save_pretrained(str(tmp_path))
+    metadata = {
+        "model": settings.HF_MODEL_NAME,
+        "quantization": "none",
+        "torch_version": torch.__version__,
+        "transformers_version": transformers.__version__
+    }
+    metadata.update(overrides)
+    with open(os.path.join(tmp_path, METADATA_FILE), "w") as f:
+        json.dump(metadata, f)
+    return model
+
+
+def test_snapshot_round_trips_weights(tmp_path):
+    model = _write(tmp_path)
+    feature_extractor, loaded = load_snapshot(str(tmp_path), "none")
+
+    assert feature_extractor.sampling_rate == 16000
+    for expected, actual in zip(model.state_dict().values(), loaded.state_dict().values()):
+        assert torch.equal(expected, actual)
+
+
+def test_weight_normalized_model_is_written(tmp_path, monkeypatch):
+    """wav2vec2's positional conv is a parametrization, which is folded into a plain weight"""
+    import app.models.snapshot as snapshot
+
+    conv = torch.nn.utils.parametrizations.weight_norm(torch.nn.Conv1d(2, 2, 3), name="weight", dim=2)
+    model = torch.nn.Sequential(conv, torch.nn.Conv1d(2, 2, 3))
+    model.config = transformers.Wav2Vec2Config()
+    inputs = torch.randn(1, 2, 16)
+    with torch.inference_mode():
+        expected = model(inputs)
+    monkeypatch.setattr(snapshot.AutoModelForAudioClassification, "from_pretrained", lambda *args, **kwargs: model)
+    monkeypatch.setattr(snapshot.AutoFeatureExtractor, "from_pretrained",
+                        lambda *args, **kwargs: transformers.Wav2Vec2FeatureExtractor())
+
+    out_dir = write_snapshot(str(tmp_path / "snapshot"))
+    _, loaded = load_snapshot(out_dir, "none")
+    with torch.inference_mode():
+        assert torch.allclose(loaded(inputs), expected, atol=1e-6)
+
+
+def test_mismatched_snapshot_is_ignored(tmp_path):
+    _write(tmp_path, quantization="dynamic_int8")
+    assert load_snapshot(str(tmp_path), "none") is None
+
+
+def test_missing_snapshot_is_ignored(tmp_path):
+    assert load_snapshot(str(tmp_path / "absent"), "none") is None
+
+
+def test_corrupt_snapshot_falls_back_to_from_pretrained(tmp_path, monkeypatch):
+    """A snapshot that fails to load is logged and skipped, and the detector loads the hub model"""
+    import app.models.hf_detector as hf_detector
+
+    _write(tmp_path)
+    with open(os.path.join(tmp_path, WEIGHTS_FILE), "wb") as f:
+        f.write(b"not a torch zipfile" * 64)
+    assert load_snapshot(str(tmp_path), "none") is None
+
+    hub_model = torch.nn.Linear(8, 2)
+    hub_model.config = transformers.Wav2Vec2Config(num_labels=2, id2label={0: "fake", 1: "real"})
+    loaded = []
+    monkeypatch.setattr(settings, "MODEL_SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "INFERENCE_BACKEND", "eager")
+    monkeypatch.setattr(settings, "QUANTIZATION", "none")
+    monkeypatch.setattr(hf_detector.AutoFeatureExtractor, "from_pretrained",
+                        lambda *args, **kwargs: transformers.Wav2Vec2FeatureExtractor())
+    monkeypatch.setattr(hf_detector.AutoModelForAudioClassification, "from_pretrained",
+                        lambda *args, **kwargs: loaded.append(args[0]) or hub_model)
+
+    detector = hf_detector.HuggingFaceDetector.__new__(hf_detector.HuggingFaceDetector)
+    detector.device = "cpu"
+    detector.use_half = False
+    detector.model = None
+    detector.backend = None
+    detector._load_model()
+    assert loaded == [settings.HF_MODEL_NAME]
+    assert detector.model is hub_model
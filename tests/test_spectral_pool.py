@@ -0,0 +1,56 @@
+"""
+Unit tests for the process-pool spectral stage
+"""
+
+import os
+import time
+import numpy as np
+import pytest
+from app.utils.spectral_pool import SpectralPool, analyze_spectral
+
+
+def _voice(seconds=1.5, sr=16000):
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = 140 + 20 * np.sin(2 * np.pi * 3 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    return (0.4 * np.sin(phase) + 0.1 * np.sin(2 * phase)).astype(np.float32)
+
+
+def _shm_blocks():
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+def test_disabled_pool_runs_inline():
+    """Without workers the stage runs on the caller and the future is already done"""
+    pool = SpectralPool(0)
+    audio = _voice()
+    future = pool.submit(audio, 16000)
+
+    assert not pool.enabled
+    assert future.done()
+    features, score = pool.result(future, audio, 16000)
+    assert features == analyze_spectral(audio, 16000)[0]
+    assert 0.0 <= score <= 1.0
+
+
+def test_worker_matches_inline_and_frees_shared_memory():
+    """Features from a worker process equal the in-process ones and the block is unlinked"""
+    pool = SpectralPool(1)
+    audio = _voice()
+    before = _shm_blocks()
+    try:
+        future = pool.submit(audio, 16000)
+        features, score = pool.result(future, audio, 16000)
+        # The block is released by a done-callback that may trail result()
+        deadline = time.monotonic() + 5
+        while pool.stats()["in_flight"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        pool.close()
+
+    expected_features, expected_score = analyze_spectral(audio, 16000)
+    assert features == pytest.approx(expected_features)
+    assert score == pytest.approx(expected_score)
+    assert _shm_blocks() <= before
+    assert pool.stats()["submitted"] == 1
+    assert pool.stats()["in_flight"] == 0
@@ -0,0 +1,125 @@
+"""
+Tests for background model loading, readiness and warmup
+"""
+
+import sys
+import subprocess
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.config import Settings, settings
+
+
+class SlowDetector:
+    """Stands in for the HF detector; warmup blocks until released"""
+
+    def __init__(self, release: threading.Event):
+        self.release = release
+        self.batcher = SimpleNamespace(enabled=True, close=lambda: None)
+        self.spectral_pool = SimpleNamespace(workers=0, close=lambda: None)
+        self.threads = None
+        self.warmed = None
+
+    def set_num_threads(self, n):
+        self.threads = n
+
+    def warmup(self, lengths_sec):
+        self.release.wait(timeout=10)
+        self.warmed = list(lengths_sec)
+
+
+def _wait_for(client, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get("/ready")
+        if response.json()["status"] == status:
+            return response
+        time.sleep(0.01)
+    raise AssertionError(f"/ready never reported {status}")
+
+
+@pytest.fixture
+def release(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(main, "detector", None)
+    monkeypatch.setattr(main, "model_status", "loading")
+    monkeypatch.setattr(main, "_create_detector", lambda: SlowDetector(release))
+    monkeypatch.setattr(settings, "WARMUP_LENGTHS_SEC", [1.0, 5.0])
+    yield release
+    release.set()
+
+
+def test_live_before_ready_then_ready_after_warmup(release):
+    """/health answers at once; /ready and detection wait for the warmed model"""
+    with TestClient(main.app) as client:
+        assert client.get("/health").status_code == 200
+        warming = _wait_for(client, "warming")
+        assert warming.status_code == 503
+
+        response = client.post(
+            "/api/voice-detection",
+            json={"language": "English", "audioFormat": "mp3", "audioBase64": "A" * 128},
+            headers={"x-api-key": settings.API_KEY}
+        )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(settings.INFERENCE_RETRY_AFTER_SEC)
+
+        release.set()
+        ready = _wait_for(client, "ready")
+        assert ready.status_code == 200
+        assert main.detector.warmed == [1.0, 5.0]
+        assert main.detector.threads >= 1
+
+
+def test_default_warmup_covers_the_chunked_path():
+    """Only audio longer than CHUNK_DURATION_SEC is chunked, so one warmup clip must be"""
+    defaults = Settings.model_fields
+    assert max(defaults["WARMUP_LENGTHS_SEC"].default) > defaults["CHUNK_DURATION_SEC"].default
+
+
+def test_failed_load_reports_failed(monkeypatch):
+    def broken():
+        raise RuntimeError("no weights")
+
+    monkeypatch.setattr(main, "detector", None)
+    monkeypatch.setattr(main, "model_status", "loading")
+    monkeypatch.setattr(main, "_create_detector", broken)
+    with TestClient(main.app) as client:
+        response = _wait_for(client, "failed")
+        assert response.status_code == 503
+        assert client.get("/health").json()["model_status"] == "failed"
+
+
+def test_importing_app_skips_torch_and_transformers():
+    """The app module imports without loading the ML stack"""
+    code = (
+        "import sys, app.main; "
+        "print(sorted(m for m in ('torch', 'transformers', 'torchaudio') if m in sys.modules))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip().splitlines()[-1] == "[]"
+
+
+def test_preloaded_detector_starts_services_in_worker(monkeypatch):
+    """Pre-fork workers reuse the parent's detector and split cores between processes"""
+    release = threading.Event()
+    release.set()
+    preloaded = SlowDetector(release)
+    started = []
+    preloaded.start_services = lambda: started.append(True)
+
+    monkeypatch.setattr(main, "detector", None)
+    monkeypatch.setattr(main, "model_status", "loading")
+    monkeypatch.setattr(main, "preloaded_detector", preloaded)
+    monkeypatch.setattr(main, "server_processes", 64)
+    with TestClient(main.app) as client:
+        _wait_for(client, "ready")
+        assert main.detector is preloaded
+        assert started == [True]
+        assert preloaded.threads == 1
+        assert main.inference_executor.max_workers == 1
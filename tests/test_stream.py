@@ -0,0 +1,202 @@
+"""
+Unit tests for live streaming detection
+"""
+
+import json
+import numpy as np
+import librosa
+import pytest
+from app.utils.stream import AudioRingBuffer, StreamingSession, StreamingSpectralAnalyzer
+
+
+class WindowDetector:
+    """Records the windows it is asked to score"""
+
+    class feature_extractor:
+        sampling_rate = 16000
+
+    def __init__(self):
+        self.windows = []
+
+    def detect_window(self, audio, language, spectral_features):
+        self.windows.append((len(audio), spectral_features))
+        return {"classification": "HUMAN", "confidence": 0.7, "explanation": language}
+
+
+def test_ring_buffer_keeps_latest_samples():
+    """Writes wrap around and latest() returns time-ordered samples"""
+    ring = AudioRingBuffer(5)
+    ring.write(np.arange(3, dtype=np.float32))
+    ring.write(np.arange(3, 7, dtype=np.float32))
+    np.testing.assert_array_equal(ring.latest(), [2, 3, 4, 5, 6])
+    np.testing.assert_array_equal(ring.latest(2), [5, 6])
+    ring.write(np.arange(10, 20, dtype=np.float32))
+    np.testing.assert_array_equal(ring.latest(), [15, 16, 17, 18, 19])
+    assert ring.total_written == 17
+
+
+def test_incremental_stft_matches_librosa():
+    """Pushing audio in odd-sized pieces gives the same frames as one STFT"""
+    sr = 16000
+    audio = np.random.RandomState(0).randn(sr).astype(np.float32)
+    analyzer = StreamingSpectralAnalyzer(sr, window_sec=10.0)
+    for start in range(0, len(audio), 777):
+        analyzer.push(audio[start:start + 777])
+
+    expected = librosa.stft(audio, n_fft=2048, hop_length=512, center=False)
+    np.testing.assert_allclose(analyzer.stft(), expected, rtol=1e-4, atol=1e-4)
+
+
+def test_analyzer_window_is_bounded():
+    """Only the last window of frames is kept, however long the stream"""
+    sr = 16000
+    analyzer = StreamingSpectralAnalyzer(sr, window_sec=2.0)
+    for _ in range(20):
+        analyzer.push(np.random.RandomState(1).randn(sr).astype(np.float32))
+    assert analyzer.n_frames == 1 + (2 * sr - 2048) // 512
+
+
+def test_session_scores_every_hop():
+    """Verdicts are due once per hop after the minimum audio"""
+    detector = WindowDetector()
+    session = StreamingSession(detector, "English", "pcm_s16le", 16000,
+                               window_sec=2.0, hop_sec=0.5, min_audio_sec=1.0)
+    frame = (np.sin(np.arange(1600) / 5) * 8000).astype("<i2").tobytes()  # 100 ms
+
+    due = [session.push(frame) for _ in range(30)]
+
+    # First verdict at 1.0 s, then every 0.5 s up to 3.0 s
+    assert [i + 1 for i, d in enumerate(due) if d] == [10, 15, 20, 25, 30]
+    result = session.score()
+    assert result["stream_time_sec"] == 3.0
+    # The whole frames that fit in the 2 s window: 59 hops of 512 over a 2048-sample FFT
+    assert detector.windows[0][0] == 58 * 512 + 2048
+    assert result["window_sec"] == 1.98
+    assert "pitch_cv" in detector.windows[0][1]
+
+
+def test_session_window_matches_the_stft_frames():
+    """The waveform handed to scoring is the audio the spectral frames were taken from"""
+    class AudioDetector(WindowDetector):
+        def detect_window(self, audio, language, spectral_features):
+            self.audio = audio
+            return super().detect_window(audio, language, spectral_features)
+
+    detector = AudioDetector()
+    session = StreamingSession(detector, "English", "pcm_f32le", 16000,
+                               window_sec=2.0, hop_sec=0.5, min_audio_sec=1.0)
+    audio = np.random.RandomState(2).randn(16000 * 3 + 300).astype(np.float32)
+    # Odd-sized frames leave an unframed tail behind the last STFT frame
+    for start in range(0, len(audio), 1234):
+        session.push(audio[start:start + 1234].astype("<f4").tobytes())
+    session.score()
+
+    unframed, length = session.analyzer.framed_span()
+    assert unframed > 0
+    np.testing.assert_array_equal(detector.audio, audio[len(audio) - unframed - length:len(audio) - unframed])
+    expected = librosa.stft(detector.audio, n_fft=2048, hop_length=512, center=False)
+    np.testing.assert_allclose(session.analyzer.stft(), expected, rtol=1e-4, atol=1e-4)
+
+
+def test_session_handles_split_samples_and_resampling():
+    """Odd byte splits are carried over and 8 kHz input is resampled"""
+    detector = WindowDetector()
+    session = StreamingSession(detector, "English", "pcm_s16le", 8000,
+                               window_sec=2.0, hop_sec=0.5, min_audio_sec=1.0)
+    data = (np.sin(np.arange(8000) / 5) * 8000).astype("<i2").tobytes()
+    session.push(data[:1001])
+    session.push(data[1001:])
+    # The streaming resampler holds back its filter delay until more audio arrives
+    assert 0.9 < session.stream_time_sec <= 1.0
+
+
+def test_websocket_pushes_rolling_verdicts(monkeypatch):
+    """The endpoint sends a verdict per hop and a final one on end"""
+    from fastapi.testclient import TestClient
+    import app.main as main
+    from app.config import settings
+    from app.core.executor import InferenceExecutor
+
+    detector = WindowDetector()
+    monkeypatch.setattr(main, "detector", detector)
+    monkeypatch.setattr(main, "inference_executor", InferenceExecutor(max_workers=1, max_queue=4))
+    monkeypatch.setattr(settings, "STREAM_WINDOW_SEC", 2.0)
+    monkeypatch.setattr(settings, "STREAM_HOP_SEC", 1.0)
+    monkeypatch.setattr(settings, "STREAM_MIN_AUDIO_SEC", 1.0)
+
+    second = (np.sin(np.arange(16000) / 5) * 8000).astype("<i2").tobytes()
+    with TestClient(main.app).websocket_connect(
+        "/ws/voice-detection?language=tamil&audioFormat=pcm_s16le&sampleRate=16000",
+        headers={"x-api-key": settings.API_KEY}
+    ) as ws:
+        ws.send_bytes(second)
+        first = ws.receive_json()
+        ws.send_text(json.dumps({"type": "end"}))
+        final = ws.receive_json()
+
+    assert first["type"] == "verdict"
+    assert first["explanation"] == "Tamil"
+    assert first["stream_time_sec"] == 1.0
+    assert final["type"] == "verdict"
+
+
+def test_websocket_rejects_unsupported_format(monkeypatch):
+    """Only raw PCM can be streamed"""
+    from fastapi.testclient import TestClient
+    import app.main as main
+    from app.config import settings
+
+    monkeypatch.setattr(main, "detector", WindowDetector())
+    client = TestClient(main.app)
+    with client.websocket_connect("/ws/voice-detection?audioFormat=opus", headers={"x-api-key": settings.API_KEY}) as ws:
+        message = ws.receive_json()
+    assert message["type"] == "error"
+
+
+def test_websocket_requires_api_key(monkeypatch):
+    """A stream without a valid key is closed before it is accepted"""
+    from fastapi.testclient import TestClient
+    from starlette.websockets import WebSocketDisconnect
+    import app.main as main
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "API_KEY_REQUIRED", True)
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with TestClient(main.app).websocket_connect("/ws/voice-detection") as ws:
+            ws.receive_json()
+    assert exc.value.code == 1008
+
+
+def test_websocket_key_without_headers(monkeypatch):
+    """Browsers can pass the key as a query parameter or an api-key subprotocol"""
+    from fastapi.testclient import TestClient
+    import app.main as main
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "API_KEY_REQUIRED", True)
+    monkeypatch.setattr(main, "detector", WindowDetector())
+    client = TestClient(main.app)
+
+    with client.websocket_connect(f"/ws/voice-detection?audioFormat=opus&apiKey={settings.API_KEY}") as ws:
+        assert ws.receive_json()["type"] == "error"
+
+    subprotocol = f"api-key.{settings.API_KEY}"
+    with client.websocket_connect("/ws/voice-detection?audioFormat=opus", subprotocols=[subprotocol]) as ws:
+        assert ws.accepted_subprotocol == subprotocol
+        assert ws.receive_json()["type"] == "error"
+
+
+def test_stream_send_after_disconnect_is_dropped():
+    """A verdict finishing after the client left doesn't raise in the scoring task"""
+    import asyncio
+    from starlette.websockets import WebSocketState
+    import app.main as main
+
+    class GoneWebSocket:
+        client_state = WebSocketState.CONNECTED
+        application_state = WebSocketState.CONNECTED
+
+        async def send_json(self, message):
+            raise OSError("client disconnected")
+
+    asyncio.run(main._send_stream_message(GoneWebSocket(), {"type": "verdict"}))
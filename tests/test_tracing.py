@@ -0,0 +1,125 @@
+"""
+Tests for sampled request tracing
+"""
+
+import base64
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.config import settings
+from app.core.executor import InferenceExecutor
+from app.core.tracing import TraceBuffer, activate, current_trace, deactivate, span
+from app.utils.audio_processor import AudioProcessor
+from app.utils.spectral_pool import SpectralPool
+
+
+def test_buffer_samples_and_stays_bounded():
+    buffer = TraceBuffer(capacity=2, sample_rate=0.0)
+    assert buffer.start("skipped") is None
+
+    traces = [buffer.start(client_id, force=True) for client_id in ("a", "b", "c")]
+    assert [trace.client_request_id for trace in traces] == ["a", "b", "c"]
+    assert buffer.recent() == [traces[2].request_id, traces[1].request_id]
+    assert buffer.get(traces[0].request_id) is None
+    assert buffer.stats()["evicted"] == 1
+
+    assert TraceBuffer(capacity=0).start(force=True) is None
+
+
+def test_scoring_records_values_only_when_traced():
+    features = {"pitch_cv": np.float32(0.05), "jitter": 0.001}
+    trace = TraceBuffer(capacity=4).start("scoring", force=True)
+
+    AudioProcessor.compute_ai_score(features)
+    assert trace.records == []
+
+    token = activate(trace)
+    try:
+        with span("spectral"):
+            score = AudioProcessor.compute_ai_score(features)
+    finally:
+        deactivate(token)
+
+    records = trace.to_dict()["records"]
+    checks = next(r for r in records if r["name"] == "spectral_checks")
+    assert checks["values"]["score"] == score
+    assert {"pitch_cv", "jitter"} <= set(checks["values"]["checks"])
+    assert next(r for r in records if r["name"] == "spectral")["duration_ms"] >= 0
+
+
+class TracingDetector:
+    def detect(self, audio_base64, language, audio_format, sample_rate, max_analysis_sec):
+        trace = current_trace()
+        with span("model_forward"):
+            if trace is not None:
+                trace.event("model", probs={"fake": np.float32(0.2), "real": np.float32(0.8)})
+        return {"classification": "HUMAN", "confidence": 0.8, "explanation": "test"}
+
+
+def test_client_request_ids_do_not_collide():
+    """Two requests sending the same x-request-id keep separate traces"""
+    buffer = TraceBuffer(capacity=4)
+    first = buffer.start("req-42", force=True)
+    second = buffer.start("req-42", force=True)
+    assert first.request_id != second.request_id
+    assert buffer.get(first.request_id) is first
+    assert buffer.get(second.request_id) is second
+
+
+def test_spectral_checks_from_a_worker_are_recorded():
+    """The worker process has no trace, so the parent records its checks"""
+    t = np.arange(24000) / 16000
+    audio = (0.4 * np.sin(2 * np.pi * 150 * t)).astype(np.float32)
+    trace = TraceBuffer(capacity=4).start(force=True)
+    pool = SpectralPool(1)
+    token = activate(trace)
+    try:
+        _, score = pool.result(pool.submit(audio, 16000), audio, 16000)
+    finally:
+        deactivate(token)
+        pool.close()
+
+    checks = [r for r in trace.to_dict()["records"] if r["name"] == "spectral_checks"]
+    assert len(checks) == 1
+    assert checks[0]["values"]["score"] == score
+    assert checks[0]["values"]["checks"]
+
+
+def _post(client, headers):
+    return client.post(
+        "/api/voice-detection",
+        json={"language": "English", "audioFormat": "mp3", "audioBase64": base64.b64encode(b"ok" * 100).decode()},
+        headers={"x-api-key": settings.API_KEY, **headers}
+    )
+
+
+def test_trace_fetched_by_trace_id(monkeypatch):
+    monkeypatch.setattr(main, "detector", TracingDetector())
+    monkeypatch.setattr(main, "model_status", "ready")
+    monkeypatch.setattr(main, "inference_executor", InferenceExecutor(max_workers=1, max_queue=1))
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-secret")
+    monkeypatch.setattr(main.trace_buffer, "sample_rate", 0.0)
+    client = TestClient(main.app)
+
+    # Forcing a trace needs the admin key
+    for headers in ({"x-trace": "1"}, {"x-trace": "1", "x-admin-key": "wrong"}):
+        response = _post(client, headers)
+        assert response.status_code == 200
+        assert "x-trace-id" not in response.headers
+
+    response = _post(client, {"x-trace": "1", "x-admin-key": "admin-secret", "x-request-id": "req-42"})
+    assert response.status_code == 200
+    trace_id = response.headers["x-trace-id"]
+
+    trace = client.get(f"/admin/traces/{trace_id}", headers={"x-admin-key": "admin-secret"}).json()
+    assert trace["client_request_id"] == "req-42"
+    names = [record["name"] for record in trace["records"]]
+    # Recorded on the inference worker thread, inside the request span
+    assert {"request", "model_forward", "model"} <= set(names)
+    model = next(r for r in trace["records"] if r["name"] == "model")
+    assert model["values"]["probs"]["real"] == np.float32(0.8).item()
+
+    assert trace_id in client.get("/admin/traces", headers={"x-admin-key": "admin-secret"}).json()["traces"]
+    assert client.get("/admin/traces/missing", headers={"x-admin-key": "admin-secret"}).status_code == 404
@@ -0,0 +1,168 @@
+"""
+Tests for the binary upload endpoint
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.config import settings
+from app.core.executor import InferenceExecutor
+
+
+class RecordingDetector:
+    """Stands in for the HF detector and records what it was given"""
+
+    def __init__(self):
+        self.calls = []
+
+    def detect_bytes(self, audio_bytes, language, audio_format="mp3", sample_rate=None, max_analysis_sec=None):
+        self.calls.append((bytes(audio_bytes), language))
+        self.formats = (audio_format, sample_rate)
+        return {"classification": "HUMAN", "confidence": 0.8, "explanation": "test"}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    detector = RecordingDetector()
+    monkeypatch.setattr(main, "detector", detector)
+    monkeypatch.setattr(main, "inference_executor", InferenceExecutor(max_workers=1, max_queue=1))
+    # No context manager: startup (model loading) is not run
+    return TestClient(main.app), detector
+
+
+def test_raw_mpeg_body(client):
+    """Raw audio/mpeg body reaches the detector unchanged"""
+    test_client, detector = client
+    audio = b"\xff\xfb\x90\x00" + b"\x01" * 500
+    response = test_client.post(
+        "/api/voice-detection/upload?language=english",
+        content=audio,
+        headers={"Content-Type": "audio/mpeg"}
+    )
+    assert response.status_code == 200
+    assert response.json()["classification"] == "HUMAN"
+    assert detector.calls == [(audio, "English")]
+
+
+def test_multipart_upload_with_form_language(client):
+    """Multipart file part and language form field are used"""
+    test_client, detector = client
+    audio = b"\xff\xfb\x90\x00" + b"\x02" * 500
+    response = test_client.post(
+        "/api/voice-detection/upload",
+        files={"file": ("clip.mp3", audio, "audio/mpeg")},
+        data={"language": "Tamil"}
+    )
+    assert response.status_code == 200
+    assert detector.calls == [(audio, "Tamil")]
+
+
+def test_raw_pcm_with_declared_rate(client):
+    """Octet-stream PCM carries its format and rate from the query"""
+    test_client, detector = client
+    pcm = b"\x00\x01" * 400
+    response = test_client.post(
+        "/api/voice-detection/upload?language=English&audioFormat=pcm_s16le&sampleRate=8000",
+        content=pcm,
+        headers={"Content-Type": "application/octet-stream"}
+    )
+    assert response.status_code == 200
+    assert detector.calls == [(pcm, "English")]
+    assert detector.formats == ("pcm_s16le", 8000)
+
+
+def test_wav_content_type_sets_format(client):
+    """audio/wav bodies are passed on as wav"""
+    test_client, detector = client
+    response = test_client.post(
+        "/api/voice-detection/upload?language=English",
+        content=b"RIFF" + b"\x00" * 300,
+        headers={"Content-Type": "audio/wav"}
+    )
+    assert response.status_code == 200
+    assert detector.formats == ("wav", None)
+
+
+def test_raw_pcm_requires_sample_rate(client):
+    """PCM without a declared rate is rejected"""
+    test_client, detector = client
+    response = test_client.post(
+        "/api/voice-detection/upload?language=English&audioFormat=pcm_f32le",
+        content=b"\x00" * 400,
+        headers={"Content-Type": "application/octet-stream"}
+    )
+    assert response.status_code == 400
+    assert detector.calls == []
+
+
+def test_oversized_content_length_rejected(client, monkeypatch):
+    """Declared size over the limit is rejected before reading the body"""
+    test_client, detector = client
+    monkeypatch.setattr(settings, "MAX_AUDIO_SIZE_MB", 1)
+    response = test_client.post(
+        "/api/voice-detection/upload?language=English",
+        content=b"\x00" * (1024 * 1024 + 1),
+        headers={"Content-Type": "audio/mpeg"}
+    )
+    assert response.status_code == 413
+    assert detector.calls == []
+
+
+def test_oversized_stream_rejected_without_content_length(client, monkeypatch):
+    """Chunked bodies are cut off once the running byte count passes the limit"""
+    test_client, detector = client
+    monkeypatch.setattr(settings, "MAX_AUDIO_SIZE_MB", 1)
+
+    def body():
+        for _ in range(3):
+            yield b"\x00" * (512 * 1024)
+
+    response = test_client.post(
+        "/api/voice-detection/upload?language=English",
+        content=body(),
+        headers={"Content-Type": "audio/mpeg"}
+    )
+    assert response.status_code == 413
+    assert detector.calls == []
+
+
+def test_unsupported_content_type(client):
+    """Unknown content types are rejected as invalid format"""
+    test_client, detector = client
+    response = test_client.post(
+        "/api/voice-detection/upload?language=English",
+        content=b"hello",
+        headers={"Content-Type": "text/plain"}
+    )
+    assert response.status_code == 400
+    assert detector.calls == []
+
+
+def test_missing_language(client):
+    """Language is required"""
+    test_client, _ = client
+    response = test_client.post(
+        "/api/voice-detection/upload",
+        content=b"\x00" * 200,
+        headers={"Content-Type": "audio/mpeg"}
+    )
+    assert response.status_code == 400
+
+
+def test_api_key_policy(client, monkeypatch):
+    """With API_KEY_REQUIRED the upload is rejected before the body is read"""
+    test_client, detector = client
+    monkeypatch.setattr(settings, "API_KEY_REQUIRED", True)
+    audio = b"\xff\xfb\x90\x00" + b"\x01" * 500
+
+    response = test_client.post("/api/voice-detection/upload?language=english", content=audio, headers={"Content-Type": "audio/mpeg"})
+    assert response.status_code == 401
+    assert detector.calls == []
+
+    response = test_client.post(
+        "/api/voice-detection/upload?language=english",
+        content=audio,
+        headers={"Content-Type": "audio/mpeg", "x-api-key": settings.API_KEY}
+    )
+    assert response.status_code == 200
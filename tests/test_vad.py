@@ -0,0 +1,57 @@
+"""
+Tests for the energy/ZCR voice activity detection pre-stage
+"""
+
+import numpy as np
+
+from app.utils.audio_processor import AudioProcessor
+from app.utils.spectral_engine import SpectralFeatureEngine
+from app.utils.vad import VoiceActivityDetector
+
+SR = 16000
+
+
+def _tone(seconds, level=0.3):
+    t = np.arange(int(seconds * SR)) / SR
+    return (level * np.sin(2 * np.pi * 150 * t)).astype(np.float32)
+
+
+def _silence(seconds):
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+
+def test_long_silence_is_removed_and_short_pauses_kept():
+    audio = np.concatenate([_tone(1.0), _silence(0.1), _tone(1.0), _silence(2.0), _tone(1.0)])
+    vad = VoiceActivityDetector(min_silence_sec=0.3, pad_sec=0.05)
+    regions, speech_ratio = vad.regions(audio, SR)
+
+    # The 0.1 s pause is bridged, the 2 s gap splits the audio
+    assert len(regions) == 2
+    assert abs(speech_ratio - 3.0 / 5.1) < 0.02
+    # Speech plus padding, to within a 30 ms frame at each edge
+    trimmed = vad.trim(audio, regions)
+    assert abs(len(trimmed) / SR - (2.1 + 1.0 + 4 * 0.05)) < 4 * 0.03
+
+
+def test_quiet_fricatives_count_as_speech():
+    rng = np.random.default_rng(0)
+    hiss = (0.008 * rng.standard_normal(SR)).astype(np.float32)
+    hum = _tone(1.0, level=0.008)
+    vad = VoiceActivityDetector(energy_threshold=0.01)
+
+    # Same energy; only the noise-like one has a high zero-crossing rate
+    assert vad.speech_frames(hiss, SR)[0].mean() > 0.9
+    assert vad.speech_frames(hum, SR)[0].mean() == 0.0
+
+
+def test_trim_silence_keeps_input_without_enough_speech():
+    audio = np.concatenate([_silence(2.0), _tone(0.2), _silence(2.0)])
+    trimmed, speech_ratio = AudioProcessor.trim_silence(audio, SR)
+    assert trimmed is audio
+    assert 0.0 < speech_ratio < 0.1
+
+
+def test_silence_ratio_matches_spectral_feature():
+    audio = np.concatenate([_tone(1.0), _silence(1.5), _tone(1.0)])
+    features = SpectralFeatureEngine().compute(audio, SR)
+    assert AudioProcessor.silence_ratio(audio) == features["silence_ratio"]
@@ -0,0 +1,43 @@
+"""
+Tests for budgeted representative window sampling
+"""
+
+import numpy as np
+
+from app.utils.window_sampler import select_windows
+
+SR = 1000
+
+
+def _tone(seconds, level=0.3):
+    t = np.arange(int(seconds * SR)) / SR
+    return (level * np.sin(2 * np.pi * 50 * t)).astype(np.float32)
+
+
+def test_one_loud_window_per_stratum():
+    audio = np.zeros(120 * SR, dtype=np.float32)
+    audio[30 * SR:45 * SR] = _tone(15)
+    audio[100 * SR:112 * SR] = _tone(12)
+    audio[5 * SR:8 * SR] = _tone(3, level=0.05)
+
+    windows, window_sec = select_windows(audio, SR, budget_sec=20.0, max_window_sec=10.0)
+
+    assert window_sec == 10.0
+    assert [end - start for start, end in windows] == [10 * SR, 10 * SR]
+    # One window in each half, inside the loud stretch of that half
+    assert 30 * SR <= windows[0][0] and windows[0][1] <= 45 * SR
+    assert 100 * SR <= windows[1][0] and windows[1][1] <= 112 * SR
+
+
+def test_windows_split_budget_and_stay_in_order():
+    audio = np.random.default_rng(0).standard_normal(600 * SR).astype(np.float32)
+    windows, window_sec = select_windows(audio, SR, budget_sec=100.0, max_window_sec=30.0)
+
+    assert len(windows) == 4 and window_sec == 25.0
+    for k, (start, end) in enumerate(windows):
+        assert 150 * SR * k <= start and end <= 150 * SR * (k + 1)
+
+
+def test_short_audio_is_kept_whole():
+    audio = _tone(5)
+    assert select_windows(audio, SR, budget_sec=10.0, max_window_sec=30.0) == ([(0, len(audio))], 5.0)